@@ -5,8 +5,13 @@ from django.utils.translation import gettext_lazy as _
 from ambient_toolbox.autodiscover.settings import get_autodiscover_enabled, get_namespaces
 from ambient_toolbox.static_role_permissions.settings import (
     get_static_role_permissions_enable_system_check,
+    get_static_role_permissions_file,
     get_static_role_permissions_path,
 )
+from ambient_toolbox.visibility_index.settings import (
+    get_visibility_index_connect_signals,
+    get_visibility_index_services,
+)
 
 
 class AmbientToolboxConfig(AppConfig):
@@ -15,7 +20,8 @@ class AmbientToolboxConfig(AppConfig):
 
     def ready(self):
         # System checks for static role permission feature
-        if get_static_role_permissions_path() and get_static_role_permissions_enable_system_check():
+        static_role_permissions_defined = get_static_role_permissions_path() or get_static_role_permissions_file()
+        if static_role_permissions_defined and get_static_role_permissions_enable_system_check():
             from ambient_toolbox.static_role_permissions.system_check import (  # noqa: PLC0415
                 check_permissions_against_models,
             )
@@ -29,3 +35,9 @@ class AmbientToolboxConfig(AppConfig):
             from ambient_toolbox.autodiscover import decorator_based_registry  # noqa: PLC0415
 
             decorator_based_registry.autodiscover(namespaces=get_namespaces())
+
+        # Keep materialised visibility indices up to date
+        if get_visibility_index_services() and get_visibility_index_connect_signals():
+            from ambient_toolbox.visibility_index.signals import connect_registered_visibility_indices  # noqa: PLC0415
+
+            connect_registered_visibility_indices()
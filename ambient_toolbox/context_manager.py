@@ -1,7 +1,108 @@
+import contextlib
+import threading
+import weakref
+from collections.abc import Hashable, Iterable, Iterator, Mapping
+from contextvars import ContextVar, Token
+from types import MappingProxyType
+
+import django
+from django.dispatch import Signal
+from django.dispatch.dispatcher import _make_id
+
+# Muted "(receiver id, sender id)" pairs per signal id in the current thread or async task.
+# A receiver id of "None" mutes all receivers, a sender id of "None" mutes all senders.
+_muted_receivers: ContextVar[Mapping[int, frozenset[tuple[Hashable | None, int | None]]]] = ContextVar(
+    "muted_receivers", default=MappingProxyType({})
+)
+_dispatch_wrapper_lock = threading.Lock()
+# Since Django 5.0, "_live_receivers()" returns sync and async receivers separately
+_SPLIT_ASYNC_RECEIVERS = django.VERSION >= (5, 0)
+
+
+def _filter_receivers(receivers: list, muted: frozenset, sender_id: int) -> list:
+    return [
+        receiver
+        for receiver in receivers
+        if (receiver_id := _make_id(receiver), None) not in muted and (receiver_id, sender_id) not in muted
+    ]
+
+
+def _install_dispatch_wrapper(signal: Signal) -> None:
+    """
+    Wraps the receiver lookup of the given signal instance once, so all ways of sending it ("send()",
+    "send_robust()" and their async variants) consult the mutes of the current context. Connected receivers
+    and Django's per-sender receiver cache stay untouched.
+    """
+    with _dispatch_wrapper_lock:
+        if "_live_receivers" in vars(signal):
+            return
+
+        live_receivers = signal._live_receivers
+        signal_id = id(signal)
+
+        def _live_receivers(sender):
+            muted = _muted_receivers.get().get(signal_id)
+            if not muted:
+                return live_receivers(sender)
+
+            sender_id = id(sender)
+            if (None, None) in muted or (None, sender_id) in muted:
+                return ([], []) if _SPLIT_ASYNC_RECEIVERS else []
+
+            receivers = live_receivers(sender)
+            if _SPLIT_ASYNC_RECEIVERS:
+                return tuple(_filter_receivers(receiver_list, muted, sender_id) for receiver_list in receivers)
+            return _filter_receivers(receivers, muted, sender_id)
+
+        signal._live_receivers = _live_receivers
+
+
+def _mute(signals: Iterable[Signal], receiver=None, sender=None) -> Token:
+    muted_receivers = dict(_muted_receivers.get())
+    muted_pair = (None if receiver is None else _make_id(receiver), None if sender is None else id(sender))
+    for signal in signals:
+        _install_dispatch_wrapper(signal)
+        muted_receivers[id(signal)] = muted_receivers.get(id(signal), frozenset()) | {muted_pair}
+    return _muted_receivers.set(MappingProxyType(muted_receivers))
+
+
+@contextlib.contextmanager
+def suppress_signals(*signals: Signal, sender=None) -> Iterator[None]:
+    """
+    Context manager to skip all receivers of the given signals, optionally only for the given sender.
+    In contrast to disconnecting receivers, this only affects the current thread or async task, so concurrent
+    requests still get their signals. Suppressions can be nested.
+    ```
+    with suppress_signals(pre_save, post_save, sender=MyModel):
+        obj.save()
+    ```
+    """
+    token = _mute(signals, sender=sender)
+    try:
+        yield
+    finally:
+        _muted_receivers.reset(token)
+
+
+def _get_receiver_by_dispatch_uid(signal: Signal, dispatch_uid: Hashable, sender):
+    """
+    Returns the receiver connected to the given signal and sender with the given "dispatch_uid", or None.
+    """
+    lookup_key = (dispatch_uid, _make_id(sender))
+    with signal.lock:
+        for receiver_lookup_key, receiver, *_ in signal.receivers:
+            if receiver_lookup_key == lookup_key:
+                # Weakly connected receivers are stored as (weak method) references
+                return receiver() if isinstance(receiver, weakref.ReferenceType) else receiver
+    return None
+
+
 class TempDisconnectSignal:
     """
-    Context manager to temporarily disconnect a model from a signal.
-    Attention: If your signal has a `dispatch_uid` set, you need to pass it to this class!
+    Context manager to temporarily mute a receiver of a signal for the given sender.
+    The receiver stays connected and is only skipped in the current thread or async task, so entering the context is
+    cheap and doesn't affect concurrent requests. If the receiver was connected with a "dispatch_uid", you can pass it
+    instead of the receiver.
     Use with a "with" tag like this:
     ```
     with TempDisconnectSignal(**kwargs):
@@ -14,17 +115,19 @@ class TempDisconnectSignal:
         self.receiver = receiver
         self.sender = sender
         self.dispatch_uid = dispatch_uid
+        self._token_list = []
+
+    def _get_receiver(self):
+        if self.dispatch_uid is None:
+            return self.receiver
+
+        receiver = _get_receiver_by_dispatch_uid(self.signal, self.dispatch_uid, self.sender) or self.receiver
+        if receiver is None:
+            raise ValueError(f"No receiver connected with dispatch_uid '{self.dispatch_uid}'.")
+        return receiver
 
     def __enter__(self):
-        self.signal.disconnect(
-            receiver=self.receiver,
-            sender=self.sender,
-            dispatch_uid=self.dispatch_uid,
-        )
+        self._token_list.append(_mute([self.signal], receiver=self._get_receiver(), sender=self.sender))
 
     def __exit__(self, type, value, traceback):  # noqa: A002
-        self.signal.connect(
-            receiver=self.receiver,
-            sender=self.sender,
-            dispatch_uid=self.dispatch_uid,
-        )
+        _muted_receivers.reset(self._token_list.pop())
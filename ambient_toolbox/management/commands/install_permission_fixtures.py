@@ -1,17 +1,22 @@
+import json
 from pydoc import locate
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.management.base import BaseCommand
 
 from ambient_toolbox.permissions.fixtures.declarations import GroupPermissionDeclaration
-from ambient_toolbox.permissions.fixtures.services import PermissionSetupService
+from ambient_toolbox.permissions.fixtures.services import GroupPermissionPlan, PermissionFixturePlanService
+
+CHECKSUM_CACHE_KEY = "ambient_toolbox.install_permission_fixtures.checksum"
 
 
 class Command(BaseCommand):
     """
     Reads group permission declarations from the ``GROUP_PERMISSION_FIXTURES`` setting and
     synchronises the declared permissions into the database, adding missing and removing
-    obsolete entries.
+    obsolete entries. The changes of all groups are computed as one plan and applied in a
+    single transaction.
     """
 
     help = "Installs group permission fixtures declared in settings."
@@ -22,29 +27,78 @@ class Command(BaseCommand):
             action="store_true",
             help="Doesn't persist any changes in the database",
         )
+        parser.add_argument(
+            "--format",
+            choices=["text", "json"],
+            default="text",
+            help="Output format of the changes",
+        )
+        parser.add_argument(
+            "--skip-unchanged",
+            action="store_true",
+            help="Skips the installation if declarations and database match the checksum stored in the cache",
+        )
+
+    def _write_text(self, message: str) -> None:
+        if self.output_format == "text":
+            self.stdout.write(message)
+
+    def _write_plan(self, plan: list[GroupPermissionPlan], *, dry_run: bool, skipped: bool) -> None:
+        if self.output_format == "json":
+            self.stdout.write(
+                json.dumps(
+                    {
+                        "dry_run": dry_run,
+                        "skipped": skipped,
+                        "groups": [group_plan.as_dict() for group_plan in plan],
+                    },
+                    indent=2,
+                )
+            )
+            return
+
+        for group_plan in plan:
+            group_dict = group_plan.as_dict()
+            self.stdout.write(f'> Installing permissions of group "{group_plan.group_name}"...')
+            if group_dict["created"]:
+                self.stdout.write("> Group created")
+            self.stdout.write(f"> Newly installed permissions: {', '.join(group_dict['added']) or '-'}")
+            self.stdout.write(f"> Removed permissions: {', '.join(group_dict['removed']) or '-'}\n")
 
     def handle(self, *args, **options):
         dry_run = options.get("dry_run")
+        skip_unchanged = options.get("skip_unchanged") and not dry_run
+        self.output_format = options.get("format") or "text"
+
         if dry_run:
-            print('Starting in "dry-run" mode...')
+            self._write_text('Starting in "dry-run" mode...')
 
         try:
             fixture_declaration_list = settings.GROUP_PERMISSION_FIXTURES
         except AttributeError:
-            print("No fixtures found in Django settings.")
+            self._write_text("No fixtures found in Django settings.")
             fixture_declaration_list = []
 
+        group_declaration_list = []
         for declaration_path in fixture_declaration_list:
-            print(f'Reading fixture declaration "{declaration_path}"...')
+            self._write_text(f'Reading fixture declaration "{declaration_path}"...')
             declaration_class: GroupPermissionDeclaration = locate(declaration_path)
 
             assert isinstance(declaration_class, type(GroupPermissionDeclaration)), (
                 f'Could\'t load group declaration "{declaration_path}".'
             )
+            group_declaration_list.append(declaration_class)
+
+        service = PermissionFixturePlanService(group_declaration_list=group_declaration_list, dry_run=dry_run)
+
+        if skip_unchanged and cache.get(CHECKSUM_CACHE_KEY) == service.get_checksum():
+            self._write_text("Permission fixtures are up to date, skipping.")
+            self._write_plan([], dry_run=dry_run, skipped=True)
+            return
+
+        plan = service.process()
 
-            print(f'> Installing permissions of group "{declaration_class.name}"...')
-            service = PermissionSetupService(group_declaration=declaration_class, dry_run=dry_run)
-            new_permissions, removed_permissions = service.process()
+        if skip_unchanged:
+            cache.set(CHECKSUM_CACHE_KEY, service.get_checksum(), timeout=None)
 
-            print(f"> Newly installed permissions: {new_permissions}")
-            print(f"> Removed permissions: {removed_permissions}\n")
+        self._write_plan(plan, dry_run=dry_run, skipped=False)
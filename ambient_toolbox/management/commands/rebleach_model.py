@@ -0,0 +1,58 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from ambient_toolbox.services.bleacher import RebleachProgress, RebleachService
+
+
+class Command(BaseCommand):
+    """
+    Sanitizes all existing rows of a model using the ``BleacherMixin`` again, e.g. after tightening the allowlists.
+    Only rows whose sanitized output differs are written back. An aborted run can be resumed via ``--start-after``
+    with the last primary key printed in the progress output.
+    """
+
+    help = "Re-sanitizes the HTML fields of all existing rows of a BleacherMixin model."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", type=str, help='Model label, e.g. "my_app.MyModel"')
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Number of rows per chunk")
+        parser.add_argument("--workers", type=int, default=4, help="Number of threads sanitizing in parallel")
+        parser.add_argument("--start-after", type=str, default=None, help="Primary key to resume after")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Doesn't persist any changes in the database",
+        )
+
+    def _write_progress(self, progress: RebleachProgress) -> None:
+        self.stdout.write(
+            f"Processed {progress.processed} rows ({progress.changed} changed), last pk {progress.last_pk}, "
+            f"{progress.rows_per_second:.0f} rows/s"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise RuntimeError(f'Model "{options["model"]}" not found.') from e
+
+        start_after_pk = options.get("start_after")
+        if start_after_pk is not None:
+            start_after_pk = model._meta.pk.to_python(start_after_pk)
+
+        dry_run = options.get("dry_run")
+        if dry_run:
+            self.stdout.write('Starting in "dry-run" mode...')
+
+        service = RebleachService(
+            model=model,
+            chunk_size=options.get("chunk_size"),
+            workers=options.get("workers"),
+            dry_run=dry_run,
+        )
+        progress = service.process(start_after_pk=start_after_pk, progress_callback=self._write_progress)
+
+        self.stdout.write(
+            f"Finished {model._meta.label}: {progress.processed} rows processed, {progress.changed} changed "
+            f"in {progress.elapsed:.1f}s."
+        )
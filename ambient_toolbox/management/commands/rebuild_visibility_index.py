@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from ambient_toolbox.visibility_index.settings import get_visibility_index_services
+
+
+class Command(BaseCommand):
+    """
+    Synchronises all visibility indices registered in the ``VISIBILITY_INDEX_SERVICES`` setting with their live
+    permission rules. In "check" mode, nothing is persisted and the command fails if an index is out of sync.
+    """
+
+    help = "Rebuilds or validates all registered visibility indices."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compares the indices with the live rules without persisting any changes",
+        )
+
+    def handle(self, *args, **options):
+        check_only = options.get("check")
+        is_consistent = True
+
+        for service_path in get_visibility_index_services():
+            service = import_string(service_path)()
+            diff = service.check_consistency() if check_only else service.rebuild()
+            is_consistent = is_consistent and diff.is_consistent
+
+            self.stdout.write(
+                f"{service.index_model._meta.label}: {len(diff.created)} created, {len(diff.updated)} updated, "
+                f"{len(diff.deleted)} deleted"
+            )
+
+        if check_only and not is_consistent:
+            sys.exit(1)
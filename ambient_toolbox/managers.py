@@ -1,4 +1,14 @@
-from django.db import models
+import copy
+import functools
+import threading
+import time
+import uuid
+from types import MappingProxyType
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models.signals import post_delete, post_save
 
 
 class AbstractPermissionMixin:
@@ -89,3 +99,244 @@ class GetOrNoneManagerMixin:
             return self.get(**kwargs)
         except self.model.DoesNotExist:
             return None
+
+
+class ReferenceDataSnapshot:
+    """
+    Immutable in-memory copy of a whole table, indexed by its primary key and all other unique fields.
+    The contained model instances are shared between all callers and must be treated as read-only.
+    """
+
+    __slots__ = ("indices", "objects", "version")
+
+    def __init__(self, objects: list[models.Model], unique_fields: list[models.Field], version: str) -> None:
+        indices = {
+            field.attname: MappingProxyType(
+                {getattr(obj, field.attname): obj for obj in objects if getattr(obj, field.attname) is not None}
+            )
+            for field in unique_fields
+        }
+        object.__setattr__(self, "objects", tuple(objects))
+        object.__setattr__(self, "indices", MappingProxyType(indices))
+        object.__setattr__(self, "version", version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ReferenceDataSnapshot is immutable.")
+
+    def lookup(self, lookup_dict: dict[str, object]) -> list[models.Model]:
+        """
+        Returns all objects matching the given attribute values. Uses the unique indices wherever possible.
+        """
+        for attname, value in lookup_dict.items():
+            if attname in self.indices:
+                candidate = self.indices[attname].get(value)
+                candidate_list = [] if candidate is None else [candidate]
+                break
+        else:
+            candidate_list = self.objects
+
+        return [obj for obj in candidate_list if all(getattr(obj, k) == v for k, v in lookup_dict.items())]
+
+
+# In-process storage of all reference data snapshots and the time their version was last validated, keyed by cache key
+_reference_data_snapshot_registry: dict[str, ReferenceDataSnapshot] = {}
+_reference_data_version_checked_at_registry: dict[str, float] = {}
+# Database alias of uncommitted writes per cache key, per thread since every thread has its own connections
+_reference_data_pending_writes = threading.local()
+
+
+def _get_pending_writes() -> dict[str, str]:
+    if not hasattr(_reference_data_pending_writes, "using_by_cache_key"):
+        _reference_data_pending_writes.using_by_cache_key = {}
+    return _reference_data_pending_writes.using_by_cache_key
+
+
+def get_reference_data_cache_key(model: type[models.Model]) -> str:
+    return f"ambient_toolbox.reference_data.{model._meta.label_lower}"
+
+
+def _bump_reference_data_version(cache_key: str) -> None:
+    cache.set(cache_key, uuid.uuid4().hex, timeout=None)
+    _reference_data_version_checked_at_registry.pop(cache_key, None)
+    _get_pending_writes().pop(cache_key, None)
+
+
+def invalidate_reference_data(model: type[models.Model], using: str | None = None) -> None:
+    """
+    Bumps the version key of the given model, forcing every process to rebuild its snapshot on the next access.
+    The key is bumped once the current transaction has been committed, so no process can load the previous rows into
+    a snapshot of the new version. Until then, the writing thread reads the table from the database.
+    """
+    cache_key = get_reference_data_cache_key(model=model)
+    _get_pending_writes()[cache_key] = using or DEFAULT_DB_ALIAS
+    transaction.on_commit(functools.partial(_bump_reference_data_version, cache_key), using=using)
+
+
+def reset_reference_data(model: type[models.Model]) -> None:
+    """
+    Drops the local snapshot and pending writes of the given model, e.g. after transaction rollbacks between tests.
+    """
+    cache_key = get_reference_data_cache_key(model=model)
+    _reference_data_snapshot_registry.pop(cache_key, None)
+    _reference_data_version_checked_at_registry.pop(cache_key, None)
+    _get_pending_writes().pop(cache_key, None)
+
+
+class ReferenceDataQuerySet(GloballyVisibleQuerySet):
+    """
+    Queryset for reference data which invalidates the in-process snapshot on every bulk write.
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        invalidate_reference_data(model=self.model, using=self.db)
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        result = super().delete()
+        invalidate_reference_data(model=self.model, using=self.db)
+        return result
+
+    delete.alters_data = True
+
+    def bulk_create(self, *args, **kwargs):
+        objs = super().bulk_create(*args, **kwargs)
+        invalidate_reference_data(model=self.model, using=self.db)
+        return objs
+
+    def bulk_update(self, *args, **kwargs):
+        rows = super().bulk_update(*args, **kwargs)
+        invalidate_reference_data(model=self.model, using=self.db)
+        return rows
+
+
+class ReferenceDataManager(GetOrNoneManagerMixin, models.Manager.from_queryset(ReferenceDataQuerySet)):
+    """
+    Opt-in manager for small lookup tables (countries, categories, ...) which are queried over and over again.
+    The whole table is kept in process memory as an immutable snapshot. Simple "get()" and "filter()" calls (exact
+    lookups on concrete fields without Q-objects) are answered from memory, everything else falls back to the database.
+    Every write bumps a version key in the Django cache once it has been committed, so all processes rebuild their
+    snapshot on the next access. Objects are returned as copies, so altering them doesn't affect the snapshot.
+    """
+
+    # Seconds to trust the local snapshot before asking the cache for the current version again
+    version_check_interval: float = 0
+
+    def contribute_to_class(self, cls, name):
+        super().contribute_to_class(cls, name)
+
+        if not cls._meta.abstract:
+            dispatch_uid = f"reference_data.{cls._meta.label_lower}"
+            post_save.connect(self._invalidate_on_write, sender=cls, weak=False, dispatch_uid=dispatch_uid)
+            post_delete.connect(self._invalidate_on_write, sender=cls, weak=False, dispatch_uid=dispatch_uid)
+
+    @staticmethod
+    def _invalidate_on_write(sender, using=None, **kwargs):
+        invalidate_reference_data(model=sender, using=using)
+
+    def _get_current_version(self, cache_key: str) -> str:
+        version = cache.get(cache_key)
+        if version is None:
+            cache.add(cache_key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(cache_key)
+        return version
+
+    def _has_pending_write(self, cache_key: str) -> bool:
+        """
+        Checks if the current thread wrote to the table within a transaction which hasn't been committed yet.
+        """
+        pending_writes = _get_pending_writes()
+        using = pending_writes.get(cache_key)
+        if using is None:
+            return False
+        if transaction.get_connection(using).in_atomic_block:
+            return True
+        # Committed writes are cleared by their on-commit callback, so the transaction has been rolled back
+        del pending_writes[cache_key]
+        return False
+
+    def _build_snapshot(self, version: str) -> ReferenceDataSnapshot:
+        return ReferenceDataSnapshot(
+            objects=list(super().get_queryset()),
+            unique_fields=[field for field in self.model._meta.concrete_fields if field.unique],
+            version=version,
+        )
+
+    def get_snapshot(self) -> ReferenceDataSnapshot:
+        """
+        Returns the in-memory snapshot of the table, rebuilding it if another process changed the data.
+        """
+        cache_key = get_reference_data_cache_key(model=self.model)
+        if self._has_pending_write(cache_key):
+            # Uncommitted rows must neither be shared with other threads nor outlive a rollback
+            return self._build_snapshot(version="")
+
+        snapshot = _reference_data_snapshot_registry.get(cache_key)
+        checked_at = _reference_data_version_checked_at_registry.get(cache_key)
+
+        # Skip asking the cache if we've validated the version only recently
+        if snapshot is not None and checked_at is not None:
+            if time.monotonic() - checked_at < self.version_check_interval:
+                return snapshot
+
+        version = self._get_current_version(cache_key)
+        if snapshot is None or snapshot.version != version:
+            snapshot = self._build_snapshot(version=version)
+            _reference_data_snapshot_registry[cache_key] = snapshot
+        _reference_data_version_checked_at_registry[cache_key] = time.monotonic()
+
+        return snapshot
+
+    def _resolve_simple_lookups(self, args, kwargs) -> dict[str, object] | None:
+        """
+        Translates exact lookups on concrete fields to an attribute dict. Returns None for anything more complex.
+        Related managers, e.g. "parent.children", subclass this manager but filter by their relation, so they can't be
+        answered from the snapshot of the whole table either.
+        """
+        if args or hasattr(self, "core_filters"):
+            return None
+
+        lookup_dict = {}
+        for lookup, value in kwargs.items():
+            name = lookup.removesuffix("__exact")
+            if name == "pk":
+                field = self.model._meta.pk
+            else:
+                try:
+                    field = self.model._meta.get_field(name)
+                except FieldDoesNotExist:
+                    return None
+                # Relations are only supported via their attname, e.g. "category_id"
+                if not field.concrete or field.many_to_many or (field.is_relation and name != field.attname):
+                    return None
+            try:
+                lookup_dict[field.attname] = field.to_python(value)
+            except ValidationError:
+                return None
+
+        return lookup_dict
+
+    def get(self, *args, **kwargs):
+        lookup_dict = self._resolve_simple_lookups(args, kwargs)
+        if lookup_dict is None:
+            return super().get(*args, **kwargs)
+
+        obj_list = self.get_snapshot().lookup(lookup_dict)
+        if not obj_list:
+            raise self.model.DoesNotExist(f"{self.model._meta.object_name} matching query does not exist.")
+        if len(obj_list) > 1:
+            raise self.model.MultipleObjectsReturned(
+                f"get() returned more than one {self.model._meta.object_name} -- it returned {len(obj_list)}!"
+            )
+        return copy.copy(obj_list[0])
+
+    def filter(self, *args, **kwargs):
+        queryset = super().filter(*args, **kwargs)
+        lookup_dict = self._resolve_simple_lookups(args, kwargs)
+        if lookup_dict is not None:
+            # Pre-populate the result cache so that evaluating the queryset won't hit the database
+            queryset._result_cache = [copy.copy(obj) for obj in self.get_snapshot().lookup(lookup_dict)]
+            queryset._prefetch_done = True
+        return queryset
@@ -1,6 +1,70 @@
+import dataclasses
+import html
+import re
 import warnings
+from collections.abc import Iterable, Mapping
+from types import MappingProxyType
 
 import nh3
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+
+@dataclasses.dataclass(frozen=True)
+class SanitizerConfig:
+    """
+    Immutable allowlists of a model class, ready to be passed to "nh3".
+    """
+
+    tags: frozenset[str]
+    attributes: Mapping[str, frozenset[str]]
+    # "nh3" only accepts real dicts, so this one is never exposed for modification
+    nh3_attributes: dict[str, frozenset[str]] = dataclasses.field(repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, tags: Iterable[str], attributes: Mapping[str, Iterable[str]]) -> "SanitizerConfig":
+        nh3_attributes = {}
+        for tag, attribute_list in attributes.items():
+            if isinstance(attribute_list, (list, tuple)):
+                warnings.warn(
+                    "Please use a set instead of a list or tuple for the BleacherMixin.ALLOWED_ATTRIBUTES attribute.",
+                    category=DeprecationWarning,
+                    stacklevel=1,
+                )
+            nh3_attributes[tag] = frozenset(attribute_list)
+
+        return cls(
+            tags=frozenset(tags),
+            attributes=MappingProxyType(nh3_attributes),
+            nh3_attributes=nh3_attributes,
+        )
+
+    def clean(self, value: str) -> str:
+        return nh3.clean(value, tags=self.tags, attributes=self.nh3_attributes)
+
+    @staticmethod
+    def normalize(value: str) -> str:
+        """
+        Returns the given HTML as serialised by "nh3", e.g. with escaped entities and quoted attributes, without
+        removing any tag, attribute or URL. Every word of the value is allowed as tag, attribute and URL scheme.
+        """
+        words = set(re.findall(r"[^\s/<>=\"'`]+", value.lower()))
+        url_schemes = set(re.findall(r"[a-z][a-z0-9+.-]*", html.unescape(value).lower()))
+        return nh3.clean(
+            value,
+            tags=words,
+            # "rel" is handled by "nh3" itself for links
+            attributes={"*": words - {"rel"}},
+            clean_content_tags=set(),
+            url_schemes=url_schemes | nh3.ALLOWED_URL_SCHEMES,
+        )
+
+    def __reduce__(self):
+        # "MappingProxyType" can't be pickled, so model instances holding the config wouldn't be either
+        return self.compile, (self.tags, self.nh3_attributes)
+
+    def __deepcopy__(self, memo):
+        return self
 
 
 class BleacherMixin:
@@ -29,9 +93,17 @@ class BleacherMixin:
       * all tags: class, style, id
       * a: href, rel
       * img: alt, src
+
+    Fields are only sanitized if their value differs from the last sanitized one. Set
+    :py:attr:`BLEACH_TRUST_LOADED_VALUES` to treat values loaded from the database as sanitized, too.
+    With :py:attr:`BLEACH_VALIDATE_ONLY`, unsafe HTML raises a ``ValidationError`` instead of being rewritten. Values
+    only differing in their serialisation, e.g. an unescaped "&", are accepted and saved in their normalised form.
     """
 
     BLEACH_FIELD_LIST: list[str] = []
+    BLEACH_SKIP_UNCHANGED: bool = True
+    BLEACH_TRUST_LOADED_VALUES: bool = False
+    BLEACH_VALIDATE_ONLY: bool = False
 
     DEFAULT_ALLOWED_ATTRIBUTES: dict[str, set[str]] = {
         **nh3.ALLOWED_ATTRIBUTES,
@@ -57,28 +129,94 @@ class BleacherMixin:
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields_to_bleach = getattr(self, "BLEACH_FIELD_LIST", [])
-        self.allowed_tags = set(getattr(self, "ALLOWED_TAGS", self.DEFAULT_ALLOWED_TAGS))
-        self.allowed_attributes = getattr(self, "ALLOWED_ATTRIBUTES", self.DEFAULT_ALLOWED_ATTRIBUTES)
+        self._sanitizer_config = self.get_sanitizer_config()
+        # Last sanitized value per field. Keeping the value itself instead of a hash rules out collisions.
+        self._bleached_values = {}
 
-        for tag, attribute_list in self.allowed_attributes.items():
-            if isinstance(attribute_list, (list, tuple)):
-                self.allowed_attributes[tag] = set(attribute_list)
-                warnings.warn(
-                    "Please use a set instead of a list or tuple for the BleacherMixin.ALLOWED_ATTRIBUTES attribute.",
-                    category=DeprecationWarning,
-                    stacklevel=1,
-                )
+    @classmethod
+    def get_sanitizer_config(cls) -> SanitizerConfig:
+        """
+        Returns the frozen configuration of this model class. It's compiled once and only rebuilt if the class
+        attributes are replaced, so creating instances, e.g. when loading rows from a queryset, costs nothing extra.
+        """
+        allowed_tags = getattr(cls, "ALLOWED_TAGS", cls.DEFAULT_ALLOWED_TAGS)
+        allowed_attributes = getattr(cls, "ALLOWED_ATTRIBUTES", cls.DEFAULT_ALLOWED_ATTRIBUTES)
+
+        # Look up the cache in the class itself, since it must not be shared with subclasses
+        cached_tags, cached_attributes, config = cls.__dict__.get("_sanitizer_config_cache", (None, None, None))
+        if cached_tags is allowed_tags and cached_attributes is allowed_attributes:
+            return config
+
+        # Concurrent threads might compile the same configuration twice, which is harmless
+        config = SanitizerConfig.compile(tags=allowed_tags, attributes=allowed_attributes)
+        cls._sanitizer_config_cache = (allowed_tags, allowed_attributes, config)
+        return config
+
+    @property
+    def fields_to_bleach(self) -> list[str]:
+        return self.__dict__.get("_fields_to_bleach", self.BLEACH_FIELD_LIST)
+
+    @fields_to_bleach.setter
+    def fields_to_bleach(self, value: list[str]) -> None:
+        self._fields_to_bleach = value
+
+    @property
+    def allowed_tags(self) -> frozenset[str]:
+        return self._sanitizer_config.tags
+
+    @allowed_tags.setter
+    def allowed_tags(self, value: Iterable[str]) -> None:
+        self._set_sanitizer_config(tags=value, attributes=self._sanitizer_config.nh3_attributes)
+
+    @property
+    def allowed_attributes(self) -> Mapping[str, frozenset[str]]:
+        return self._sanitizer_config.attributes
+
+    @allowed_attributes.setter
+    def allowed_attributes(self, value: Mapping[str, Iterable[str]]) -> None:
+        self._set_sanitizer_config(tags=self._sanitizer_config.tags, attributes=value)
+
+    def _set_sanitizer_config(self, *, tags: Iterable[str], attributes: Mapping[str, Iterable[str]]) -> None:
+        """
+        Compiles a configuration for this instance only. Values sanitized with the previous one are sanitized again.
+        """
+        self._sanitizer_config = SanitizerConfig.compile(tags=tags, attributes=attributes)
+        self._bleached_values = {}
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if cls.BLEACH_TRUST_LOADED_VALUES:
+            for field_name in instance.fields_to_bleach:
+                # Deferred fields aren't loaded yet
+                if field_name in instance.__dict__:
+                    instance._bleached_values[field_name] = instance.__dict__[field_name]
+        return instance
+
+    def _is_bleached(self, field_name, value) -> bool:
+        bleached_value = self._bleached_values.get(field_name)
+        return bleached_value is not None and (bleached_value is value or bleached_value == value)
 
     def _bleach_field(self, field_name):
         str_to_bleach = getattr(self, field_name, "")
-        if str_to_bleach:
-            cleaned_value = nh3.clean(
-                str_to_bleach,
-                tags=self.allowed_tags,
-                attributes=self.allowed_attributes,
-            )
-            setattr(self, field_name, cleaned_value)
+        if not str_to_bleach:
+            return
+
+        if self.BLEACH_SKIP_UNCHANGED and self._is_bleached(field_name, str_to_bleach):
+            return
+
+        cleaned_value = self._sanitizer_config.clean(str_to_bleach)
+
+        if (
+            self.BLEACH_VALIDATE_ONLY
+            and cleaned_value != str_to_bleach
+            and cleaned_value != self._sanitizer_config.normalize(str_to_bleach)
+        ):
+            raise ValidationError({field_name: _("This field contains HTML which is not allowed.")})
+
+        setattr(self, field_name, cleaned_value)
+
+        self._bleached_values[field_name] = cleaned_value
 
     def save(self, *args, **kwargs):
         for field in self.fields_to_bleach:
@@ -1,5 +1,10 @@
+from collections.abc import Iterable
+
+from django.db import router, transaction
 from django.db.models.signals import post_save, pre_save
 
+from ambient_toolbox.context_manager import suppress_signals
+
 
 class PermissionModelMixin:
     """
@@ -16,23 +21,22 @@ class PermissionModelMixin:
 
 class SaveWithoutSignalsMixin:
     """
-    Mixin to provide a save method that temporarily unhooks all signals and restores them after save/error
+    Mixin to provide a save method that skips all "pre_save" and "post_save" receivers.
+    The signals are only suppressed for the current thread or async task, other requests still trigger them.
     """
 
     def save_without_signals(self, *args, **kwargs):
-        # Temporarily store signal receivers to restore them later
-        pre_save_receivers = pre_save.receivers
-        post_save_receivers = post_save.receivers
-
-        # Clear signal receivers to make sure, that no signal is triggered when .save() is called
-        pre_save.receivers = []
-        post_save.receivers = []
-
-        # Save without any signals
-        instance = self.save(*args, **kwargs)
-
-        # Restore signal receivers
-        pre_save.receivers = pre_save_receivers
-        post_save.receivers = post_save_receivers
-
-        return instance
+        with suppress_signals(pre_save, post_save):
+            return self.save(*args, **kwargs)
+
+    @classmethod
+    def save_many_without_signals(cls, instances: Iterable, **kwargs) -> list:
+        """
+        Saves all given instances without signals in a single transaction. Takes the same keyword arguments as
+        "save()", e.g. "update_fields".
+        """
+        instance_list = list(instances)
+        with transaction.atomic(using=router.db_for_write(cls)), suppress_signals(pre_save, post_save):
+            for instance in instance_list:
+                instance.save(**kwargs)
+        return instance_list
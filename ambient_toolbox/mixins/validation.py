@@ -1,8 +1,167 @@
+import functools
+import operator
+from collections.abc import Iterable, Iterator
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import models
+
+
+class BatchValidationError(ValidationError):
+    """
+    Validation errors of a whole batch. "errors_by_position" maps the position of every invalid instance in the batch
+    to its errors.
+    """
+
+    def __init__(self, errors_by_position: dict[int, ValidationError]) -> None:
+        self.errors_by_position = errors_by_position
+        super().__init__(list(errors_by_position.values()))
+
+
+class BatchCheck:
+    """
+    Validation of a whole batch of instances with a single query, e.g. to avoid one query per row during imports.
+    """
+
+    def get_errors(self, model: type[models.Model], instances: list[models.Model]) -> Iterator[tuple[int, dict]]:
+        """
+        Yields the position of every invalid instance together with its errors per field.
+        """
+        raise NotImplementedError
+
+
+class UniqueTogetherCheck(BatchCheck):
+    """
+    Ensures the combination of the given fields is unique, both within the batch and compared to the database.
+    Like in the database, instances with any of these fields being "None" are skipped.
+    The database is queried once per "chunk_size" distinct keys, since databases limit the number of query parameters
+    and SQLite also the depth of the OR-ed lookups.
+    """
+
+    chunk_size = 500
+
+    def __init__(self, *field_names: str) -> None:
+        super().__init__()
+        assert field_names, "Please pass at least one field name."
+        self.field_names = field_names
+
+    def get_errors(self, model: type[models.Model], instances: list[models.Model]) -> Iterator[tuple[int, dict]]:
+        attnames = [model._meta.get_field(field_name).attname for field_name in self.field_names]
+        error_key = self.field_names[0] if len(self.field_names) == 1 else NON_FIELD_ERRORS
+
+        positions_by_key = {}
+        for position, instance in enumerate(instances):
+            key = tuple(getattr(instance, attname) for attname in attnames)
+            if None not in key:
+                positions_by_key.setdefault(key, []).append(position)
+        if not positions_by_key:
+            return
+
+        existing_pks_by_key = {}
+        key_list = list(positions_by_key)
+        for start in range(0, len(key_list), self.chunk_size):
+            key_chunk = key_list[start : start + self.chunk_size]
+            if len(attnames) == 1:
+                lookup = models.Q(**{f"{attnames[0]}__in": [value for (value,) in key_chunk]})
+            else:
+                lookup = functools.reduce(operator.or_, (models.Q(**dict(zip(attnames, key))) for key in key_chunk))
+            for pk, *key in model._default_manager.filter(lookup).values_list("pk", *attnames):
+                existing_pks_by_key.setdefault(tuple(key), set()).add(pk)
+
+        for key, position_list in positions_by_key.items():
+            existing_pks = existing_pks_by_key.get(key, set())
+            for index, position in enumerate(position_list):
+                instance = instances[position]
+                # Later duplicates within the batch are invalid, existing rows only if they are the instance itself
+                if index > 0 or existing_pks - {instance.pk}:
+                    yield position, {error_key: instance.unique_error_message(model, self.field_names)}
+
+
+class ReferenceExistsCheck(BatchCheck):
+    """
+    Ensures the object referenced by the given foreign key exists.
+    """
+
+    def __init__(self, field_name: str) -> None:
+        super().__init__()
+        self.field_name = field_name
+
+    def get_errors(self, model: type[models.Model], instances: list[models.Model]) -> Iterator[tuple[int, dict]]:
+        field = model._meta.get_field(self.field_name)
+        assert field.many_to_one or field.one_to_one, f"Field '{self.field_name}' is not a foreign key."
+
+        values = {getattr(instance, field.attname) for instance in instances} - {None}
+        if not values:
+            return
+
+        target_field_name = field.remote_field.field_name
+        existing_values = set(
+            field.remote_field.model._base_manager.filter(**{f"{target_field_name}__in": values}).values_list(
+                target_field_name, flat=True
+            )
+        )
+
+        for position, instance in enumerate(instances):
+            value = getattr(instance, field.attname)
+            if value is not None and value not in existing_values:
+                yield (
+                    position,
+                    {
+                        self.field_name: ValidationError(
+                            field.error_messages["invalid"],
+                            code="invalid",
+                            params={
+                                "model": field.remote_field.model._meta.verbose_name,
+                                "pk": value,
+                                "field": target_field_name,
+                                "value": value,
+                            },
+                        )
+                    },
+                )
+
+
 class CleanOnSaveMixin:
     """
     Mixin which ensures model-level validation ("clean()") is called on saving the current instance.
+    Checks which can run for many instances at once can be declared in "BATCH_VALIDATION_CHECKS" and are used by
+    "validate_many()" and "bulk_create_validated()".
     """
 
+    BATCH_VALIDATION_CHECKS: list[BatchCheck] = []
+
     def save(self, *args, **kwargs):
         self.clean()
         super().save(*args, **kwargs)
+
+    @classmethod
+    def validate_many(cls, instances: Iterable) -> dict[int, ValidationError]:
+        """
+        Validates all given instances. Every batch check takes a single query, afterward "clean()" is called per
+        instance. Returns the errors per position of the invalid instances.
+        """
+        instance_list = list(instances)
+        error_dicts = {}
+
+        for check in cls.BATCH_VALIDATION_CHECKS:
+            for position, errors in check.get_errors(model=cls, instances=instance_list):
+                error_dicts[position] = ValidationError(errors).update_error_dict(error_dicts.get(position, {}))
+
+        for position, instance in enumerate(instance_list):
+            try:
+                instance.clean()
+            except ValidationError as e:
+                error_dicts[position] = e.update_error_dict(error_dicts.get(position, {}))
+
+        return {position: ValidationError(error_dict) for position, error_dict in sorted(error_dicts.items())}
+
+    @classmethod
+    def bulk_create_validated(cls, instances: Iterable, **kwargs) -> list:
+        """
+        Validates all given instances via "validate_many()" and creates them via "bulk_create()" if all are valid.
+        Raises a "BatchValidationError" otherwise. Keyword arguments are passed to "bulk_create()".
+        """
+        instance_list = list(instances)
+        errors_by_position = cls.validate_many(instance_list)
+        if errors_by_position:
+            raise BatchValidationError(errors_by_position)
+        return cls._default_manager.bulk_create(instance_list, **kwargs)
@@ -1,8 +1,107 @@
+import dataclasses
+import hashlib
+import json
+from collections import defaultdict
+from collections.abc import Iterable
+
 from django.contrib.auth.models import Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
+from django.db.models import Q
+
+from ambient_toolbox.permissions.fixtures.declarations import GroupPermissionDeclaration, PermissionModelDeclaration
+
+NaturalKey = tuple[str, str, str]
+
+
+def _get_declared_keys(
+    group_declaration: GroupPermissionDeclaration,
+) -> list[tuple[NaturalKey, PermissionModelDeclaration, str]]:
+    """
+    Returns the natural key of every declared permission together with its declaration, in declaration order.
+    Strings are cast to lower cases to avoid issues with SQLite.
+    """
+    return [
+        (
+            (permission_declaration.app_label.lower(), permission_declaration.model.lower(), codename.lower()),
+            permission_declaration,
+            codename,
+        )
+        for permission_declaration in group_declaration.permission_list
+        for codename in permission_declaration.codename_list
+    ]
+
+
+def _resolve_permissions(natural_keys: Iterable[NaturalKey]) -> dict[NaturalKey, Permission]:
+    """
+    Fetches all given permissions with a single query, joined to their content types.
+    """
+    codenames_by_content_type = defaultdict(set)
+    for app_label, model, codename in natural_keys:
+        codenames_by_content_type[(app_label, model)].add(codename)
+
+    if not codenames_by_content_type:
+        return {}
+
+    lookup = Q()
+    for (app_label, model), codename_set in codenames_by_content_type.items():
+        lookup |= Q(content_type__app_label=app_label, content_type__model=model, codename__in=codename_set)
+
+    return {
+        (permission.content_type.app_label, permission.content_type.model, permission.codename): permission
+        for permission in Permission.objects.select_related("content_type").filter(lookup)
+    }
+
+
+def _get_resolve_error(permission_declaration: PermissionModelDeclaration, codename: str) -> ValueError:
+    # Only queried in the error case to tell a missing content type from a missing permission
+    if not ContentType.objects.filter(
+        app_label=permission_declaration.app_label.lower(), model=permission_declaration.model.lower()
+    ).exists():
+        return ValueError(
+            f'Invalid content type "{permission_declaration.app_label}.{permission_declaration.model}" declared.'
+        )
+    return ValueError(f'Invalid permission "{permission_declaration.model}.{codename}" declared.')
 
-from ambient_toolbox.permissions.fixtures.declarations import GroupPermissionDeclaration
+
+def _get_defined_permissions(
+    group_declaration: GroupPermissionDeclaration, permission_dict: dict[NaturalKey, Permission]
+) -> list[Permission]:
+    """
+    Maps the declaration of a group to the resolved permissions. Raises a ValueError for invalid or duplicated ones.
+    """
+    defined_permission_list = []
+    defined_permission_set = set()
+    for natural_key, permission_declaration, codename in _get_declared_keys(group_declaration):
+        permission = permission_dict.get(natural_key)
+        if permission is None:
+            raise _get_resolve_error(permission_declaration=permission_declaration, codename=codename)
+        if permission in defined_permission_set:
+            raise ValueError(f"Permission {permission} declared twice.")
+        defined_permission_list.append(permission)
+        defined_permission_set.add(permission)
+    return defined_permission_list
+
+
+def _diff_permissions(
+    defined_permission_list: list[Permission], existing_permission_list: list[Permission]
+) -> tuple[list[Permission], list[Permission]]:
+    """
+    Returns the permissions to add and to remove, keeping the order of both lists.
+    """
+    defined_permission_set = set(defined_permission_list)
+    existing_permission_set = set(existing_permission_list)
+    new_permissions = [
+        permission for permission in defined_permission_list if permission not in existing_permission_set
+    ]
+    removed_permissions = [
+        permission for permission in existing_permission_list if permission not in defined_permission_set
+    ]
+    return new_permissions, removed_permissions
+
+
+def format_permission(permission: Permission) -> str:
+    return f"{permission.content_type.app_label}.{permission.codename}"
 
 
 class PermissionSetupService:
@@ -16,48 +115,21 @@ class PermissionSetupService:
         self.dry_run = dry_run
 
     @transaction.atomic
-    def process(self) -> (list[Permission], list[Permission]):  # noqa: C901
+    def process(self) -> (list[Permission], list[Permission]):
         # Fetch or create group
         group, _created = Group.objects.get_or_create(name=self.group_declaration.name)
 
-        # Declare lists where we'll sort in the permissions
-        defined_permission_list = []
-        new_permissions = []
-        removed_permissions = []
-
-        # Iterate all in fixtures defined permission models...
-        for permission_declaration in self.group_declaration.permission_list:
-            # Iterate all fixture permissions...
-            for codename in permission_declaration.codename_list:
-                # Instantiate permission as ORM object
-                try:
-                    # Cast strings to lower cases to avoid issues with SQLite
-                    new_permission = Permission.objects.get_by_natural_key(
-                        app_label=permission_declaration.app_label.lower(),
-                        codename=codename.lower(),
-                        model=permission_declaration.model.lower(),
-                    )
-                except Permission.DoesNotExist as e:
-                    raise ValueError(f'Invalid permission "{permission_declaration.model}.{codename}" declared.') from e
-                except ContentType.DoesNotExist as e:
-                    raise ValueError(
-                        f'Invalid content type "{permission_declaration.app_label}'
-                        f'.{permission_declaration.model}" declared.'
-                    ) from e
-
-                # Add permission object to list
-                if new_permission in defined_permission_list:
-                    raise ValueError(f"Permission {new_permission} declared twice.")
-                defined_permission_list.append(new_permission)
-
-                # Check if permission is already set in the group
-                if new_permission not in group.permissions.all():
-                    new_permissions.append(new_permission)
-
-        # Check which permissions were removed for the given group
-        for existing_permission in group.permissions.all():
-            if existing_permission not in defined_permission_list:
-                removed_permissions.append(existing_permission)  # noqa: PERF401
+        # Resolve all declared permissions at once
+        permission_dict = _resolve_permissions(
+            natural_key for natural_key, _, _ in _get_declared_keys(self.group_declaration)
+        )
+        defined_permission_list = _get_defined_permissions(self.group_declaration, permission_dict)
+
+        # Diff declared against existing permissions of the group
+        new_permissions, removed_permissions = _diff_permissions(
+            defined_permission_list=defined_permission_list,
+            existing_permission_list=list(group.permissions.all()),
+        )
 
         if not self.dry_run:
             # Persist changes on removed permissions
@@ -70,3 +142,141 @@ class PermissionSetupService:
 
         # Return changes
         return new_permissions, removed_permissions
+
+
+@dataclasses.dataclass
+class GroupPermissionPlan:
+    """
+    Changes needed to bring a single group in line with its declaration.
+    """
+
+    group_name: str
+    group: Group | None
+    new_permissions: list[Permission] = dataclasses.field(default_factory=list)
+    removed_permissions: list[Permission] = dataclasses.field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return self.group is None or bool(self.new_permissions or self.removed_permissions)
+
+    def as_dict(self) -> dict:
+        return {
+            "group": self.group_name,
+            "created": self.group is None,
+            "added": [format_permission(permission) for permission in self.new_permissions],
+            "removed": [format_permission(permission) for permission in self.removed_permissions],
+        }
+
+
+class PermissionFixturePlanService:
+    """
+    Computes the changes of all group declarations at once with a fixed number of queries, independent of the number
+    of groups and permissions. The plan is applied in a single transaction.
+    """
+
+    group_declaration_list: list[GroupPermissionDeclaration]
+    dry_run: bool
+
+    def __init__(self, group_declaration_list: Iterable[GroupPermissionDeclaration], dry_run: bool = False) -> None:
+        super().__init__()
+
+        self.group_declaration_list = list(group_declaration_list)
+        self.dry_run = dry_run
+
+        group_name_set = set()
+        for group_name in self.get_group_names():
+            if group_name in group_name_set:
+                raise ValueError(f'Group "{group_name}" declared twice.')
+            group_name_set.add(group_name)
+
+    def get_group_names(self) -> list[str]:
+        return [group_declaration.name for group_declaration in self.group_declaration_list]
+
+    def get_plan(self) -> list[GroupPermissionPlan]:
+        group_dict = {group.name: group for group in Group.objects.filter(name__in=self.get_group_names())}
+
+        permission_dict = _resolve_permissions(
+            natural_key
+            for group_declaration in self.group_declaration_list
+            for natural_key, _, _ in _get_declared_keys(group_declaration)
+        )
+
+        existing_permission_dict = defaultdict(list)
+        group_permission_queryset = (
+            Group.permissions.through.objects.filter(group__in=group_dict.values())
+            .select_related("permission__content_type")
+            .order_by("permission__content_type__app_label", "permission__content_type__model", "permission__codename")
+        )
+        for group_permission in group_permission_queryset:
+            existing_permission_dict[group_permission.group_id].append(group_permission.permission)
+
+        plan = []
+        for group_declaration in self.group_declaration_list:
+            group = group_dict.get(group_declaration.name)
+            new_permissions, removed_permissions = _diff_permissions(
+                defined_permission_list=_get_defined_permissions(group_declaration, permission_dict),
+                existing_permission_list=existing_permission_dict[group.pk] if group else [],
+            )
+            plan.append(
+                GroupPermissionPlan(
+                    group_name=group_declaration.name,
+                    group=group,
+                    new_permissions=new_permissions,
+                    removed_permissions=removed_permissions,
+                )
+            )
+        return plan
+
+    def apply(self, plan: list[GroupPermissionPlan]) -> None:
+        """
+        Persists the plan with one delete and one insert for all groups. Note that this doesn't send "m2m_changed".
+        """
+        changed_plan = [group_plan for group_plan in plan if group_plan.has_changes]
+        if not changed_plan:
+            return
+
+        through_model = Group.permissions.through
+        removal_lookup = Q()
+        new_group_permission_list = []
+
+        with transaction.atomic():
+            for group_plan in changed_plan:
+                group = group_plan.group or Group.objects.get_or_create(name=group_plan.group_name)[0]
+                if group_plan.removed_permissions:
+                    removal_lookup |= Q(group=group, permission__in=group_plan.removed_permissions)
+                new_group_permission_list.extend(
+                    through_model(group=group, permission=permission) for permission in group_plan.new_permissions
+                )
+
+            if removal_lookup:
+                through_model.objects.filter(removal_lookup).delete()
+            if new_group_permission_list:
+                through_model.objects.bulk_create(new_group_permission_list, ignore_conflicts=True)
+
+    def get_checksum(self) -> str:
+        """
+        Fingerprint of the declarations and the current group permissions in the database.
+        It hashes the sorted "(group name, group id, permission id)" rows of the declared groups, fetched with a single
+        query, so manual changes to the declared groups are detected as well.
+        """
+        declaration_data = sorted(
+            [
+                group_declaration.name,
+                sorted(natural_key for natural_key, _, _ in _get_declared_keys(group_declaration)),
+            ]
+            for group_declaration in self.group_declaration_list
+        )
+        # Groups without permissions are contained with a permission id of None
+        group_permission_state = sorted(
+            Group.objects.filter(name__in=self.get_group_names()).values_list("name", "pk", "permissions"),
+            key=lambda row: (row[0], row[1], row[2] or 0),
+        )
+
+        checksum_data = json.dumps([declaration_data, group_permission_state])
+        return hashlib.sha256(checksum_data.encode()).hexdigest()
+
+    def process(self) -> list[GroupPermissionPlan]:
+        plan = self.get_plan()
+        if not self.dry_run:
+            self.apply(plan)
+        return plan
@@ -0,0 +1,171 @@
+import dataclasses
+import functools
+import inspect
+import typing
+
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Manager, QuerySet
+from django.db.models.expressions import RawSQL
+from django.db.models.query import ModelIterable
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledSqlTemplate:
+    """
+    SQL of a queryset selecting only primary keys, with the positions of all parameters depending on the argument.
+    """
+
+    sql: str
+    params: tuple
+    argument_positions: tuple[int, ...]
+
+    def bind(self, value) -> list:
+        params = list(self.params)
+        for position in self.argument_positions:
+            params[position] = value
+        return params
+
+
+def _get_sentinel(value: int | str) -> int | str:
+    """
+    Returns a different value of the same type to detect which SQL parameters depend on the argument.
+    """
+    return value + 1 if isinstance(value, int) else f"{value}_"
+
+
+def _compile_pk_sql(queryset: QuerySet) -> tuple[str, tuple] | None:
+    if queryset.query.is_sliced:
+        return None
+    query = queryset.order_by().values("pk").query
+    try:
+        sql, params = query.get_compiler(using=queryset.db).as_sql()
+    except EmptyResultSet:
+        return None
+    return sql, tuple(params)
+
+
+def _only_filters_rows(queryset: QuerySet) -> bool:
+    """
+    Returns whether the queryset only filters the rows of its model. Anything else, like ordering or annotations,
+    would be lost when replacing it with a "pk__in" filter on the cached SQL.
+    """
+    query = queryset.query
+    return (
+        queryset._iterable_class is ModelIterable
+        and not queryset._prefetch_related_lookups
+        and not query.annotations
+        and not query.extra
+        and not query.order_by
+        and not query.extra_order_by
+        and query.default_ordering
+        and not query.select_related
+        and not query.distinct_fields
+        and not query.select_for_update
+        and query.deferred_loading == (frozenset(), True)
+    )
+
+
+def _build_template(queryset: QuerySet, probe_queryset: QuerySet, value, sentinel) -> CompiledSqlTemplate | None:
+    """
+    Compares the SQL of two querysets which only differ in their argument. Returns None if the shape of the query
+    depends on the argument, if the argument can't be mapped 1:1 to SQL parameters or if the querysets do more than
+    filtering rows.
+    """
+    if not _only_filters_rows(queryset) or not _only_filters_rows(probe_queryset):
+        return None
+
+    compiled = _compile_pk_sql(queryset)
+    compiled_probe = _compile_pk_sql(probe_queryset)
+    if compiled is None or compiled_probe is None:
+        return None
+
+    (sql, params), (probe_sql, probe_params) = compiled, compiled_probe
+    if sql != probe_sql or len(params) != len(probe_params):
+        return None
+
+    argument_positions = tuple(
+        position for position, (param, probe_param) in enumerate(zip(params, probe_params)) if param != probe_param
+    )
+    if not argument_positions or any(
+        params[position] != value or probe_params[position] != sentinel for position in argument_positions
+    ):
+        return None
+
+    return CompiledSqlTemplate(sql=sql, params=params, argument_positions=argument_positions)
+
+
+def cache_compiled_sql(
+    argument_name: str = "user_id", shape_key: typing.Callable | None = None
+) -> typing.Callable[[typing.Callable], typing.Callable]:
+    """
+    Decorator for selector or queryset methods which only filter rows, like "visible_for(user_id)".
+    On the first call, the resulting SQL is compiled once for the given argument and once for a sentinel value to find
+    the parameters depending on it. Later calls skip building and compiling the nested ORM query and only rebind these
+    parameters. The result is a queryset filtered via "pk__in" on the cached SQL, so it can be chained as usual.
+    If the argument isn't an int or string, if the SQL differs between both compilations, if the method returns a
+    queryset doing more than filtering rows, e.g. ordering, annotating or "select_related()", or if building the
+    template raises any exception, the method is always executed as-is.
+    The shape of the query is only compared once per cache key. If the query differs for certain argument values,
+    e.g. for superusers, passing "shape_key" is mandatory. Otherwise, later calls taking another branch silently get
+    the cached SQL of the first call.
+    """
+
+    def decorator(method: typing.Callable) -> typing.Callable:
+        signature = inspect.signature(method)
+        template_dict: dict[tuple, CompiledSqlTemplate | None] = {}
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound_arguments = signature.bind(self, *args, **kwargs)
+            bound_arguments.apply_defaults()
+            arguments = dict(bound_arguments.arguments)
+            del arguments[next(iter(signature.parameters))]
+            value = arguments.pop(argument_name)
+
+            if isinstance(value, bool) or not isinstance(value, int | str):
+                return method(self, *args, **kwargs)
+
+            if isinstance(self, Manager):
+                owner, base_queryset = self, self.model._default_manager.get_queryset()
+            else:
+                # Build the template on an unfiltered queryset, so it doesn't depend on previously chained filters
+                owner, base_queryset = self.__class__(model=self.model, using=self._db), self
+
+            try:
+                cache_key = (
+                    base_queryset.model,
+                    base_queryset.db,
+                    shape_key(value) if shape_key else None,
+                    tuple(sorted(arguments.items())),
+                )
+                hash(cache_key)
+            except TypeError:
+                return method(self, *args, **kwargs)
+
+            if cache_key not in template_dict:
+                sentinel = _get_sentinel(value)
+                try:
+                    queryset = method(owner, **arguments, **{argument_name: value})
+                    template_dict[cache_key] = (
+                        _build_template(
+                            queryset=queryset,
+                            probe_queryset=method(owner, **arguments, **{argument_name: sentinel}),
+                            value=value,
+                            sentinel=sentinel,
+                        )
+                        if queryset.model is base_queryset.model
+                        else None
+                    )
+                except Exception:  # noqa: BLE001
+                    # The method can't handle the made-up sentinel, e.g. because it looks up the user
+                    template_dict[cache_key] = None
+
+            template = template_dict[cache_key]
+            if template is None:
+                return method(self, *args, **kwargs)
+            return base_queryset.filter(pk__in=RawSQL(template.sql, template.bind(value)))
+
+        wrapper.compiled_sql_templates = template_dict
+        return wrapper
+
+    return decorator
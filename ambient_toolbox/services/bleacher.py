@@ -0,0 +1,144 @@
+import dataclasses
+import functools
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import models, transaction
+
+from ambient_toolbox.mixins.bleacher import BleacherMixin, SanitizerConfig
+
+
+@dataclasses.dataclass
+class RebleachProgress:
+    """
+    Progress of a running re-bleach. "last_pk" can be passed as "start_after_pk" to resume an aborted run.
+    """
+
+    processed: int = 0
+    changed: int = 0
+    last_pk: typing.Any = None
+    started_at: float = dataclasses.field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+class RebleachService:
+    """
+    Sanitizes all existing rows of a model using the "BleacherMixin" again, e.g. after tightening "ALLOWED_TAGS".
+    Rows are streamed in chunks ordered by primary key, so a run can be resumed after the last processed key.
+    The HTML is sanitized in a thread pool ("nh3" releases the GIL) and only rows whose output changed are written back
+    via "bulk_update()". Note that neither "save()" nor any signals are called.
+    """
+
+    model: type[BleacherMixin] = None
+    chunk_size: int = 1000
+    workers: int = 4
+    dry_run: bool = False
+
+    def __init__(
+        self,
+        *,
+        model: type[BleacherMixin] | None = None,
+        chunk_size: int | None = None,
+        workers: int | None = None,
+        dry_run: bool | None = None,
+    ) -> None:
+        super().__init__()
+
+        self.model = model or self.model
+        self.chunk_size = chunk_size or self.chunk_size
+        self.workers = workers or self.workers
+        self.dry_run = self.dry_run if dry_run is None else dry_run
+
+        assert self.model, "Please set the attribute 'model'."
+        assert issubclass(self.model, BleacherMixin), f"Model '{self.model._meta.label}' doesn't use the BleacherMixin."
+        assert self.model.BLEACH_FIELD_LIST, f"Model '{self.model._meta.label}' doesn't define a BLEACH_FIELD_LIST."
+
+    def get_queryset(self) -> models.QuerySet:
+        """
+        Rows to re-bleach. Can be overwritten to e.g. restrict the run to recently changed rows.
+        """
+        return self.model._default_manager.all()
+
+    @staticmethod
+    def _sanitize_row(config: SanitizerConfig, field_list: list[str], obj: models.Model) -> bool:
+        """
+        Sanitizes the given fields of a single row in place. Returns whether any value changed.
+        """
+        changed = False
+        for field_name in field_list:
+            value = getattr(obj, field_name)
+            if not value:
+                continue
+            cleaned_value = config.clean(value)
+            if cleaned_value != value:
+                setattr(obj, field_name, cleaned_value)
+                changed = True
+        return changed
+
+    def _process_chunk(
+        self, executor: ThreadPoolExecutor, config: SanitizerConfig, start_after_pk
+    ) -> tuple[int, int, typing.Any]:
+        field_list = list(self.model.BLEACH_FIELD_LIST)
+        queryset = self.get_queryset().only("pk", *field_list).order_by("pk")
+        if start_after_pk is not None:
+            queryset = queryset.filter(pk__gt=start_after_pk)
+
+        with transaction.atomic():
+            # Lock the chunk, so no concurrent change is overwritten with an outdated value
+            object_list = list(queryset.select_for_update()[: self.chunk_size])
+            if not object_list:
+                return 0, 0, start_after_pk
+
+            changed_list = [
+                obj
+                for obj, changed in zip(
+                    object_list,
+                    executor.map(functools.partial(self._sanitize_row, config, field_list), object_list),
+                )
+                if changed
+            ]
+
+            if changed_list and not self.dry_run:
+                self.model._default_manager.bulk_update(changed_list, fields=field_list)
+
+        return len(object_list), len(changed_list), object_list[-1].pk
+
+    def process(
+        self,
+        *,
+        start_after_pk=None,
+        progress_callback: typing.Callable[[RebleachProgress], None] | None = None,
+    ) -> RebleachProgress:
+        """
+        Re-bleaches all rows after the given primary key. The callback is called after every chunk.
+        """
+        config = self.model.get_sanitizer_config()
+        progress = RebleachProgress(last_pk=start_after_pk)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                processed, changed, last_pk = self._process_chunk(
+                    executor=executor, config=config, start_after_pk=progress.last_pk
+                )
+                if not processed:
+                    break
+
+                progress.processed += processed
+                progress.changed += changed
+                progress.last_pk = last_pk
+                if progress_callback:
+                    progress_callback(progress)
+
+                if processed < self.chunk_size:
+                    break
+
+        return progress
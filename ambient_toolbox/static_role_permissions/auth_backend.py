@@ -1,6 +1,10 @@
 from django.contrib.auth.backends import ModelBackend
 
-from ambient_toolbox.static_role_permissions.permissions import load_static_role_permissions
+from ambient_toolbox.static_role_permissions.index import (
+    StaticRolePermissionIndex,
+    get_static_role_permission_index,
+)
+from ambient_toolbox.static_role_permissions.permissions import get_user_roles
 
 
 class StaticRolePermissionBackend(ModelBackend):
@@ -31,27 +35,88 @@ class StaticRolePermissionBackend(ModelBackend):
     user.role = "admin"
 
     user.has_perm("auth.add_user") -> True
+
+    Roles can inherit from each other and permissions may contain wildcards like "auth.*". The definition is compiled
+    once per process into a shared index, so "has_perm()" is a single bit test.
+
+    Users with multiple roles can provide a `roles` attribute (an iterable of role keys) instead of `role`.
+    Their combined permissions are cached as a bitmask on the user object, similar to Django's "_perm_cache".
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._static_permissions_cache = None
+    def _get_roles(self, user_obj, obj=None) -> tuple:
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return ()
+
+        return get_user_roles(user_obj)
+
+    def _get_permission_mask(self, user_obj, roles: tuple) -> tuple[StaticRolePermissionIndex, int]:
+        """
+        Returns the current index and the combined bitmask of the given roles, which is cached on the user object.
+        The cache is bound to the index and the roles, so it's invalidated once either of them changes.
+        """
+        permission_index = get_static_role_permission_index()
 
-    def _get_static_role_permissions(self):
-        if self._static_permissions_cache is None:
-            self._static_permissions_cache = load_static_role_permissions()
-        return self._static_permissions_cache
+        cached_index, cached_roles, cached_mask = getattr(user_obj, "_static_role_permission_mask_cache", (None, (), 0))
+        if cached_index is not permission_index or cached_roles != roles:
+            cached_mask = permission_index.get_mask(roles)
+            user_obj._static_role_permission_mask_cache = (permission_index, roles, cached_mask)
 
-    def _get_permissions_for_role(self, role: str) -> set[str]:
-        role_permissions_dict = self._get_static_role_permissions()
-        return role_permissions_dict.get(role, set())
+        return permission_index, cached_mask
 
     def get_all_permissions(self, user_obj, obj=None):
-        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+        roles = self._get_roles(user_obj, obj)
+        if not roles:
             return set()
-        role = getattr(user_obj, "role", None)
 
-        if role is None:
-            return set()
+        permission_index = get_static_role_permission_index()
+        return frozenset().union(*(permission_index.get_permissions(role) for role in roles))
+
+    def has_perm(self, user_obj, perm, obj=None):
+        roles = self._get_roles(user_obj, obj)
+        if not roles:
+            return False
+
+        permission_index, mask = self._get_permission_mask(user_obj, roles)
+        return permission_index.mask_has_perm(mask, perm)
+
+    def has_perms(self, user_obj, perm_list, obj=None) -> bool:
+        """
+        Checks multiple permissions at once with a single bit test.
+        """
+        roles = self._get_roles(user_obj, obj)
+        if not roles:
+            return False
+
+        permission_index, mask = self._get_permission_mask(user_obj, roles)
+        return permission_index.mask_has_perms(mask, perm_list)
+
+
+class StaticRoleAndGroupPermissionBackend(StaticRolePermissionBackend):
+    """
+    Combines the static role permissions with the group permissions stored in the database.
+
+    Static permissions are checked first. Group permissions are only loaded if a permission isn't granted by the
+    roles, with a single query per user object. They are cached on the user object by the "ModelBackend".
+    Permissions assigned to individual users are not taken into account.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        return {*super().get_all_permissions(user_obj, obj), *self.get_group_permissions(user_obj, obj)}
+
+    def has_perm(self, user_obj, perm, obj=None):
+        return super().has_perm(user_obj, perm, obj) or perm in self.get_group_permissions(user_obj, obj)
+
+    def has_perms(self, user_obj, perm_list, obj=None) -> bool:
+        """
+        Checks multiple permissions in one pass. The database is only queried for permissions missing in the roles.
+        """
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return False
+
+        missing_permissions = set(perm_list)
+        roles = self._get_roles(user_obj)
+        if roles:
+            permission_index, mask = self._get_permission_mask(user_obj, roles)
+            missing_permissions = {perm for perm in perm_list if not permission_index.mask_has_perm(mask, perm)}
 
-        return self._get_permissions_for_role(role)
+        return not missing_permissions or missing_permissions <= self.get_group_permissions(user_obj)
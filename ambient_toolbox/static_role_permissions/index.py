@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+from collections.abc import Hashable, Iterable, Mapping
+from fnmatch import fnmatchcase
+from types import MappingProxyType
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from ambient_toolbox.static_role_permissions.permissions import (
+    collect_model_permissions,
+    get_role_definition,
+    get_static_role_permissions_version,
+    load_static_role_permissions,
+)
+from ambient_toolbox.static_role_permissions.settings import get_static_role_permissions_reload_interval
+
+
+class StaticRolePermissionIndex:
+    """
+    Immutable lookup table of all permissions per role.
+    Wildcards are already expanded and inherited permissions are flattened, so a check is a single set lookup.
+    Additionally, every permission is interned to a bit position and every role is stored as an integer bitmask.
+    This way, the permissions of users with multiple roles are a bitwise OR and every check is a bit test.
+    """
+
+    __slots__ = ("permission_bits", "role_masks", "role_permissions")
+
+    def __init__(self, role_permissions: Mapping[Hashable, frozenset[str]]) -> None:
+        all_permissions = sorted(set().union(*role_permissions.values()))
+        permission_bits = {permission: 1 << position for position, permission in enumerate(all_permissions)}
+        role_masks = {
+            role: sum(permission_bits[permission] for permission in permissions)
+            for role, permissions in role_permissions.items()
+        }
+
+        object.__setattr__(self, "role_permissions", MappingProxyType(dict(role_permissions)))
+        object.__setattr__(self, "permission_bits", MappingProxyType(permission_bits))
+        object.__setattr__(self, "role_masks", MappingProxyType(role_masks))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("StaticRolePermissionIndex is immutable.")
+
+    def get_permissions(self, role: Hashable) -> frozenset[str]:
+        return self.role_permissions.get(role, frozenset())
+
+    def has_perm(self, role: Hashable, perm: str) -> bool:
+        return perm in self.role_permissions.get(role, ())
+
+    def get_mask(self, roles: Iterable[Hashable]) -> int:
+        """
+        Combines the permissions of all given roles into a single bitmask.
+        """
+        mask = 0
+        for role in roles:
+            mask |= self.role_masks.get(role, 0)
+        return mask
+
+    def get_required_mask(self, perm_list: Iterable[str]) -> int | None:
+        """
+        Returns the bitmask of all given permissions. None means at least one permission isn't granted to any role.
+        """
+        required_mask = 0
+        for perm in perm_list:
+            bit = self.permission_bits.get(perm)
+            if bit is None:
+                return None
+            required_mask |= bit
+        return required_mask
+
+    def mask_has_perm(self, mask: int, perm: str) -> bool:
+        return bool(mask & self.permission_bits.get(perm, 0))
+
+    def mask_has_perms(self, mask: int, perm_list: Iterable[str]) -> bool:
+        required_mask = self.get_required_mask(perm_list)
+        return required_mask is not None and mask & required_mask == required_mask
+
+
+def expand_permission_pattern(permission: str, model_permissions: set[str]) -> set[str]:
+    """
+    Expands wildcards like "app_label.*" or "app_label.view_*" against all known model permissions.
+    Permissions without a wildcard are taken as they are.
+    """
+    if "*" not in permission:
+        return {permission}
+    return {model_permission for model_permission in model_permissions if fnmatchcase(model_permission, permission)}
+
+
+def compile_static_role_permissions(
+    role_permissions_dict: dict, model_permissions: set[str]
+) -> StaticRolePermissionIndex:
+    """
+    Expands all wildcards and flattens the role inheritance of the given definition into frozensets.
+    """
+    role_definitions = {role: get_role_definition(definition) for role, definition in role_permissions_dict.items()}
+    compiled_permissions = {}
+
+    def compile_role(role: Hashable, path: tuple) -> frozenset[str]:
+        if role in compiled_permissions:
+            return compiled_permissions[role]
+        if role in path:
+            raise ImproperlyConfigured(f"Static role permissions contain circular inheritance: {(*path, role)}.")
+        if role not in role_definitions:
+            raise ImproperlyConfigured(f"Static role '{path[-1]}' inherits from unknown role '{role}'.")
+
+        permissions, parent_roles = role_definitions[role]
+        role_permissions = set()
+        for permission in permissions:
+            role_permissions |= expand_permission_pattern(permission, model_permissions)
+        for parent_role in parent_roles:
+            role_permissions |= compile_role(parent_role, (*path, role))
+
+        compiled_permissions[role] = frozenset(role_permissions)
+        return compiled_permissions[role]
+
+    for role in role_definitions:
+        compile_role(role, ())
+
+    return StaticRolePermissionIndex(role_permissions=compiled_permissions)
+
+
+logger = logging.getLogger(__name__)
+
+_static_role_permission_index: StaticRolePermissionIndex | None = None
+_static_role_permission_version: tuple[int, int] | None = None
+_next_version_check: float = 0.0
+_compile_lock = threading.Lock()
+
+
+def _compile_static_role_permission_index() -> tuple[StaticRolePermissionIndex, tuple[int, int] | None]:
+    # Take the version first, so a change during compilation triggers another reload
+    version = get_static_role_permissions_version()
+    permission_index = compile_static_role_permissions(
+        role_permissions_dict=load_static_role_permissions(),
+        model_permissions=collect_model_permissions(apps.get_app_configs()),
+    )
+    return permission_index, version
+
+
+def _reload_static_role_permission_index() -> None:
+    """
+    Recompiles the index if the definition file has changed. The new index replaces the old one in a single
+    assignment, so concurrent permission checks always see a complete index. An invalid file keeps the old index.
+    """
+    global _static_role_permission_index, _static_role_permission_version
+
+    if not _compile_lock.acquire(blocking=False):
+        # Another thread is already reloading, keep serving the current index in the meantime
+        return
+
+    try:
+        if get_static_role_permissions_version() == _static_role_permission_version:
+            return
+        permission_index, version = _compile_static_role_permission_index()
+        _static_role_permission_index, _static_role_permission_version = permission_index, version
+    except Exception:
+        logger.exception("Reloading static role permissions failed, keeping the current definition.")
+    finally:
+        _compile_lock.release()
+
+
+def get_static_role_permission_index() -> StaticRolePermissionIndex:
+    """
+    Returns the process-wide permission index. It's compiled on first use and shared by all backend instances.
+    If the definition is loaded from a file, it's checked for changes every STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL
+    seconds and recompiled if necessary.
+    """
+    global _static_role_permission_index, _static_role_permission_version, _next_version_check  # noqa: PLW0603
+
+    if _static_role_permission_index is None:
+        with _compile_lock:
+            if _static_role_permission_index is None:
+                _static_role_permission_index, _static_role_permission_version = _compile_static_role_permission_index()
+                _next_version_check = 0.0
+        return _static_role_permission_index
+
+    reload_interval = get_static_role_permissions_reload_interval()
+    if _static_role_permission_version is not None and reload_interval is not None:
+        now = time.monotonic()
+        if now >= _next_version_check:
+            _next_version_check = now + reload_interval
+            _reload_static_role_permission_index()
+
+    return _static_role_permission_index
+
+
+@receiver(setting_changed)
+def reset_static_role_permission_index(*, setting: str | None = None, **kwargs) -> None:
+    """
+    Drops the compiled index, e.g. when the permission definition changes in a test.
+    """
+    global _static_role_permission_index, _static_role_permission_version  # noqa: PLW0603
+
+    if setting in (
+        None,
+        "STATIC_ROLE_PERMISSIONS_PATH",
+        "STATIC_ROLE_PERMISSIONS_FILE",
+        "STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL",
+    ):
+        _static_role_permission_index = None
+        _static_role_permission_version = None
@@ -1,11 +1,23 @@
+import json
+import os
+from pathlib import Path
+
+from django.apps import AppConfig
+from django.contrib.auth import get_permission_codename
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.module_loading import import_string
 
-from ambient_toolbox.static_role_permissions.settings import get_static_role_permissions_path
+from ambient_toolbox.static_role_permissions.settings import (
+    get_static_role_permissions_file,
+    get_static_role_permissions_path,
+)
 
 
 def load_static_role_permissions() -> dict[str, set[str]]:
     """
     Load static definition of permissions by role.
+    Instead of a set, a role can be defined as a dict to inherit the permissions of other roles.
+    Permissions may contain wildcards like "app_label.*".
 
     Example:
     {
@@ -15,11 +27,16 @@ def load_static_role_permissions() -> dict[str, set[str]]:
             ...
         },
         "role_2": {
-            "app_label.permission",
-            "app_label.permission",
-            ...
+            "inherits": ["role_1"],
+            "permissions": {"other_app_label.*", ...},
         },
+
+    If STATIC_ROLE_PERMISSIONS_FILE is set, the definition is read from this JSON or TOML file instead.
     """
+    file_path = get_static_role_permissions_file()
+    if file_path:
+        return load_static_role_permissions_file(file_path)
+
     dotted_path = get_static_role_permissions_path()
     assert dotted_path, "STATIC_ROLE_PERMISSIONS_PATH is not set in settings.py"
 
@@ -27,3 +44,85 @@ def load_static_role_permissions() -> dict[str, set[str]]:
     assert isinstance(permission, dict), "STATIC_ROLE_PERMISSIONS_PATH must point to a dict"
 
     return permission
+
+
+def load_static_role_permissions_file(file_path: str | os.PathLike) -> dict:
+    """
+    Reads the definition of permissions by role from a JSON or TOML file.
+    Permissions are given as lists, since neither format knows sets.
+    """
+    file_path = Path(file_path)
+    suffix = file_path.suffix.lower()
+    assert suffix in (".json", ".toml"), "STATIC_ROLE_PERMISSIONS_FILE must be a .json or .toml file"
+
+    if suffix == ".json":
+        with file_path.open(encoding="utf-8") as f:
+            permission = json.load(f)
+    else:
+        try:
+            import tomllib  # noqa: PLC0415
+        except ImportError as e:  # pragma: no cover
+            raise ImproperlyConfigured("Loading STATIC_ROLE_PERMISSIONS_FILE from TOML requires Python 3.11+.") from e
+        with file_path.open("rb") as f:
+            permission = tomllib.load(f)
+
+    assert isinstance(permission, dict), "STATIC_ROLE_PERMISSIONS_FILE must contain an object / table"
+
+    return permission
+
+
+def get_static_role_permissions_version() -> tuple[int, int] | None:
+    """
+    Cheap fingerprint of the permission definition to detect changes, based on the file's mtime and size.
+    Definitions imported from a Python module can't change at runtime, so they don't have a version.
+    """
+    file_path = get_static_role_permissions_file()
+    if not file_path:
+        return None
+
+    stat_result = os.stat(file_path)
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def get_user_roles(user_obj) -> tuple:
+    """
+    Roles of the given user, taken from a `roles` iterable or from a single `role` attribute.
+    """
+    roles = getattr(user_obj, "roles", None)
+    if roles is not None:
+        return tuple(roles)
+
+    role = getattr(user_obj, "role", None)
+    return () if role is None else (role,)
+
+
+def get_role_definition(role_definition: set[str] | dict) -> tuple[set[str], list]:
+    """
+    Splits the definition of a single role into its own permissions and the roles it inherits from.
+    """
+    if isinstance(role_definition, dict):
+        return set(role_definition.get("permissions", set())), list(role_definition.get("inherits", []))
+    return set(role_definition), []
+
+
+def collect_model_permissions(app_configs: list[AppConfig]) -> set[str]:
+    """
+    Go through all apps/models and collect default + custom permissions.
+    """
+    all_model_permissions = set()
+
+    for app_config in app_configs:
+        # iterate over all models in all apps
+        for klass in app_config.get_models():
+            opts = klass._meta
+            app_label = app_config.label
+
+            # collect default permissions
+            for action in opts.default_permissions:
+                codename = get_permission_codename(action, opts)
+                all_model_permissions.add(f"{app_label}.{codename}")
+            # collect custom permissions
+            for codename, _ in opts.permissions:
+                all_model_permissions.add(f"{app_label}.{codename}")
+
+    return all_model_permissions
@@ -0,0 +1,172 @@
+import dataclasses
+from collections.abc import Hashable, Mapping
+from types import MappingProxyType
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Q, QuerySet
+
+from ambient_toolbox.managers import AbstractUserSpecificQuerySet
+from ambient_toolbox.static_role_permissions.permissions import get_user_roles
+
+# Placeholder for roles which may access all rows
+ALL_ROWS = "__all_rows__"
+
+
+class UserAttribute:
+    """
+    Placeholder in a row rule which is replaced with an attribute of the requesting user, e.g. "tenant_id".
+    Dotted paths like "profile.tenant_id" are supported. If an object on the way is None or a related object doesn't
+    exist, the value is None as well.
+    """
+
+    __slots__ = ("_names", "path")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._names = tuple(path.split("."))
+
+    def __repr__(self) -> str:
+        return f"UserAttribute({self.path!r})"
+
+    def resolve(self, user):
+        value = user
+        for name in self._names:
+            if value is None:
+                return None
+            try:
+                value = getattr(value, name)
+            except ObjectDoesNotExist:
+                return None
+        return value
+
+
+@dataclasses.dataclass(frozen=True)
+class CompiledRowRule:
+    """
+    A single row rule, split into a constant "Q" object and the lookups depending on the user.
+    """
+
+    static_q: Q | None
+    user_lookups: tuple[tuple[str, UserAttribute], ...]
+
+    def bind(self, user) -> Q | None:
+        """
+        Returns the filter for the given user. None if a user attribute is None, since e.g. "tenant=None" would
+        otherwise match all rows without a tenant.
+        """
+        lookups = {}
+        for lookup, attribute in self.user_lookups:
+            value = attribute.resolve(user)
+            if value is None:
+                return None
+            lookups[lookup] = value
+
+        if not lookups:
+            return self.static_q
+        user_q = Q(**lookups)
+        return user_q if self.static_q is None else self.static_q & user_q
+
+
+def compile_row_rule(rule: Mapping | Q) -> CompiledRowRule:
+    if isinstance(rule, Q):
+        return CompiledRowRule(static_q=rule, user_lookups=())
+
+    assert isinstance(rule, Mapping) and rule, "Row rules have to be a non-empty dict, a Q object or a list of them."
+
+    static_lookups = {lookup: value for lookup, value in rule.items() if not isinstance(value, UserAttribute)}
+    user_lookups = tuple((lookup, value) for lookup, value in rule.items() if isinstance(value, UserAttribute))
+    return CompiledRowRule(static_q=Q(**static_lookups) if static_lookups else None, user_lookups=user_lookups)
+
+
+def compile_role_rules(role_rule) -> tuple[CompiledRowRule, ...] | str:
+    """
+    Compiles the rules of a single role. A role may be given a single rule, a list of rules or ALL_ROWS.
+    """
+    if role_rule == ALL_ROWS:
+        return ALL_ROWS
+    if isinstance(role_rule, list | tuple):
+        return tuple(compile_row_rule(rule) for rule in role_rule)
+    return (compile_row_rule(role_rule),)
+
+
+class RowRules:
+    """
+    Declarative row-level rules per static role, which are compiled once into "Q" objects.
+
+    Example:
+    RowRules({
+        "visible_for": {
+            "admin": ALL_ROWS,
+            "editor": {"tenant_id": UserAttribute("tenant_id")},
+            "author": [{"owner": UserAttribute("pk")}, {"is_public": True}],
+        },
+    })
+
+    The rules of all roles of a user are combined with OR, as are multiple rules of a single role.
+    Lookups within one rule are combined with AND. Users without a matching role don't see any rows.
+    """
+
+    def __init__(self, rules: Mapping[str, Mapping[Hashable, object]]) -> None:
+        super().__init__()
+
+        compiled_rules = {}
+        for action, role_rules in rules.items():
+            compiled_rules[action] = MappingProxyType(
+                {role: compile_role_rules(role_rule) for role, role_rule in role_rules.items()}
+            )
+        self.compiled_rules = MappingProxyType(compiled_rules)
+
+    def get_filter(self, action: str, user) -> Q | str | None:
+        """
+        Returns the combined filter for the given user. ALL_ROWS means no restriction, None means no rows at all.
+        """
+        if action not in self.compiled_rules:
+            raise NotImplementedError(f"Please define row rules for '{action}'.")
+
+        if not user.is_active or user.is_anonymous:
+            return None
+
+        role_rules = self.compiled_rules[action]
+        combined_q = None
+        for role in get_user_roles(user):
+            compiled_rules = role_rules.get(role, ())
+            if compiled_rules is ALL_ROWS:
+                return ALL_ROWS
+            for compiled_rule in compiled_rules:
+                q = compiled_rule.bind(user)
+                if q is not None:
+                    combined_q = q if combined_q is None else combined_q | q
+
+        return combined_q
+
+    def filter(self, queryset: QuerySet, action: str, user) -> QuerySet:
+        """
+        Restricts the given queryset to the rows the user may access for the given action, in a single query.
+        """
+        q = self.get_filter(action=action, user=user)
+        if q is None:
+            return queryset.none()
+        if q is ALL_ROWS:
+            return queryset.all()
+        return queryset.filter(q)
+
+
+class RowRuleQuerySet(AbstractUserSpecificQuerySet):
+    """
+    Implements "visible_for()", "editable_for()" and "deletable_for()" based on the "row_rules" of static roles.
+    """
+
+    row_rules: RowRules = None
+
+    def _filter_by_row_rules(self, action: str, user) -> QuerySet:
+        assert self.row_rules, "Please set the attribute 'row_rules'."
+        return self.row_rules.filter(queryset=self, action=action, user=user)
+
+    def visible_for(self, user):
+        return self._filter_by_row_rules(action="visible_for", user=user)
+
+    def editable_for(self, user):
+        return self._filter_by_row_rules(action="editable_for", user=user)
+
+    def deletable_for(self, user):
+        return self._filter_by_row_rules(action="deletable_for", user=user)
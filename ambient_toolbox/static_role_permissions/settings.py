@@ -8,6 +8,20 @@ def get_static_role_permissions_path() -> str | None:
     return getattr(settings, "STATIC_ROLE_PERMISSIONS_PATH", None)
 
 
+def get_static_role_permissions_file() -> str | None:
+    """
+    JSON or TOML file where role permissions are defined at. Takes precedence over STATIC_ROLE_PERMISSIONS_PATH.
+    """
+    return getattr(settings, "STATIC_ROLE_PERMISSIONS_FILE", None)
+
+
+def get_static_role_permissions_reload_interval() -> float | None:
+    """
+    Seconds between two checks whether STATIC_ROLE_PERMISSIONS_FILE has changed. None disables reloading.
+    """
+    return getattr(settings, "STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL", 5)
+
+
 def get_static_role_permissions_enable_system_check() -> bool:
     """
     Switch to enable system checks for the role permission feature.
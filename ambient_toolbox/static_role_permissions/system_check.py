@@ -1,31 +1,14 @@
 from django.apps import AppConfig, apps
-from django.contrib.auth import get_permission_codename
 from django.core.checks import Warning  # noqa: A004
+from django.core.exceptions import ImproperlyConfigured
 
-from ambient_toolbox.static_role_permissions.permissions import load_static_role_permissions
-
-
-def collect_model_permissions(app_configs: list[AppConfig]) -> set[str]:
-    """
-    Go through all apps/models and collect default + custom permissions.
-    """
-    all_model_permissions = set()
-
-    for app_config in app_configs:
-        # iterate over all models in all apps
-        for klass in app_config.get_models():
-            opts = klass._meta
-            app_label = app_config.label
-
-            # collect default permissions
-            for action in opts.default_permissions:
-                codename = get_permission_codename(action, opts)
-                all_model_permissions.add(f"{app_label}.{codename}")
-            # collect custom permissions
-            for codename, _ in opts.permissions:
-                all_model_permissions.add(f"{app_label}.{codename}")
-
-    return all_model_permissions
+from ambient_toolbox.static_role_permissions.index import compile_static_role_permissions, expand_permission_pattern
+from ambient_toolbox.static_role_permissions.permissions import (
+    collect_model_permissions,
+    get_role_definition,
+    load_static_role_permissions,
+)
+from ambient_toolbox.static_role_permissions.settings import get_static_role_permissions_file
 
 
 def check_permissions_against_models(app_configs: list[AppConfig] | None = None, **kwargs) -> list:
@@ -41,9 +24,19 @@ def check_permissions_against_models(app_configs: list[AppConfig] | None = None,
     role_permissions_dict = load_static_role_permissions()
 
     # check static permissions against model permissions
-    for role_name, role_permissions_set in role_permissions_dict.items():
+    for role_name, role_definition in role_permissions_dict.items():
+        role_permissions_set, _parent_roles = get_role_definition(role_definition)
         for permission in role_permissions_set:
-            if permission not in model_permissions_set:
+            if "*" in permission:
+                if not expand_permission_pattern(permission, model_permissions_set):
+                    errors.append(
+                        Warning(
+                            "Permission pattern does not match any model permission.",
+                            obj=f"'{permission}' (Role '{role_name}')",
+                        )
+                    )
+                    break
+            elif permission not in model_permissions_set:
                 errors.append(
                     Warning(
                         "Permission does not exist in any model.",
@@ -52,4 +45,13 @@ def check_permissions_against_models(app_configs: list[AppConfig] | None = None,
                 )
                 break
 
+    # check role inheritance
+    try:
+        compile_static_role_permissions(role_permissions_dict, model_permissions_set)
+    except ImproperlyConfigured as e:
+        setting_name = (
+            "STATIC_ROLE_PERMISSIONS_FILE" if get_static_role_permissions_file() else "STATIC_ROLE_PERMISSIONS_PATH"
+        )
+        errors.append(Warning(str(e), obj=setting_name))
+
     return errors
@@ -0,0 +1,147 @@
+import calendar
+import dataclasses
+import datetime
+import functools
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+
+
+@dataclasses.dataclass(frozen=True)
+class BusinessYear:
+    """
+    Business days of a single year. Bit "n" of "bitmap" is set if the n-th day of the year (starting at zero) is a
+    business day. "prefix_counts[n]" is the number of business days before that day, the last entry is the total.
+    """
+
+    year: int
+    bitmap: int
+    prefix_counts: array
+
+    @property
+    def total(self) -> int:
+        return self.prefix_counts[-1]
+
+
+class BusinessCalendar:
+    """
+    Calendar of business days, which are all days except "weekend_days" and holidays.
+    Holidays are either given as dates or as "(month, day)" pairs recurring every year.
+    For every year, a bitmap and prefix counts of its business days are computed once on first use. Checking a day
+    is a bit test, counting days between two dates takes one subtraction per year and adding business days a binary
+    search per year.
+    """
+
+    def __init__(
+        self,
+        *,
+        weekend_days: Iterable[int] = (calendar.SATURDAY, calendar.SUNDAY),
+        holidays: Iterable[datetime.date] = (),
+        recurring_holidays: Iterable[tuple[int, int]] = (),
+    ) -> None:
+        super().__init__()
+        self.weekend_days = frozenset(weekend_days)
+        self.holidays = frozenset(holidays)
+        self.recurring_holidays = frozenset(recurring_holidays)
+
+        if len(self.weekend_days) >= len(calendar.day_name):
+            raise ValueError("A business calendar needs at least one working day per week.")
+
+        self._business_years: dict[int, BusinessYear] = {}
+
+    def _compute_business_year(self, year: int) -> BusinessYear:
+        first_of_year = datetime.date(year, 1, 1)
+        holiday_ordinals = {holiday.toordinal() for holiday in self.holidays if holiday.year == year}
+        for month, day in self.recurring_holidays:
+            # Skip February 29th in years without it
+            if day <= calendar.monthrange(year, month)[1]:
+                holiday_ordinals.add(datetime.date(year, month, day).toordinal())
+
+        bitmap = 0
+        prefix_counts = array("H", [0])
+        first_ordinal = first_of_year.toordinal()
+        first_weekday = first_of_year.weekday()
+        for day_of_year in range(366 if calendar.isleap(year) else 365):
+            is_business_day = (first_weekday + day_of_year) % 7 not in self.weekend_days and (
+                first_ordinal + day_of_year not in holiday_ordinals
+            )
+            if is_business_day:
+                bitmap |= 1 << day_of_year
+            prefix_counts.append(prefix_counts[-1] + is_business_day)
+
+        return BusinessYear(year=year, bitmap=bitmap, prefix_counts=prefix_counts)
+
+    def get_business_year(self, year: int) -> BusinessYear:
+        business_year = self._business_years.get(year)
+        if business_year is None:
+            business_year = self._business_years[year] = self._compute_business_year(year)
+        return business_year
+
+    @staticmethod
+    def _get_day_of_year(date: datetime.date) -> int:
+        return date.toordinal() - datetime.date(date.year, 1, 1).toordinal()
+
+    def is_business_day(self, date: datetime.date) -> bool:
+        return bool(self.get_business_year(date.year).bitmap >> self._get_day_of_year(date) & 1)
+
+    def business_days_between(self, start_date: datetime.date, end_date: datetime.date) -> int:
+        """
+        Counts the business days from "start_date" to "end_date". Like in "date_month_delta()", "end_date" is
+        excluded (outer border). Returns a negative number if "end_date" lies before "start_date".
+        """
+        if start_date > end_date:
+            return -self.business_days_between(end_date, start_date)
+
+        count = -self.get_business_year(start_date.year).prefix_counts[self._get_day_of_year(start_date)]
+        for year in range(start_date.year, end_date.year):
+            count += self.get_business_year(year).total
+        return count + self.get_business_year(end_date.year).prefix_counts[self._get_day_of_year(end_date)]
+
+    def add_business_days(self, source_date: datetime.date, days: int) -> datetime.date:
+        """
+        Returns the date "days" business days after "source_date", or before it for a negative number.
+        "source_date" itself doesn't count, so it doesn't need to be a business day.
+        """
+        if days == 0:
+            return source_date
+
+        year = source_date.year
+        business_year = self.get_business_year(year)
+        day_of_year = self._get_day_of_year(source_date)
+        # Position of the target within the business days of the current year, starting at one
+        if days > 0:
+            position = business_year.prefix_counts[day_of_year + 1] + days
+            while position > business_year.total:
+                position -= business_year.total
+                year += 1
+                business_year = self.get_business_year(year)
+        else:
+            position = business_year.prefix_counts[day_of_year] + days + 1
+            while position < 1:
+                year -= 1
+                business_year = self.get_business_year(year)
+                position += business_year.total
+
+        # The target is the first day of the year with "position" business days up to and including itself
+        return datetime.date(year, 1, 1) + datetime.timedelta(
+            days=bisect_left(business_year.prefix_counts, position) - 1
+        )
+
+
+@functools.cache
+def _get_business_calendar(
+    weekend_days: frozenset[int], holidays: frozenset[datetime.date], recurring_holidays: frozenset[tuple[int, int]]
+) -> BusinessCalendar:
+    return BusinessCalendar(weekend_days=weekend_days, holidays=holidays, recurring_holidays=recurring_holidays)
+
+
+def get_business_calendar(
+    *,
+    weekend_days: Iterable[int] = (calendar.SATURDAY, calendar.SUNDAY),
+    holidays: Iterable[datetime.date] = (),
+    recurring_holidays: Iterable[tuple[int, int]] = (),
+) -> BusinessCalendar:
+    """
+    Returns a shared calendar per configuration, so its per-year tables are only computed once per process.
+    """
+    return _get_business_calendar(frozenset(weekend_days), frozenset(holidays), frozenset(recurring_holidays))
@@ -1,10 +1,20 @@
 import calendar
+import dataclasses
 import datetime
+import functools
+import heapq
+import itertools
+import re
 from calendar import monthrange
+from collections.abc import Iterable, Iterator
+from decimal import ROUND_HALF_UP, Decimal, localcontext
+from types import MappingProxyType
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from dateutil.relativedelta import relativedelta
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -95,15 +105,141 @@ def get_time_from_seconds(seconds: int) -> str:
     return "%02d:%02d:%02d" % (hours, minutes, seconds)
 
 
-def datetime_format(target_datetime: datetime.datetime, dt_format: str) -> str:
+@functools.cache
+def _get_time_zone() -> ZoneInfo | None:
     """
-    Uses strftime, but considers timezone (only for datetime objects)
+    Returns the time zone of the "TIME_ZONE" setting, or None if it's unknown. It's resolved only once, since looking up
+    an unknown time zone hits the file system every time.
     """
     try:
-        dt_format = target_datetime.astimezone(ZoneInfo(settings.TIME_ZONE)).strftime(dt_format)
+        return ZoneInfo(settings.TIME_ZONE)
     except ZoneInfoNotFoundError:
-        dt_format = target_datetime.strftime(dt_format)
-    return dt_format
+        return None
+
+
+@receiver(setting_changed)
+def reset_time_zone(*, setting: str | None = None, **kwargs) -> None:
+    """
+    Drops the cached time zone, e.g. when "TIME_ZONE" is overridden in a test.
+    """
+    if setting in (None, "TIME_ZONE"):
+        _get_time_zone.cache_clear()
+
+
+def datetime_format(target_datetime: datetime.datetime, dt_format: str) -> str:
+    """
+    Uses strftime, but considers timezone (only for datetime objects)
+    """
+    time_zone = _get_time_zone()
+    if time_zone is None:
+        return target_datetime.strftime(dt_format)
+    return target_datetime.astimezone(time_zone).strftime(dt_format)
+
+
+class DatetimeFormatter:
+    """
+    Formats many datetimes like "datetime_format()", e.g. a column of an export.
+    The time zone is resolved once per formatter. Its UTC offset is looked up once per UTC day and stored as a fixed
+    offset, which is reused for all values of that day. Only days with a DST transition convert every value via the
+    time zone itself.
+    Additionally, all date parts of the format are rendered once per local day, so only hours, minutes, seconds and
+    microseconds are formatted per value. Formats with other time-dependent directives use "strftime()" per value.
+    """
+
+    # Directives which only depend on the local date (and for "%z" and "%Z", on the UTC offset)
+    DATE_DIRECTIVES = frozenset("aAwdbBmyYjUWGuVzZ%")
+    # Position of the time value, which is passed after the date parts, and its format
+    TIME_DIRECTIVES = MappingProxyType({"H": (0, "02d"), "M": (1, "02d"), "S": (2, "02d"), "f": (3, "06d")})
+
+    def __init__(self, str_format: str, *, replacement: str = "-") -> None:
+        super().__init__()
+        self.str_format = str_format
+        self.replacement = replacement
+        self.time_zone = _get_time_zone()
+        # Fixed offset per UTC day, None for days with a DST transition
+        self._offset_table: dict[int, datetime.timezone | None] = {}
+        # Rendered date parts per local day, and per UTC offset if the format contains it
+        self._date_part_table: dict[int | tuple[int, datetime.timedelta | None], tuple[str, ...]] = {}
+        self._template, self._date_format_list = self._compile(str_format)
+        self._uses_offset = any(directive in str_format for directive in ("%z", "%Z"))
+
+    @classmethod
+    def _compile(cls, str_format: str) -> tuple[str | None, list[str]]:
+        """
+        Splits the format into a template for "str.format()" with one field per date part and per time directive.
+        Returns no template if the format contains directives which can't be split this way.
+        """
+        piece_list, date_format_list, current_date_format = [], [], ""
+        for position, part in enumerate(re.split(r"(%.)", str_format)):
+            is_directive = position % 2 == 1
+            if not is_directive and "%" in part:
+                # A single "%" at the end, leave it to "strftime()"
+                return None, []
+            if is_directive and part[1] in cls.TIME_DIRECTIVES:
+                if current_date_format:
+                    piece_list.append(len(date_format_list))
+                    date_format_list.append(current_date_format)
+                    current_date_format = ""
+                piece_list.append(cls.TIME_DIRECTIVES[part[1]])
+            elif is_directive and part[1] not in cls.DATE_DIRECTIVES:
+                return None, []
+            else:
+                current_date_format += part
+        if current_date_format:
+            piece_list.append(len(date_format_list))
+            date_format_list.append(current_date_format)
+
+        template = "".join(
+            f"{{{piece}}}" if isinstance(piece, int) else f"{{{len(date_format_list) + piece[0]}:{piece[1]}}}"
+            for piece in piece_list
+        )
+        return template, date_format_list
+
+    def _compute_fixed_offset(self, utc_day: int) -> datetime.timezone | None:
+        start_of_day = datetime.datetime.combine(
+            datetime.date.fromordinal(utc_day), datetime.time.min, tzinfo=datetime.timezone.utc
+        ).astimezone(self.time_zone)
+        end_of_day = (start_of_day + datetime.timedelta(days=1, microseconds=-1)).astimezone(self.time_zone)
+        if (start_of_day.utcoffset(), start_of_day.tzname()) != (end_of_day.utcoffset(), end_of_day.tzname()):
+            return None
+        return datetime.timezone(start_of_day.utcoffset(), start_of_day.tzname())
+
+    def _to_local(self, value: datetime.datetime) -> datetime.datetime:
+        if value.tzinfo is datetime.timezone.utc:
+            # Fast path for values loaded by Django
+            utc_day = value.toordinal()
+        else:
+            utc_offset = value.utcoffset()
+            if utc_offset is None:
+                # Naive datetimes are interpreted as local system time by "astimezone()", keep that behaviour
+                return value.astimezone(self.time_zone)
+            utc_day = (value.replace(tzinfo=None) - utc_offset).toordinal()
+
+        fixed_offset = self._offset_table.get(utc_day, False)
+        if fixed_offset is False:
+            fixed_offset = self._offset_table[utc_day] = self._compute_fixed_offset(utc_day)
+        return value.astimezone(fixed_offset or self.time_zone)
+
+    def format(self, value: datetime.datetime | None) -> str:
+        if value is None:
+            return self.replacement
+
+        local_value = value if self.time_zone is None else self._to_local(value)
+        if self._template is None:
+            return local_value.strftime(self.str_format)
+
+        key = (local_value.toordinal(), local_value.utcoffset()) if self._uses_offset else local_value.toordinal()
+        date_parts = self._date_part_table.get(key)
+        if date_parts is None:
+            date_parts = self._date_part_table[key] = tuple(
+                local_value.strftime(date_format) for date_format in self._date_format_list
+            )
+        return self._template.format(
+            *date_parts, local_value.hour, local_value.minute, local_value.second, local_value.microsecond
+        )
+
+    def format_many(self, values: Iterable[datetime.datetime | None]) -> list[str]:
+        return list(map(self.format, values))
 
 
 def get_start_and_end_date_from_calendar_week(year: int, calendar_week: int) -> (datetime.date, datetime.date):
@@ -156,38 +292,242 @@ def next_weekday(given_date: datetime.date, weekday: int) -> datetime.date:
     return given_date + datetime.timedelta(days_ahead)
 
 
+@functools.cache
+def _get_days_in_month(year: int, month: int) -> int:
+    return monthrange(year, month)[1]
+
+
+def _get_month_delta_fraction(start_date: datetime.date, end_date: datetime.date) -> tuple[int, int]:
+    """
+    Returns the exact number of months between both dates as numerator and denominator.
+    """
+    # If `start_date` is greater, this logic doesn't make any sense
+    if start_date > end_date:
+        raise NotImplementedError("Start date > end date")
+
+    start_month_days = _get_days_in_month(start_date.year, start_date.month)
+    if (start_date.year, start_date.month) == (end_date.year, end_date.month):
+        return end_date.day - start_date.day, start_month_days
+
+    # Remainder of the first month, all months in between and the beginning of the last month
+    end_month_days = _get_days_in_month(end_date.year, end_date.month)
+    full_months = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month - 1
+    numerator = (
+        (start_month_days - start_date.day + 1) * end_month_days
+        + full_months * start_month_days * end_month_days
+        + (end_date.day - 1) * start_month_days
+    )
+    return numerator, start_month_days * end_month_days
+
+
 def date_month_delta(start_date: datetime.date, end_date: datetime.date) -> float:
     """
     Calculates the number of months lying between two dates.
     So from April 15th to May 1st it's 0.5 months.
     Attention: `end_date` will be excluded in the result (outer border)
     """
-    # If `start_date` is greater, this logic doesn't make any sense
-    if start_date > end_date:
-        raise NotImplementedError("Start date > end date")
+    numerator, denominator = _get_month_delta_fraction(start_date, end_date)
+    return numerator / denominator
+
 
-    # Calculate date difference between dates
-    date_diff = (end_date - start_date).days
-
-    # Iteration variable
-    delta = 0
-    iter_date = start_date
-    # Loop until all days are processed
-    while date_diff > 0:
-        # Get days of month we are currently looking at
-        _iter_month, iter_month_days = monthrange(iter_date.year, iter_date.month)
-        # Calculate how many days are left to end of this month
-        days_to_month_end = min((iter_month_days - (iter_date.day - 1)), date_diff)
-        # Add percentage of the month these days cover to return variable
-        delta += days_to_month_end / iter_month_days
-        # Reduce leftover days by the amount we already processed
-        date_diff -= days_to_month_end
-
-        # Set iteration date to first of next month
-        iter_date += relativedelta(months=1, day=1)
-
-    # Return data
-    return delta
+def _round_fraction(numerator: int, denominator: int, decimal_places: int, rounding: str) -> Decimal:
+    """
+    Rounds "numerator / denominator" to the given decimal places without any intermediate rounding.
+    """
+    quotient, remainder = divmod(numerator * 10**decimal_places, denominator)
+    # Only the position of the remainder relative to a half decides the rounding, so a representative is enough
+    if remainder == 0:
+        representative = Decimal(0)
+    elif 2 * remainder < denominator:
+        representative = Decimal("0.25")
+    elif 2 * remainder == denominator:
+        representative = Decimal("0.5")
+    else:
+        representative = Decimal("0.75")
+
+    with localcontext() as context:
+        context.prec = max(context.prec, len(str(abs(quotient))) + 2)
+        return (quotient + representative).quantize(Decimal(1), rounding=rounding).scaleb(-decimal_places)
+
+
+class ProrationCalculator:
+    """
+    Prorates monthly amounts to arbitrary periods, e.g. a monthly fee for a contract starting in the middle of a month.
+    Partial months count by their share of days like in "date_month_delta()". Results are exact and only rounded
+    once to "decimal_places".
+    """
+
+    def __init__(self, *, decimal_places: int = 2, rounding: str = ROUND_HALF_UP) -> None:
+        super().__init__()
+        self.decimal_places = decimal_places
+        self.rounding = rounding
+        # Many intervals share the same period, e.g. contracts billed per calendar month
+        self._fraction_cache = {}
+
+    def _get_fraction(self, start_date: datetime.date, end_date: datetime.date) -> tuple[int, int]:
+        key = (start_date, end_date)
+        if key not in self._fraction_cache:
+            self._fraction_cache[key] = _get_month_delta_fraction(start_date, end_date)
+        return self._fraction_cache[key]
+
+    def prorate(self, start_date: datetime.date, end_date: datetime.date, amount: Decimal | int | str) -> Decimal:
+        """
+        Returns the share of the monthly "amount" for the given period. `end_date` is excluded (outer border).
+        """
+        months_numerator, months_denominator = self._get_fraction(start_date, end_date)
+        amount_numerator, amount_denominator = Decimal(amount).as_integer_ratio()
+        return _round_fraction(
+            numerator=amount_numerator * months_numerator,
+            denominator=amount_denominator * months_denominator,
+            decimal_places=self.decimal_places,
+            rounding=self.rounding,
+        )
+
+    def prorate_many(
+        self, intervals: Iterable[tuple[datetime.date, datetime.date, Decimal | int | str]]
+    ) -> list[Decimal]:
+        """
+        Prorates many "(start_date, end_date, amount)" intervals at once.
+        """
+        return [self.prorate(start_date, end_date, amount) for start_date, end_date, amount in intervals]
+
+
+@dataclasses.dataclass(frozen=True)
+class Recurrence:
+    """
+    Rule for recurring dates, e.g. invoices or appointments, starting at "start_date" and repeating every "interval"
+    days, weeks, months or years. Monthly and yearly occurrences keep the day of "start_date" and are clamped to the
+    end of shorter months like in "add_months()", without drifting afterward.
+    Optionally, the rule ends after "count" occurrences or at "until" (inclusive).
+    Every occurrence is computed directly from its position, so iterating a window skips to its start in constant time
+    and occurrences are only created when they are consumed.
+    """
+
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+    start_date: datetime.date | datetime.datetime
+    frequency: str
+    interval: int = 1
+    count: int | None = None
+    until: datetime.date | datetime.datetime | None = None
+
+    def __post_init__(self) -> None:
+        if self.frequency not in (self.DAILY, self.WEEKLY, self.MONTHLY, self.YEARLY):
+            raise ValueError(f"Unknown frequency '{self.frequency}'.")
+        if self.interval < 1:
+            raise ValueError("The interval of a recurrence needs to be at least 1.")
+
+    @property
+    def _months_per_step(self) -> int:
+        return self.interval * (12 if self.frequency == self.YEARLY else 1)
+
+    @property
+    def _step(self) -> datetime.timedelta:
+        return datetime.timedelta(days=self.interval * (7 if self.frequency == self.WEEKLY else 1))
+
+    def get_occurrence(self, position: int) -> datetime.date | datetime.datetime:
+        """
+        Returns the occurrence at the given position, starting at zero, without checking "count" or "until".
+        """
+        if self.frequency in (self.DAILY, self.WEEKLY):
+            return self.start_date + self._step * position
+
+        year, month_index = divmod(
+            self.start_date.year * 12 + self.start_date.month - 1 + self._months_per_step * position, 12
+        )
+        month = month_index + 1
+        return self.start_date.replace(
+            year=year, month=month, day=min(self.start_date.day, _get_days_in_month(year, month))
+        )
+
+    def _get_first_position(self, window_start: datetime.date | datetime.datetime) -> int:
+        """
+        Returns the position of the first occurrence on or after "window_start".
+        """
+        if window_start <= self.start_date:
+            return 0
+
+        if self.frequency in (self.DAILY, self.WEEKLY):
+            return -((self.start_date - window_start) // self._step)
+
+        # All earlier positions are in earlier months, only clamping or the time of day can push the estimate back
+        month_count = (window_start.year - self.start_date.year) * 12 + window_start.month - self.start_date.month
+        position = -(-month_count // self._months_per_step)
+        if self.get_occurrence(position) < window_start:
+            position += 1
+        return position
+
+    def _iter_from_position(
+        self, position: int, window_end: datetime.date | datetime.datetime | None
+    ) -> Iterator[datetime.date | datetime.datetime]:
+        while self.count is None or position < self.count:
+            occurrence = self.get_occurrence(position)
+            if (self.until is not None and occurrence > self.until) or (
+                window_end is not None and occurrence >= window_end
+            ):
+                return
+            yield occurrence
+            position += 1
+
+    def iter_occurrences(
+        self,
+        window_start: datetime.date | datetime.datetime | None = None,
+        window_end: datetime.date | datetime.datetime | None = None,
+    ) -> Iterator[datetime.date | datetime.datetime]:
+        """
+        Yields all occurrences from "window_start" (inclusive) to "window_end" (exclusive) lazily.
+        Without "window_end", "count" or "until", the generator is infinite.
+        """
+        return self._iter_from_position(
+            position=0 if window_start is None else self._get_first_position(window_start), window_end=window_end
+        )
+
+    def get_occurrences(
+        self, window_start: datetime.date | datetime.datetime, window_end: datetime.date | datetime.datetime
+    ) -> tuple[datetime.date | datetime.datetime, ...]:
+        """
+        Returns all occurrences from "window_start" (inclusive) to "window_end" (exclusive). Expanded windows are
+        cached, so schedules with the same rule and window are only expanded once.
+        """
+        return _get_recurrence_window(self, window_start, window_end)
+
+    def next_occurrence(self, after: datetime.date | datetime.datetime) -> datetime.date | datetime.datetime | None:
+        """
+        Returns the first occurrence after the given date, or None if the rule has ended.
+        """
+        position = self._get_first_position(after)
+        if self.get_occurrence(position) == after:
+            position += 1
+        return next(self._iter_from_position(position=position, window_end=None), None)
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_recurrence_window(
+    recurrence: Recurrence,
+    window_start: datetime.date | datetime.datetime,
+    window_end: datetime.date | datetime.datetime,
+) -> tuple[datetime.date | datetime.datetime, ...]:
+    return tuple(recurrence.iter_occurrences(window_start, window_end))
+
+
+def merge_occurrences(
+    recurrences: Iterable[Recurrence],
+    window_start: datetime.date | datetime.datetime,
+    window_end: datetime.date | datetime.datetime,
+) -> Iterator[tuple[datetime.date | datetime.datetime, int]]:
+    """
+    Yields the occurrences of many recurrences within the given window in chronological order, together with the
+    position of their recurrence. Only one pending occurrence per recurrence is kept in memory.
+    """
+    return heapq.merge(
+        *(
+            zip(recurrence.iter_occurrences(window_start, window_end), itertools.repeat(position))
+            for position, recurrence in enumerate(recurrences)
+        )
+    )
 
 
 def get_first_and_last_of_month(date_object: datetime.date | None = None) -> tuple[datetime.date, datetime.date]:
@@ -0,0 +1,88 @@
+"""
+Batch versions of the date utilities in "ambient_toolbox.utils.date" for processing many rows at once, e.g. in reports.
+They take sequences instead of single values and return lists with the same semantics as their scalar counterparts,
+but avoid the per-row overhead of "relativedelta" and "monthrange" by working on plain integers and cached month
+lengths.
+"""
+
+import calendar
+import datetime
+from collections.abc import Iterable, Sequence
+
+from ambient_toolbox.utils.date import _get_days_in_month, _get_month_delta_fraction
+
+
+def _broadcast(value: int | Iterable[int], length: int) -> list[int]:
+    """
+    Repeats a single value for every row, or ensures a sequence has one value per row.
+    """
+    if isinstance(value, int):
+        return [value] * length
+    value_list = list(value)
+    if len(value_list) != length:
+        raise ValueError(f"Expected {length} values, got {len(value_list)}.")
+    return value_list
+
+
+def add_months(
+    source_dates: Sequence[datetime.date | datetime.datetime], months: int | Iterable[int]
+) -> list[datetime.date | datetime.datetime]:
+    """
+    Adds the given number of months to every date. "months" is either a single value or one value per date.
+    Like "relativedelta", days which don't exist in the target month are clamped to its last day.
+    """
+    result = []
+    for source_date, month_count in zip(source_dates, _broadcast(months, len(source_dates))):
+        year, month_index = divmod(source_date.year * 12 + source_date.month - 1 + month_count, 12)
+        month = month_index + 1
+        result.append(
+            source_date.replace(year=year, month=month, day=min(source_date.day, _get_days_in_month(year, month)))
+        )
+    return result
+
+
+def date_month_delta(start_dates: Sequence[datetime.date], end_dates: Sequence[datetime.date]) -> list[float]:
+    """
+    Calculates the number of months lying between every pair of dates. "end_dates" are excluded (outer border).
+    """
+    if len(start_dates) != len(end_dates):
+        raise ValueError(f"Expected {len(start_dates)} values, got {len(end_dates)}.")
+    return [
+        numerator / denominator for numerator, denominator in map(_get_month_delta_fraction, start_dates, end_dates)
+    ]
+
+
+def get_first_and_last_of_month(
+    date_objects: Iterable[datetime.date],
+) -> list[tuple[datetime.date, datetime.date]]:
+    """
+    Returns the first and last day of the month of every given date.
+    """
+    return [
+        (
+            date_object.replace(day=1),
+            date_object.replace(day=_get_days_in_month(date_object.year, date_object.month)),
+        )
+        for date_object in date_objects
+    ]
+
+
+def next_weekday(given_dates: Iterable[datetime.date], weekday: int) -> list[datetime.date]:
+    """
+    Returns the next date of the given weekday for every date. The given date itself is never returned.
+    """
+    # Ordinal 1 is a Monday, so "(weekday - ordinal) % 7 + 1" are the days ahead
+    return [
+        datetime.date.fromordinal(ordinal + (weekday - ordinal) % 7 + 1)
+        for ordinal in map(datetime.date.toordinal, given_dates)
+    ]
+
+
+def check_date_is_weekend(
+    compare_dates: Iterable[datetime.date], weekend_days: Iterable[int] = (calendar.SATURDAY, calendar.SUNDAY)
+) -> list[bool]:
+    """
+    Determines for every date if it's on a weekend, based on "weekend_days".
+    """
+    weekend_day_set = frozenset(weekend_days)
+    return [compare_date.weekday() in weekend_day_set for compare_date in compare_dates]
@@ -1,5 +1,15 @@
+import dataclasses
 import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
 import zlib
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
 
 
 def get_filename_without_ending(file_path: str) -> str:
@@ -15,6 +25,48 @@ def get_filename_without_ending(file_path: str) -> str:
     return filename.rsplit(".", 1)[0]
 
 
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+CRC32 = "crc32"
+
+
+def file_checksums(file_path: str, algorithms: Iterable[str] = (CRC32, "md5", "sha256")) -> dict[str, str]:
+    """
+    Calculates several checksums of the given file in a single pass, reading it in large chunks.
+
+    See ``open`` for all the exceptions that can be raised.
+
+    :param file_path: The file for which the checksums should be calculated.
+    :param algorithms: "crc32" and any algorithm supported by ``hashlib``, e.g. "md5" or "sha256".
+    :return: Returns the checksums per algorithm in hexadecimal format. Like ``crc()``, the CRC is upper case with
+        8 characters.
+    """
+    algorithm_list = list(dict.fromkeys(algorithms))
+    unknown_algorithms = [
+        algorithm
+        for algorithm in algorithm_list
+        if algorithm != CRC32 and algorithm not in hashlib.algorithms_available
+    ]
+    if unknown_algorithms:
+        raise ValueError(f"Unsupported checksum algorithms: {', '.join(unknown_algorithms)}.")
+
+    hash_dict = {algorithm: hashlib.new(algorithm) for algorithm in algorithm_list if algorithm != CRC32}
+    update_list = [hash_object.update for hash_object in hash_dict.values()]
+    crc_value = 0
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(CHECKSUM_CHUNK_SIZE)
+            if not chunk:
+                break
+            crc_value = zlib.crc32(chunk, crc_value)
+            for update in update_list:
+                update(chunk)
+
+    return {
+        algorithm: "%08X" % (crc_value & 0xFFFFFFFF) if algorithm == CRC32 else hash_dict[algorithm].hexdigest()
+        for algorithm in algorithm_list
+    }
+
+
 def crc(file_path: str) -> str:
     """
     Calculates the cyclic redundancy checksum (CRC) of the given file.
@@ -24,11 +76,7 @@ def crc(file_path: str) -> str:
     :param file_path: The file for which the CRC checksum should be calculated.
     :return: Returns the CRC checksum of the file in hexadecimal format (8 characters).
     """
-    prev = 0
-    with open(file_path, "rb") as f:
-        for line in f:
-            prev = zlib.crc32(line, prev)
-    return "%08X" % (prev & 0xFFFFFFFF)
+    return file_checksums(file_path, algorithms=(CRC32,))[CRC32]
 
 
 def md5_checksum(file_path: str) -> str:
@@ -40,11 +88,167 @@ def md5_checksum(file_path: str) -> str:
     :param file_path: the file for which the MD5 hashsum should be calculated.
     :return: returns the MD5 of the file in hexadecimal format.
     """
-    with open(file_path, "rb") as fh:
-        m = hashlib.md5()
-        while True:
-            data = fh.read(8192)
-            if not data:
-                break
-            m.update(data)
-        return m.hexdigest()
+    return file_checksums(file_path, algorithms=("md5",))["md5"]
+
+
+@dataclasses.dataclass
+class ChecksumTreeResult:
+    """
+    Checksums of all files of a directory tree per path relative to its root, together with throughput statistics.
+    Files taken from the cache count as "cached_files" and aren't part of "hashed_bytes". Files which couldn't be
+    read, e.g. broken symlinks, are listed in "failed_files" together with the error.
+    """
+
+    checksums: dict[str, dict[str, str]] = dataclasses.field(default_factory=dict)
+    failed_files: dict[str, str] = dataclasses.field(default_factory=dict)
+    hashed_files: int = 0
+    cached_files: int = 0
+    hashed_bytes: int = 0
+    duration: float = 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.hashed_bytes / self.duration if self.duration > 0 else 0.0
+
+
+def _load_checksum_cache(cache_path: str) -> dict:
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("Checksum cache '%s' can't be read, all files are hashed again.", cache_path)
+        return {}
+
+
+def _save_checksum_cache(cache_path: str, cache: dict) -> None:
+    """
+    Writes the cache to a temporary file first and replaces the old one afterward, so an aborted run can't leave a
+    broken cache behind.
+    """
+    cache_directory = os.path.dirname(os.path.abspath(cache_path))
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=cache_directory, delete=False) as f:
+        json.dump(cache, f)
+    os.replace(f.name, cache_path)
+
+
+CHECKSUM_CACHE_SAVE_INTERVAL = 60
+
+
+def checksum_tree(
+    path: str, algorithms: Iterable[str] = ("md5",), *, workers: int = 4, cache_path: str | None = None
+) -> ChecksumTreeResult:
+    """
+    Calculates the checksums of all files below the given directory via ``file_checksums()`` in a thread pool.
+    Hashing releases the GIL, so the files are processed in parallel. Files and directories which can't be read are
+    logged and skipped instead of aborting the whole run. A missing root directory raises an error, though.
+
+    :param path: The root directory of the files.
+    :param algorithms: The algorithms as in ``file_checksums()``.
+    :param workers: The number of threads hashing files.
+    :param cache_path: Optional JSON file storing the checksums per absolute path, size and modification time.
+        Files which haven't changed since the last run are taken from it instead of being hashed again. It's saved
+        every ``CHECKSUM_CACHE_SAVE_INTERVAL`` seconds as well, so an aborted run doesn't lose all progress.
+    :return: Returns the checksums per relative path and the throughput of the run.
+    """
+    started_at = time.monotonic()
+    algorithm_list = list(dict.fromkeys(algorithms))
+    root = os.path.abspath(path)
+    cache = _load_checksum_cache(cache_path) if cache_path else {}
+    cache_file_path = os.path.abspath(cache_path) if cache_path else None
+
+    # Entries of files below the root which were deleted are dropped, entries of other trees are kept
+    new_cache = {file_path: entry for file_path, entry in cache.items() if not file_path.startswith(root + os.sep)}
+    result = ChecksumTreeResult()
+    pending_list = []
+    for file_path, stat_result in _walk_checksum_tree(root, result, skipped_path=cache_file_path):
+        entry = cache.get(file_path)
+        if not entry or (entry["size"], entry["mtime_ns"]) != (stat_result.st_size, stat_result.st_mtime_ns):
+            entry = None
+        elif all(algorithm in entry["checksums"] for algorithm in algorithm_list):
+            new_cache[file_path] = entry
+            result.checksums[os.path.relpath(file_path, root)] = {
+                algorithm: entry["checksums"][algorithm] for algorithm in algorithm_list
+            }
+            result.cached_files += 1
+            continue
+        pending_list.append((file_path, stat_result, entry))
+
+    saved_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        future_dict = {
+            executor.submit(file_checksums, file_path, algorithms=algorithm_list): (file_path, stat_result, entry)
+            for file_path, stat_result, entry in pending_list
+        }
+        for future in as_completed(future_dict):
+            file_path, stat_result, entry = future_dict[future]
+            try:
+                checksums = future.result()
+            except OSError as e:
+                _add_failed_file(result, root, file_path, e)
+                continue
+
+            new_cache[file_path] = {
+                "size": stat_result.st_size,
+                "mtime_ns": stat_result.st_mtime_ns,
+                # Keep the checksums of other algorithms if the file is unchanged
+                "checksums": {**entry["checksums"], **checksums} if entry else checksums,
+            }
+            result.checksums[os.path.relpath(file_path, root)] = checksums
+            result.hashed_files += 1
+            result.hashed_bytes += stat_result.st_size
+
+            if cache_path and time.monotonic() - saved_at >= CHECKSUM_CACHE_SAVE_INTERVAL:
+                # Entries of files which aren't processed yet are kept until the final save
+                _save_checksum_cache(cache_path, {**cache, **new_cache})
+                saved_at = time.monotonic()
+
+    if cache_path:
+        _save_checksum_cache(cache_path, new_cache)
+
+    result.checksums = dict(sorted(result.checksums.items()))
+    result.failed_files = dict(sorted(result.failed_files.items()))
+    result.duration = time.monotonic() - started_at
+    logger.info(
+        "Checksummed %d files in %.2fs, %d from cache, %d failed, %.1f MB/s.",
+        result.hashed_files + result.cached_files,
+        result.duration,
+        result.cached_files,
+        len(result.failed_files),
+        result.bytes_per_second / 1_000_000,
+    )
+    return result
+
+
+def _walk_checksum_tree(
+    root: str, result: ChecksumTreeResult, *, skipped_path: str | None
+) -> Iterator[tuple[str, os.stat_result]]:
+    """
+    Yields the path and stat result of every file below the root. Files and directories which can't be accessed are
+    added to the failed files of the result instead.
+    """
+    if not os.path.exists(root):
+        raise FileNotFoundError(f"Directory '{root}' doesn't exist.")
+    if not os.path.isdir(root):
+        raise NotADirectoryError(f"'{root}' is not a directory.")
+
+    def on_error(error: OSError) -> None:
+        _add_failed_file(result, root, error.filename, error)
+
+    for directory, _directory_names, file_names in os.walk(root, onerror=on_error):
+        for file_name in file_names:
+            file_path = os.path.join(directory, file_name)
+            if file_path == skipped_path:
+                continue
+            try:
+                stat_result = os.stat(file_path)
+            except OSError as e:
+                _add_failed_file(result, root, file_path, e)
+                continue
+            yield file_path, stat_result
+
+
+def _add_failed_file(result: ChecksumTreeResult, root: str, file_path: str, error: OSError) -> None:
+    logger.warning("Checksum of '%s' can't be calculated: %s", file_path, error)
+    result.failed_files[os.path.relpath(file_path, root)] = str(error)
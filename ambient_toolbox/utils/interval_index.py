@@ -0,0 +1,181 @@
+import datetime
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+
+from ambient_toolbox.utils.date import MonthHelper, _get_days_in_month
+
+
+class _CenterNode:
+    """
+    Node of a centered interval tree. All intervals of the node contain "center", so a point left of it is contained
+    in a prefix of the intervals sorted by start and a point right of it in a prefix of the ones sorted by end.
+    """
+
+    __slots__ = ("by_end", "by_start", "center", "left", "right")
+
+    def __init__(self, center: int, by_start: list, by_end: list, left, right) -> None:
+        self.center = center
+        self.by_start = by_start
+        self.by_end = by_end
+        self.left = left
+        self.right = right
+
+
+class IntervalIndex:
+    """
+    Static index of date ranges, e.g. bookings or contracts, for fast overlap queries.
+    Ranges are given as "(start_date, end_date)" pairs and include both dates, like the result of
+    "get_first_and_last_of_month()". Queries return the positions of the matching ranges in the given sequence,
+    in no particular order.
+    Ranges are bulk loaded into arrays sorted by start and a centered interval tree, so finding the "k" ranges
+    overlapping a period takes "O(log n + k)". Additionally, the covered dates are merged once to answer gap queries.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[datetime.date, datetime.date]]) -> None:
+        super().__init__()
+        self.intervals = tuple(intervals)
+
+        ordinal_intervals = []
+        for position, (start_date, end_date) in enumerate(self.intervals):
+            if end_date < start_date:
+                raise ValueError(f"Range at position {position} ends before it starts.")
+            ordinal_intervals.append((start_date.toordinal(), end_date.toordinal(), position))
+
+        ordinal_intervals.sort()
+        self._starts = [start for start, _end, _position in ordinal_intervals]
+        self._ends = [end for _start, end, _position in ordinal_intervals]
+        self._positions = [position for _start, _end, position in ordinal_intervals]
+        self._ends_by_position = [end_date.toordinal() for _start_date, end_date in self.intervals]
+        self._root = self._build_tree(ordinal_intervals)
+
+        # Disjoint ranges of all covered dates, adjacent ranges are merged as well
+        self._covered_starts = []
+        self._covered_ends = []
+        for start, end, _position in ordinal_intervals:
+            if self._covered_ends and start <= self._covered_ends[-1] + 1:
+                self._covered_ends[-1] = max(self._covered_ends[-1], end)
+            else:
+                self._covered_starts.append(start)
+                self._covered_ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.intervals)
+
+    @classmethod
+    def _build_tree(cls, ordinal_intervals: list[tuple[int, int, int]]) -> _CenterNode | None:
+        """
+        Builds the subtree for the given intervals, which need to be sorted by start.
+        """
+        if not ordinal_intervals:
+            return None
+
+        endpoints = sorted(endpoint for start, end, _position in ordinal_intervals for endpoint in (start, end))
+        center = endpoints[len(endpoints) // 2]
+        left_intervals, center_intervals, right_intervals = [], [], []
+        for interval in ordinal_intervals:
+            if interval[1] < center:
+                left_intervals.append(interval)
+            elif interval[0] > center:
+                right_intervals.append(interval)
+            else:
+                center_intervals.append(interval)
+
+        return _CenterNode(
+            center=center,
+            by_start=center_intervals,
+            by_end=sorted(center_intervals, key=lambda interval: -interval[1]),
+            left=cls._build_tree(left_intervals),
+            right=cls._build_tree(right_intervals),
+        )
+
+    def _stab(self, ordinal: int) -> list[int]:
+        """
+        Returns the positions of all ranges containing the given day.
+        """
+        result = []
+        node = self._root
+        while node is not None:
+            if ordinal < node.center:
+                for start, _end, position in node.by_start:
+                    if start > ordinal:
+                        break
+                    result.append(position)
+                node = node.left
+            else:
+                for _start, end, position in node.by_end:
+                    if end < ordinal:
+                        break
+                    result.append(position)
+                node = node.right
+        return result
+
+    def get_overlapping(self, start_date: datetime.date, end_date: datetime.date) -> list[int]:
+        """
+        Returns the positions of all ranges sharing at least one day with the given period.
+        """
+        start, end = start_date.toordinal(), end_date.toordinal()
+        if end < start:
+            return []
+        # Ranges starting within the period, plus the ones already running on its first day
+        return self._positions[bisect_right(self._starts, start) : bisect_right(self._starts, end)] + self._stab(start)
+
+    def get_containing(self, start_date: datetime.date, end_date: datetime.date | None = None) -> list[int]:
+        """
+        Returns the positions of all ranges covering the whole given period, or the given day without "end_date".
+        """
+        end = (end_date or start_date).toordinal()
+        return [position for position in self._stab(start_date.toordinal()) if self._ends_by_position[position] >= end]
+
+    def get_within(self, start_date: datetime.date, end_date: datetime.date) -> list[int]:
+        """
+        Returns the positions of all ranges lying completely within the given period.
+        """
+        start, end = start_date.toordinal(), end_date.toordinal()
+        lower, upper = bisect_left(self._starts, start), bisect_right(self._starts, end)
+        return [self._positions[index] for index in range(lower, upper) if self._ends[index] <= end]
+
+    def get_gaps(self, start_date: datetime.date, end_date: datetime.date) -> list[tuple[datetime.date, datetime.date]]:
+        """
+        Returns all periods within the given period which aren't covered by any range, as "(first_day, last_day)".
+        """
+        start, end = start_date.toordinal(), end_date.toordinal()
+        gaps = []
+        cursor = start
+        index = max(bisect_right(self._covered_starts, start) - 1, 0)
+        while cursor <= end and index < len(self._covered_starts):
+            covered_start, covered_end = self._covered_starts[index], self._covered_ends[index]
+            if covered_start > end:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start - 1))
+            cursor = max(cursor, covered_end + 1)
+            index += 1
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return [
+            (datetime.date.fromordinal(gap_start), datetime.date.fromordinal(gap_end)) for gap_start, gap_end in gaps
+        ]
+
+    def get_months_with_gaps(
+        self, start_date: datetime.date, end_date: datetime.date
+    ) -> list[tuple[datetime.date, datetime.date]]:
+        """
+        Returns the first and last day of every month of the given period which isn't covered completely, like
+        "get_first_and_last_of_month()". Months are checked completely, even if the period only touches them.
+        """
+        first_of_month = start_date.replace(day=1)
+        last_of_month = end_date.replace(day=_get_days_in_month(end_date.year, end_date.month))
+
+        months = []
+        for gap_start, gap_end in self.get_gaps(first_of_month, last_of_month):
+            year, month = gap_start.year, gap_start.month
+            while (year, month) <= (gap_end.year, gap_end.month):
+                month_range = (
+                    datetime.date(year, month, 1),
+                    datetime.date(year, month, _get_days_in_month(year, month)),
+                )
+                # Neighbouring gaps can lie in the same month
+                if not months or months[-1] != month_range:
+                    months.append(month_range)
+                year, month = (year + 1, 1) if month == MonthHelper.DECEMBER else (year, month + 1)
+        return months
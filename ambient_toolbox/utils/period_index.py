@@ -0,0 +1,153 @@
+import dataclasses
+import datetime
+from array import array
+from collections.abc import Iterable
+
+from django.db.models import Case, Count, DateField, IntegerField, QuerySet, Value, When
+from django.db.models.functions import Trunc
+
+from ambient_toolbox.utils.date import _get_days_in_month, get_start_and_end_date_from_calendar_week
+
+
+@dataclasses.dataclass(frozen=True)
+class Period:
+    """
+    A single week, month or quarter. For weeks, "year" and "number" are the ISO year and calendar week.
+    """
+
+    period_id: int
+    year: int
+    number: int
+    start_date: datetime.date
+    end_date: datetime.date
+
+
+class PeriodIndex:
+    """
+    Precomputed boundaries of all weeks, months or quarters of the years "start_year" to "end_year".
+    Periods are numbered in ascending order, starting at zero. Dates are mapped to their period via a lookup table
+    with one entry per day, so bucketing many rows doesn't compute any boundaries per row. For querysets, matching
+    "Case/When" and "Trunc" expressions let the database do the bucketing in a single query.
+    """
+
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+
+    def __init__(self, *, start_year: int, end_year: int, period_type: str = MONTH) -> None:
+        super().__init__()
+        assert period_type in (self.WEEK, self.MONTH, self.QUARTER), f"Unknown period type '{period_type}'."
+        assert start_year <= end_year, "Please pass a 'start_year' not after 'end_year'."
+        self.start_year = start_year
+        self.end_year = end_year
+        self.period_type = period_type
+
+        self.periods = tuple(
+            Period(period_id=period_id, year=year, number=number, start_date=start_date, end_date=end_date)
+            for period_id, (year, number, start_date, end_date) in enumerate(self._compute_boundaries())
+        )
+        self.first_date = self.periods[0].start_date
+        self.last_date = self.periods[-1].end_date
+        self._period_ids_by_start_date = {period.start_date: period.period_id for period in self.periods}
+
+        self._day_table = array("I")
+        for period in self.periods:
+            self._day_table.extend([period.period_id] * ((period.end_date - period.start_date).days + 1))
+
+    def _compute_boundaries(self) -> Iterable[tuple[int, int, datetime.date, datetime.date]]:
+        if self.period_type == self.WEEK:
+            for year in range(self.start_year, self.end_year + 1):
+                for calendar_week in range(1, datetime.date(year, 12, 28).isocalendar()[1] + 1):
+                    yield year, calendar_week, *get_start_and_end_date_from_calendar_week(year, calendar_week)
+            return
+
+        months_per_period = 1 if self.period_type == self.MONTH else 3
+        for year in range(self.start_year, self.end_year + 1):
+            for number, first_month in enumerate(range(1, 13, months_per_period), start=1):
+                last_month = first_month + months_per_period - 1
+                yield (
+                    year,
+                    number,
+                    datetime.date(year, first_month, 1),
+                    datetime.date(year, last_month, _get_days_in_month(year, last_month)),
+                )
+
+    def get_period(self, period_id: int) -> Period:
+        return self.periods[period_id]
+
+    def get_period_id(self, date: datetime.date) -> int | None:
+        """
+        Returns the id of the period containing the given date, or None if it lies outside the index.
+        Datetimes are bucketed by their date, so convert aware datetimes to the desired time zone first.
+        """
+        offset = date.toordinal() - self.first_date.toordinal()
+        if 0 <= offset < len(self._day_table):
+            return self._day_table[offset]
+        return None
+
+    def get_period_ids(self, dates: Iterable[datetime.date]) -> list[int | None]:
+        """
+        Batch version of "get_period_id()".
+        """
+        day_table = self._day_table
+        first_ordinal = self.first_date.toordinal()
+        day_count = len(day_table)
+        result = []
+        for ordinal in map(datetime.date.toordinal, dates):
+            offset = ordinal - first_ordinal
+            result.append(day_table[offset] if 0 <= offset < day_count else None)
+        return result
+
+    def count_per_period(self, dates: Iterable[datetime.date]) -> list[int]:
+        """
+        Returns the number of given dates per period id. Dates outside the index are ignored.
+        """
+        counts = [0] * len(self.periods)
+        for period_id in self.get_period_ids(dates):
+            if period_id is not None:
+                counts[period_id] += 1
+        return counts
+
+    def get_case_expression(self, field_name: str) -> Case:
+        """
+        Returns an expression evaluating to the period id of the given date field, or NULL outside the index.
+        Since the conditions are checked in order, every period only needs to compare against its end.
+        For datetime fields, pass the "__date" lookup, e.g. "created_at__date".
+        """
+        return Case(
+            When(**{f"{field_name}__lt": self.first_date}, then=Value(None)),
+            *(When(**{f"{field_name}__lte": period.end_date}, then=Value(period.period_id)) for period in self.periods),
+            default=Value(None),
+            output_field=IntegerField(),
+        )
+
+    def get_trunc_expression(self, field_name: str) -> Trunc:
+        """
+        Returns an expression truncating the given date or datetime field to the start date of its period.
+        Use "get_period_id_for_start_date()" to map the results back to period ids. Datetimes are truncated in the
+        current time zone.
+        """
+        return Trunc(field_name, self.period_type, output_field=DateField())
+
+    def get_period_id_for_start_date(self, start_date: datetime.date) -> int | None:
+        return self._period_ids_by_start_date.get(start_date)
+
+    def count_queryset(self, queryset: QuerySet, field_name: str) -> list[int]:
+        """
+        Counts the rows of the given queryset per period id with a single grouped query on the truncated field.
+        Rows outside the index are ignored.
+        """
+        counts = [0] * len(self.periods)
+        rows = (
+            queryset.order_by()
+            .annotate(period_start_date=self.get_trunc_expression(field_name))
+            .filter(period_start_date__range=(self.first_date, self.periods[-1].start_date))
+            .values("period_start_date")
+            .annotate(row_count=Count("pk"))
+            .values_list("period_start_date", "row_count")
+        )
+        for start_date, row_count in rows:
+            period_id = self.get_period_id_for_start_date(start_date)
+            if period_id is not None:
+                counts[period_id] += row_count
+        return counts
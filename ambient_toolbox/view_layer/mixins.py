@@ -1,8 +1,12 @@
+from django.contrib.auth import get_backends
 from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
+from ambient_toolbox.static_role_permissions.auth_backend import StaticRolePermissionBackend
+
 
 class DjangoPermissionRequiredMixin:
     """
@@ -38,14 +42,24 @@ class DjangoPermissionRequiredMixin:
         return False
 
     def has_permissions(self, user: User) -> bool:
-        # Check every permission...
-        for permission in self.permission_list:
-            # If user is missing one, the user is not allowed to see the view
-            if not user.has_perm(permission):
+        """
+        Checks all permissions of the "permission_list" at once. The user is only allowed to see the view if all of
+        them are granted.
+        Django's "user.has_perms()" asks every backend for each permission separately. If the only configured backend
+        is a static role permission backend, its batched "has_perms()" is called directly instead. Note that this
+        skips any override of "has_perm()" or "has_perms()" on the user model.
+        """
+        if user.is_active and user.is_superuser:
+            return True
+
+        backends = get_backends()
+        if len(backends) == 1 and isinstance(backends[0], StaticRolePermissionBackend):
+            try:
+                return backends[0].has_perms(user, self.permission_list)
+            except PermissionDenied:
                 return False
 
-        # If all permissions validate, the user can access the view
-        return True
+        return user.has_perms(self.permission_list)
 
     def dispatch(self, request, *args, **kwargs):
         # Validate user is either logged in or doesn't have to be logged in
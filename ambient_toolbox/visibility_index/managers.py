@@ -0,0 +1,40 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+from ambient_toolbox.managers import AbstractUserSpecificQuerySet
+
+
+class VisibilityIndexQuerySet(AbstractUserSpecificQuerySet):
+    """
+    Queryset answering "visible_for()" and its siblings from a materialised visibility index instead of evaluating
+    the (possibly expensive) permission rules on every request.
+    Set "visibility_index_model" to the label of your concrete "AbstractVisibilityIndex" model, e.g.
+    "project.ProjectVisibility".
+    """
+
+    visibility_index_model: str | None = None
+
+    def _filter_by_index(self, user, permission_field: str):
+        assert self.visibility_index_model, "Please set the attribute 'visibility_index_model'."
+
+        # Anonymous and unsaved users never have index entries
+        if getattr(user, "is_anonymous", False) or getattr(user, "pk", 0) is None:
+            return self.none()
+
+        index_model = apps.get_model(self.visibility_index_model)
+        object_ids = index_model.objects.filter(
+            user=user,
+            content_type=ContentType.objects.get_for_model(self.model),
+            **{permission_field: True},
+        ).values("object_id")
+
+        return self.filter(pk__in=object_ids)
+
+    def visible_for(self, user):
+        return self._filter_by_index(user, "can_view")
+
+    def editable_for(self, user):
+        return self._filter_by_index(user, "can_edit")
+
+    def deletable_for(self, user):
+        return self._filter_by_index(user, "can_delete")
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class AbstractVisibilityIndex(models.Model):
+    """
+    Denormalised row-level permission table. Every row states which permissions a user has on a single object.
+    Rows without any permission are never stored, so a missing row means "no access".
+    Derive a concrete model from this class per project and fill it via the "VisibilityIndexService".
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("User"),
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    content_type = models.ForeignKey(
+        ContentType,
+        verbose_name=_("Content type"),
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    object_id = models.PositiveBigIntegerField(_("Object ID"))
+    can_view = models.BooleanField(_("Can view"), default=False)
+    can_edit = models.BooleanField(_("Can edit"), default=False)
+    can_delete = models.BooleanField(_("Can delete"), default=False)
+
+    class Meta:
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=("user", "content_type", "object_id"),
+                name="%(app_label)s_%(class)s_unique_entry",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} / {self.content_type_id} / {self.object_id}"
@@ -0,0 +1,262 @@
+import dataclasses
+from collections.abc import Iterable
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldError
+from django.db import models, transaction
+
+from ambient_toolbox.managers import AbstractUserSpecificQuerySet
+from ambient_toolbox.visibility_index.models import AbstractVisibilityIndex
+
+PERMISSION_FIELDS = ("can_view", "can_edit", "can_delete")
+
+
+@dataclasses.dataclass
+class VisibilityIndexDiff:
+    """
+    Differences between the live permission rules and the stored visibility index.
+    """
+
+    created: list[AbstractVisibilityIndex] = dataclasses.field(default_factory=list)
+    updated: list[AbstractVisibilityIndex] = dataclasses.field(default_factory=list)
+    deleted: list[AbstractVisibilityIndex] = dataclasses.field(default_factory=list)
+
+    @property
+    def is_consistent(self) -> bool:
+        return not (self.created or self.updated or self.deleted)
+
+    def extend(self, other: "VisibilityIndexDiff") -> None:
+        self.created.extend(other.created)
+        self.updated.extend(other.updated)
+        self.deleted.extend(other.deleted)
+
+
+class VisibilityIndexService:
+    """
+    Keeps a materialised visibility index in sync with the live permission rules.
+    The rules are taken from "rule_queryset_class", a queryset implementing "visible_for()", "editable_for()" and
+    "deletable_for()". The index is rebuilt user by user, so memory usage doesn't depend on the number of users.
+    Refreshing single objects takes one query per permission and user. If the rules only filter via the user, e.g.
+    "self.filter(owner=user)", set "correlate_rules" to True to evaluate them for all users at once by passing
+    "OuterRef('pk')" of the user queryset as the user. If the rules need attributes of the actual user object, this
+    fails and the service falls back to the queries per user. Rules branching on the user in Python, e.g.
+    "if getattr(user, 'is_superuser', False)", must not be correlated, since such branches would be silently ignored.
+    """
+
+    model: type[models.Model] = None
+    index_model: type[AbstractVisibilityIndex] = None
+    rule_queryset_class: type[AbstractUserSpecificQuerySet] = None
+    correlate_rules: bool = False
+    # Objects per compound query, SQLite allows up to 500 compound "SELECT" statements
+    object_chunk_size: int = 100
+
+    def __init__(
+        self,
+        *,
+        model: type[models.Model] | None = None,
+        index_model: type[AbstractVisibilityIndex] | None = None,
+        rule_queryset_class: type[AbstractUserSpecificQuerySet] | None = None,
+    ) -> None:
+        super().__init__()
+
+        self.model = model or self.model
+        self.index_model = index_model or self.index_model
+        self.rule_queryset_class = rule_queryset_class or self.rule_queryset_class
+
+        assert self.model, "Please set the attribute 'model'."
+        assert self.index_model, "Please set the attribute 'index_model'."
+        assert self.rule_queryset_class, "Please set the attribute 'rule_queryset_class'."
+
+    def get_user_queryset(self) -> models.QuerySet:
+        """
+        Users to maintain the index for. Can be overwritten to e.g. skip inactive users.
+        """
+        return get_user_model().objects.all()
+
+    def get_rule_queryset(self) -> AbstractUserSpecificQuerySet:
+        return self.rule_queryset_class(model=self.model)
+
+    def get_content_type(self) -> ContentType:
+        return ContentType.objects.get_for_model(self.model)
+
+    def _compute_permissions(self, user, object_ids: Iterable[int] | None = None) -> dict[int, tuple[bool, ...]]:
+        """
+        Evaluates the live rules for the given user. Returns the permission flags per object id.
+        """
+        rule_queryset = self.get_rule_queryset()
+        rule_methods = (rule_queryset.visible_for, rule_queryset.editable_for, rule_queryset.deletable_for)
+
+        permission_dict = {}
+        for position, rule_method in enumerate(rule_methods):
+            queryset = rule_method(user)
+            if object_ids is not None:
+                queryset = queryset.filter(pk__in=object_ids)
+            for object_id in queryset.values_list("pk", flat=True):
+                permission_dict.setdefault(object_id, [False] * len(PERMISSION_FIELDS))[position] = True
+
+        return {object_id: tuple(flags) for object_id, flags in permission_dict.items()}
+
+    def _compute_diff(self, user, object_ids: Iterable[int] | None = None) -> VisibilityIndexDiff:
+        expected_dict = self._compute_permissions(user=user, object_ids=object_ids)
+
+        entry_queryset = self.index_model.objects.filter(user=user, content_type=self.get_content_type())
+        if object_ids is not None:
+            entry_queryset = entry_queryset.filter(object_id__in=object_ids)
+
+        diff = VisibilityIndexDiff()
+        for entry in entry_queryset:
+            expected_flags = expected_dict.pop(entry.object_id, None)
+            if expected_flags is None:
+                diff.deleted.append(entry)
+            elif expected_flags != tuple(getattr(entry, field) for field in PERMISSION_FIELDS):
+                for field, flag in zip(PERMISSION_FIELDS, expected_flags):
+                    setattr(entry, field, flag)
+                diff.updated.append(entry)
+
+        for object_id, flags in expected_dict.items():
+            diff.created.append(
+                self.index_model(
+                    user=user,
+                    content_type=self.get_content_type(),
+                    object_id=object_id,
+                    **dict(zip(PERMISSION_FIELDS, flags)),
+                )
+            )
+
+        return diff
+
+    def _apply_diff(self, diff: VisibilityIndexDiff) -> None:
+        if diff.deleted:
+            self.index_model.objects.filter(pk__in=[entry.pk for entry in diff.deleted]).delete()
+        if diff.updated:
+            self.index_model.objects.bulk_update(diff.updated, fields=PERMISSION_FIELDS)
+        if diff.created:
+            self.index_model.objects.bulk_create(diff.created)
+
+    def _sync(self, users: Iterable, object_ids: Iterable[int] | None = None) -> VisibilityIndexDiff:
+        diff = VisibilityIndexDiff()
+        for user in users:
+            with transaction.atomic():
+                user_diff = self._compute_diff(user=user, object_ids=object_ids)
+                self._apply_diff(user_diff)
+            diff.extend(user_diff)
+        return diff
+
+    def rebuild(self) -> VisibilityIndexDiff:
+        """
+        Synchronises the whole index with the live rules and returns the applied changes.
+        """
+        return self._sync(users=self.get_user_queryset().iterator())
+
+    def refresh_user(self, user) -> VisibilityIndexDiff:
+        """
+        Synchronises all entries of a single user, e.g. after their team membership changed.
+        """
+        return self._sync(users=[user])
+
+    def _build_pair_queryset(self, rule_method, object_ids: list[int]) -> models.QuerySet:
+        """
+        Returns a query yielding "(user_id, object_id)" for every indexed user having the given permission on any of
+        the given objects.
+        """
+        user_queryset = self.get_user_queryset().order_by()
+        pair_querysets = [
+            user_queryset.filter(models.Exists(rule_method(models.OuterRef("pk")).filter(pk=object_id)))
+            .annotate(indexed_object_id=models.Value(object_id, output_field=models.BigIntegerField()))
+            .values_list("pk", "indexed_object_id")
+            for object_id in object_ids
+        ]
+        return pair_querysets[0].union(*pair_querysets[1:], all=True) if len(pair_querysets) > 1 else pair_querysets[0]
+
+    def _compute_object_permissions(self, object_ids: list[int]) -> dict[tuple[int, int], tuple[bool, ...]] | None:
+        """
+        Evaluates the live rules for the given objects and all users with one query per permission and chunk of
+        objects. Returns the permission flags per "(user_id, object_id)", or None if the rules can't be correlated.
+        """
+        rule_queryset = self.get_rule_queryset()
+        rule_methods = (rule_queryset.visible_for, rule_queryset.editable_for, rule_queryset.deletable_for)
+
+        try:
+            pair_querysets = [
+                (position, self._build_pair_queryset(rule_method, object_ids[index : index + self.object_chunk_size]))
+                for position, rule_method in enumerate(rule_methods)
+                for index in range(0, len(object_ids), self.object_chunk_size)
+            ]
+        except (AttributeError, TypeError, ValueError, FieldError):
+            # The rules access the user object itself, which isn't available inside a correlated query
+            return None
+
+        permission_dict = {}
+        for position, pair_queryset in pair_querysets:
+            for pair in pair_queryset:
+                permission_dict.setdefault(pair, [False] * len(PERMISSION_FIELDS))[position] = True
+
+        return {pair: tuple(flags) for pair, flags in permission_dict.items()}
+
+    def _compute_object_diff(self, object_ids: list[int]) -> VisibilityIndexDiff | None:
+        expected_dict = self._compute_object_permissions(object_ids=object_ids)
+        if expected_dict is None:
+            return None
+
+        content_type = self.get_content_type()
+        # Like in a rebuild, entries of users outside "get_user_queryset()" are left alone
+        entry_queryset = self.index_model.objects.filter(
+            content_type=content_type,
+            object_id__in=object_ids,
+            user__in=self.get_user_queryset().order_by().values("pk"),
+        )
+        diff = VisibilityIndexDiff()
+        for entry in entry_queryset:
+            expected_flags = expected_dict.pop((entry.user_id, entry.object_id), None)
+            if expected_flags is None:
+                diff.deleted.append(entry)
+            elif expected_flags != tuple(getattr(entry, field) for field in PERMISSION_FIELDS):
+                for field, flag in zip(PERMISSION_FIELDS, expected_flags):
+                    setattr(entry, field, flag)
+                diff.updated.append(entry)
+
+        for (user_id, object_id), flags in expected_dict.items():
+            diff.created.append(
+                self.index_model(
+                    user_id=user_id,
+                    content_type=content_type,
+                    object_id=object_id,
+                    **dict(zip(PERMISSION_FIELDS, flags)),
+                )
+            )
+
+        return diff
+
+    def refresh_objects(self, object_ids: Iterable[int]) -> VisibilityIndexDiff:
+        """
+        Synchronises all entries of the given objects. With "correlate_rules", the rules are evaluated for all users
+        at once, taking one query per permission and chunk of objects, plus one query for the existing entries.
+        """
+        object_id_list = list(dict.fromkeys(object_ids))
+        if not object_id_list:
+            return VisibilityIndexDiff()
+
+        if self.correlate_rules:
+            with transaction.atomic():
+                diff = self._compute_object_diff(object_ids=object_id_list)
+                if diff is not None:
+                    self._apply_diff(diff)
+                    return diff
+
+        return self._sync(users=self.get_user_queryset().iterator(), object_ids=object_id_list)
+
+    def remove_objects(self, object_ids: Iterable[int]) -> None:
+        """
+        Drops all entries of the given objects, e.g. after they have been deleted.
+        """
+        self.index_model.objects.filter(content_type=self.get_content_type(), object_id__in=list(object_ids)).delete()
+
+    def check_consistency(self) -> VisibilityIndexDiff:
+        """
+        Compares the index with the live rules without persisting anything. Returns the changes a rebuild would make.
+        """
+        diff = VisibilityIndexDiff()
+        for user in self.get_user_queryset().iterator():
+            diff.extend(self._compute_diff(user=user))
+        return diff
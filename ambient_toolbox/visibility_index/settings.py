@@ -0,0 +1,15 @@
+from django.conf import settings
+
+
+def get_visibility_index_services() -> list[str]:
+    """
+    Dotted paths to all "VisibilityIndexService" classes of the project.
+    """
+    return getattr(settings, "VISIBILITY_INDEX_SERVICES", [])
+
+
+def get_visibility_index_connect_signals() -> bool:
+    """
+    Switch to keep the visibility indices up to date via model signals.
+    """
+    return getattr(settings, "VISIBILITY_INDEX_CONNECT_SIGNALS", True)
@@ -0,0 +1,34 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
+
+from ambient_toolbox.visibility_index.services import VisibilityIndexService
+from ambient_toolbox.visibility_index.settings import get_visibility_index_services
+
+
+def connect_visibility_index(service: VisibilityIndexService) -> None:
+    """
+    Keeps the index of the given service up to date whenever an object of its model is saved or deleted.
+    Saved objects are refreshed after the surrounding transaction has been committed.
+    """
+
+    def refresh_on_save(sender, instance, using, **kwargs):
+        # Evaluate the rules once the changes are visible to other connections and skip it on a rollback
+        object_id = instance.pk
+        transaction.on_commit(lambda: service.refresh_objects(object_ids=[object_id]), using=using)
+
+    def remove_on_delete(sender, instance, **kwargs):
+        service.remove_objects(object_ids=[instance.pk])
+
+    dispatch_uid = f"visibility_index.{service.model._meta.label_lower}.{service.index_model._meta.label_lower}"
+    post_save.connect(refresh_on_save, sender=service.model, weak=False, dispatch_uid=dispatch_uid)
+    post_delete.connect(remove_on_delete, sender=service.model, weak=False, dispatch_uid=dispatch_uid)
+
+
+def connect_registered_visibility_indices() -> None:
+    """
+    Connects the signals for all services registered in "VISIBILITY_INDEX_SERVICES".
+    """
+    for service_path in get_visibility_index_services():
+        service_class = import_string(service_path)
+        connect_visibility_index(service=service_class())
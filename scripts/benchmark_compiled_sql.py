@@ -0,0 +1,50 @@
+"""
+Compares building and compiling a permission queryset via the plain ORM with the "cache_compiled_sql" path.
+Only the CPU time on the Python side is measured, no query is sent to the database.
+
+Usage: python scripts/benchmark_compiled_sql.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+
+django.setup()
+
+from testapp.models import ModelWithVisibilityIndex  # noqa: E402
+from testapp.selectors import ModelWithVisibilityIndexSelector  # noqa: E402
+
+
+def compile_queryset(queryset) -> None:
+    queryset.query.get_compiler(using=queryset.db).as_sql()
+
+
+def run_plain(user_id: int) -> None:
+    compile_queryset(
+        ModelWithVisibilityIndexSelector.visible_for.__wrapped__(ModelWithVisibilityIndex.selectors, user_id)
+    )
+
+
+def run_cached(user_id: int) -> None:
+    compile_queryset(ModelWithVisibilityIndex.selectors.visible_for(user_id=user_id))
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    # Warm up the template cache
+    run_cached(user_id=1)
+
+    for label, function in (("Plain ORM", run_plain), ("Compiled SQL cache", run_cached)):
+        duration = timeit.timeit(lambda function=function: function(user_id=42), number=iterations)
+        print(f"{label}: {duration / iterations * 1_000_000:.1f} µs per call ({iterations} iterations)")
+
+
+if __name__ == "__main__":
+    main()
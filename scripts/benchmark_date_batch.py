@@ -0,0 +1,74 @@
+"""
+Compares calling the scalar date utilities in a loop with their batch versions in "ambient_toolbox.utils.date_batch".
+
+Usage: python scripts/benchmark_date_batch.py [rows]
+"""
+
+import datetime
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings")
+
+import django
+
+django.setup()
+
+from ambient_toolbox.utils import date as scalar_date  # noqa: E402
+from ambient_toolbox.utils import date_batch  # noqa: E402
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    randomizer = random.Random(0)
+    start_ordinal = datetime.date(2000, 1, 1).toordinal()
+    date_list = [datetime.date.fromordinal(start_ordinal + randomizer.randint(0, 10_000)) for _ in range(rows)]
+    end_date_list = [date_object + datetime.timedelta(days=randomizer.randint(0, 1_000)) for date_object in date_list]
+
+    benchmarks = (
+        (
+            "add_months",
+            lambda: [scalar_date.add_months(date_object, 3) for date_object in date_list],
+            lambda: date_batch.add_months(date_list, 3),
+        ),
+        (
+            "date_month_delta",
+            lambda: [
+                scalar_date.date_month_delta(start_date, end_date)
+                for start_date, end_date in zip(date_list, end_date_list)
+            ],
+            lambda: date_batch.date_month_delta(date_list, end_date_list),
+        ),
+        (
+            "get_first_and_last_of_month",
+            lambda: [scalar_date.get_first_and_last_of_month(date_object) for date_object in date_list],
+            lambda: date_batch.get_first_and_last_of_month(date_list),
+        ),
+        (
+            "next_weekday",
+            lambda: [scalar_date.next_weekday(date_object, 0) for date_object in date_list],
+            lambda: date_batch.next_weekday(date_list, 0),
+        ),
+        (
+            "check_date_is_weekend",
+            lambda: [scalar_date.check_date_is_weekend(date_object) for date_object in date_list],
+            lambda: date_batch.check_date_is_weekend(date_list),
+        ),
+    )
+
+    for label, run_scalar, run_batch in benchmarks:
+        scalar_duration = timeit.timeit(run_scalar, number=1)
+        batch_duration = timeit.timeit(run_batch, number=1)
+        print(
+            f"{label}: {scalar_duration * 1_000:.0f} ms scalar, {batch_duration * 1_000:.0f} ms batch "
+            f"({scalar_duration / batch_duration:.1f}x, {rows} rows)"
+        )
+
+
+if __name__ == "__main__":
+    main()
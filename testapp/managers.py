@@ -1,6 +1,9 @@
 from django.db import models
 
-from ambient_toolbox.managers import GetOrNoneManagerMixin
+from ambient_toolbox.managers import AbstractUserSpecificQuerySet, GetOrNoneManagerMixin
+from ambient_toolbox.selectors.compiled_sql import cache_compiled_sql
+from ambient_toolbox.static_role_permissions.row_rules import ALL_ROWS, RowRuleQuerySet, RowRules, UserAttribute
+from ambient_toolbox.visibility_index.managers import VisibilityIndexQuerySet
 
 
 class ModelWithSelectorQuerySet(models.QuerySet):
@@ -9,3 +12,39 @@ class ModelWithSelectorQuerySet(models.QuerySet):
 
 class ModelWithGetOrNoneManager(GetOrNoneManagerMixin, models.Manager):
     pass
+
+
+class ModelWithVisibilityIndexRuleQuerySet(AbstractUserSpecificQuerySet):
+    @cache_compiled_sql(argument_name="owner_id")
+    def owned_by(self, owner_id: int):
+        return self.filter(owner_id=owner_id)
+
+    def visible_for(self, user):
+        return self.filter(models.Q(owner=user) | models.Q(is_public=True))
+
+    def editable_for(self, user):
+        return self.filter(owner=user)
+
+    def deletable_for(self, user):
+        return self.filter(owner=user, is_public=False)
+
+
+class ModelWithVisibilityIndexQuerySet(VisibilityIndexQuerySet):
+    visibility_index_model = "testapp.ModelWithVisibilityIndexEntry"
+
+
+class ModelWithRowRulesQuerySet(RowRuleQuerySet):
+    row_rules = RowRules(
+        {
+            "visible_for": {
+                "admin": ALL_ROWS,
+                "editor": {"tenant": UserAttribute("tenant_id")},
+                "author": [{"owner": UserAttribute("pk")}, models.Q(is_public=True)],
+            },
+            "editable_for": {
+                "admin": ALL_ROWS,
+                "editor": {"tenant": UserAttribute("tenant_id"), "is_public": False},
+                "author": {"owner": UserAttribute("pk")},
+            },
+        }
+    )
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("testapp", "0004_modelwithvisibilityindex"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ModelWithReferenceDataManager",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("code", models.CharField(max_length=10, unique=True)),
+                ("name", models.CharField(max_length=50)),
+                (
+                    "parent",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="children_with_reference_data",
+                        to="testapp.modelwithreferencedatamanager",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("code",),
+            },
+        ),
+    ]
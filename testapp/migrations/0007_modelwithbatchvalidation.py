@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:09
+
+import ambient_toolbox.mixins.validation
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("testapp", "0006_modelwithrowrules"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ModelWithBatchValidation",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=50)),
+                ("code", models.CharField(max_length=10, unique=True)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="models_with_batch_validation",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("owner", "name"), name="unique_owner_name")],
+            },
+            bases=(ambient_toolbox.mixins.validation.CleanOnSaveMixin, models.Model),
+        ),
+    ]
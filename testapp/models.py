@@ -1,15 +1,22 @@
+from django.core.exceptions import ValidationError
 from django.core.mail import EmailMultiAlternatives
 from django.db import models
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 
-from ambient_toolbox.managers import GloballyVisibleQuerySet
+from ambient_toolbox.managers import GloballyVisibleQuerySet, ReferenceDataManager
 from ambient_toolbox.mixins.bleacher import BleacherMixin
 from ambient_toolbox.mixins.models import PermissionModelMixin, SaveWithoutSignalsMixin
-from ambient_toolbox.mixins.validation import CleanOnSaveMixin
+from ambient_toolbox.mixins.validation import CleanOnSaveMixin, ReferenceExistsCheck, UniqueTogetherCheck
 from ambient_toolbox.models import CommonInfo
-from testapp.managers import ModelWithGetOrNoneManager, ModelWithSelectorQuerySet
-from testapp.selectors import ModelWithSelectorGloballyVisibleSelector
+from ambient_toolbox.visibility_index.models import AbstractVisibilityIndex
+from testapp.managers import (
+    ModelWithGetOrNoneManager,
+    ModelWithRowRulesQuerySet,
+    ModelWithSelectorQuerySet,
+    ModelWithVisibilityIndexQuerySet,
+)
+from testapp.selectors import ModelWithSelectorGloballyVisibleSelector, ModelWithVisibilityIndexSelector
 
 
 class MySingleSignalModel(models.Model):
@@ -97,6 +104,30 @@ class ModelWithCleanMixin(CleanOnSaveMixin, models.Model):
         return True
 
 
+class ModelWithBatchValidation(CleanOnSaveMixin, models.Model):
+    owner = models.ForeignKey(
+        "auth.User", related_name="models_with_batch_validation", on_delete=models.CASCADE, null=True, blank=True
+    )
+    name = models.CharField(max_length=50)
+    code = models.CharField(max_length=10, unique=True)
+
+    BATCH_VALIDATION_CHECKS = [
+        UniqueTogetherCheck("code"),
+        UniqueTogetherCheck("owner", "name"),
+        ReferenceExistsCheck("owner"),
+    ]
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["owner", "name"], name="unique_owner_name")]
+
+    def __str__(self):
+        return self.name
+
+    def clean(self):
+        if self.name == "invalid":
+            raise ValidationError({"name": "Invalid name."})
+
+
 class MyPermissionModelMixin(PermissionModelMixin, models.Model):
     def __str__(self):
         return str(self.id)
@@ -157,3 +188,45 @@ class ModelWithGetOrNoneManagerModel(models.Model):
 
     def __str__(self):
         return self.id
+
+
+class ModelWithVisibilityIndex(models.Model):
+    owner = models.ForeignKey("auth.User", related_name="models_with_visibility_index", on_delete=models.CASCADE)
+    is_public = models.BooleanField(default=False)
+
+    objects = ModelWithVisibilityIndexQuerySet.as_manager()
+    selectors = ModelWithVisibilityIndexSelector()
+
+    def __str__(self):
+        return str(self.id)
+
+
+class ModelWithVisibilityIndexEntry(AbstractVisibilityIndex):
+    pass
+
+
+class ModelWithReferenceDataManager(models.Model):
+    code = models.CharField(max_length=10, unique=True)
+    name = models.CharField(max_length=50)
+    parent = models.ForeignKey(
+        "self", blank=True, null=True, related_name="children_with_reference_data", on_delete=models.CASCADE
+    )
+
+    objects = ReferenceDataManager()
+
+    class Meta:
+        ordering = ("code",)
+
+    def __str__(self):
+        return self.code
+
+
+class ModelWithRowRules(models.Model):
+    owner = models.ForeignKey("auth.User", related_name="models_with_row_rules", on_delete=models.CASCADE)
+    tenant = models.PositiveIntegerField(null=True, blank=True)
+    is_public = models.BooleanField(default=False)
+
+    objects = ModelWithRowRulesQuerySet.as_manager()
+
+    def __str__(self):
+        return str(self.id)
@@ -2,7 +2,7 @@ from ambient_toolbox.permissions.fixtures.declarations import GroupPermissionDec
 
 
 class TestGroupDeclaration(GroupPermissionDeclaration):
-    name = ("group_1",)
+    name = "group_1"
     permission_list = (
         PermissionModelDeclaration(
             app_label="testapp",
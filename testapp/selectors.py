@@ -1,5 +1,33 @@
-from ambient_toolbox.selectors.permission import GloballyVisibleSelector
+from django.contrib.auth.models import Group
+from django.db.models import Q, QuerySet
+
+from ambient_toolbox.selectors.base import Selector
+from ambient_toolbox.selectors.compiled_sql import cache_compiled_sql
+from ambient_toolbox.selectors.permission import AbstractUserSpecificSelectorMixin, GloballyVisibleSelector
 
 
 class ModelWithSelectorGloballyVisibleSelector(GloballyVisibleSelector):
     pass
+
+
+class ModelWithVisibilityIndexSelector(AbstractUserSpecificSelectorMixin, Selector):
+    @cache_compiled_sql()
+    def visible_for(self, user_id: int) -> QuerySet:
+        return self.model.objects.filter(
+            Q(owner_id=user_id)
+            | Q(is_public=True, owner__is_active=True)
+            | Q(owner__groups__in=Group.objects.filter(user=user_id))
+        ).distinct()
+
+    @cache_compiled_sql(shape_key=lambda user_id: user_id < 0)
+    def editable_for(self, user_id: int) -> QuerySet:
+        if user_id < 0:
+            return self.model.objects.none()
+        return self.model.objects.filter(owner_id=user_id)
+
+    @cache_compiled_sql()
+    def deletable_for(self, user_id: int) -> QuerySet:
+        # Shape depends on the argument without declaring it via "shape_key"
+        if user_id % 2:
+            return self.model.objects.filter(owner_id=user_id, is_public=False)
+        return self.model.objects.filter(owner_id=user_id)
@@ -0,0 +1,10 @@
+from ambient_toolbox.visibility_index.services import VisibilityIndexService
+from testapp.managers import ModelWithVisibilityIndexRuleQuerySet
+from testapp.models import ModelWithVisibilityIndex, ModelWithVisibilityIndexEntry
+
+
+class ModelWithVisibilityIndexService(VisibilityIndexService):
+    model = ModelWithVisibilityIndex
+    index_model = ModelWithVisibilityIndexEntry
+    rule_queryset_class = ModelWithVisibilityIndexRuleQuerySet
+    correlate_rules = True
@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from testapp.models import BleacherMixinModel
+
+
+class RebleachModelCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.obj_list = BleacherMixinModel.objects.bulk_create(
+            [
+                BleacherMixinModel(content="<p>Clean</p>"),
+                BleacherMixinModel(content="<script>Evil</script>Dirty"),
+            ]
+        )
+
+    def test_rebleach(self):
+        out = StringIO()
+        call_command("rebleach_model", "testapp.BleacherMixinModel", stdout=out)
+
+        self.assertEqual(BleacherMixinModel.objects.get(pk=self.obj_list[1].pk).content, "Dirty")
+        self.assertIn(f"Processed 2 rows (1 changed), last pk {self.obj_list[1].pk}", out.getvalue())
+        self.assertIn("Finished testapp.BleacherMixinModel: 2 rows processed, 1 changed", out.getvalue())
+
+    def test_rebleach_start_after(self):
+        out = StringIO()
+        call_command("rebleach_model", "testapp.BleacherMixinModel", start_after=str(self.obj_list[1].pk), stdout=out)
+
+        self.assertEqual(BleacherMixinModel.objects.get(pk=self.obj_list[1].pk).content, "<script>Evil</script>Dirty")
+        self.assertIn("0 rows processed, 0 changed", out.getvalue())
+
+    def test_rebleach_dry_run(self):
+        out = StringIO()
+        call_command("rebleach_model", "testapp.BleacherMixinModel", dry_run=True, stdout=out)
+
+        self.assertEqual(BleacherMixinModel.objects.get(pk=self.obj_list[1].pk).content, "<script>Evil</script>Dirty")
+        self.assertIn('Starting in "dry-run" mode...', out.getvalue())
+        self.assertIn("2 rows processed, 1 changed", out.getvalue())
+
+    def test_rebleach_invalid_model(self):
+        with self.assertRaisesMessage(RuntimeError, 'Model "testapp.UnknownModel" not found.'):
+            call_command("rebleach_model", "testapp.UnknownModel", stdout=StringIO())
@@ -0,0 +1,48 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from testapp.models import ModelWithVisibilityIndex, ModelWithVisibilityIndexEntry
+
+
+@override_settings(VISIBILITY_INDEX_SERVICES=["testapp.services.ModelWithVisibilityIndexService"])
+class RebuildVisibilityIndexCommandTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        user = User.objects.create(username="my-user")
+        ModelWithVisibilityIndex.objects.create(owner=user)
+
+    def test_rebuild(self):
+        out = StringIO()
+        call_command("rebuild_visibility_index", stdout=out)
+
+        self.assertEqual(ModelWithVisibilityIndexEntry.objects.count(), 1)
+        self.assertIn("testapp.ModelWithVisibilityIndexEntry: 1 created, 0 updated, 0 deleted", out.getvalue())
+
+    def test_check_inconsistent(self):
+        out = StringIO()
+        with self.assertRaises(SystemExit) as exc:
+            call_command("rebuild_visibility_index", check=True, stdout=out)
+
+        self.assertEqual(exc.exception.code, 1)
+        self.assertEqual(ModelWithVisibilityIndexEntry.objects.count(), 0)
+        self.assertIn("1 created", out.getvalue())
+
+    def test_check_consistent(self):
+        call_command("rebuild_visibility_index", stdout=StringIO())
+
+        out = StringIO()
+        call_command("rebuild_visibility_index", check=True, stdout=out)
+
+        self.assertIn("0 created, 0 updated, 0 deleted", out.getvalue())
+
+    @override_settings(VISIBILITY_INDEX_SERVICES=[])
+    def test_no_services_registered(self):
+        out = StringIO()
+        call_command("rebuild_visibility_index", stdout=out)
+
+        self.assertEqual(out.getvalue(), "")
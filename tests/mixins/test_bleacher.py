@@ -1,11 +1,15 @@
+import copy
+import dataclasses
+import pickle
 import warnings
 from unittest import mock
 
 import pytest
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.test import TestCase
 
-from ambient_toolbox.mixins.bleacher import BleacherMixin
+from ambient_toolbox.mixins.bleacher import BleacherMixin, SanitizerConfig
 from testapp.models import BleacherMixinModel
 
 
@@ -20,17 +24,17 @@ class BleacherMixinTest(TestCase):
     @mock.patch.object(BleacherMixin, "DEFAULT_ALLOWED_TAGS", ["a", "b", "p"])
     @pytest.mark.filterwarnings("ignore:Please use a set instead of a list or tuple")
     def test_init_allowed_tags_casted_to_set(self, *args):
-        """Test that ALLOWED_TAGS are properly converted to a set."""
+        """Test that ALLOWED_TAGS are properly converted to a frozenset."""
         obj = BleacherMixinModel()
         self.assertEqual({"a", "b", "p"}, obj.allowed_tags)
-        self.assertIs(True, isinstance(obj.allowed_tags, set))
+        self.assertIs(True, isinstance(obj.allowed_tags, frozenset))
 
     @mock.patch.object(BleacherMixin, "DEFAULT_ALLOWED_ATTRIBUTES", {"img": {"alt"}})
     def test_init_allowed_attributes_casted_to_set(self):
-        """Test that ALLOWED_ATTRIBUTES values are properly stored as sets."""
+        """Test that ALLOWED_ATTRIBUTES values are properly stored as frozensets."""
         obj = BleacherMixinModel()
         self.assertEqual({"img": {"alt"}}, obj.allowed_attributes)
-        self.assertIs(True, isinstance(obj.allowed_attributes["img"], set))
+        self.assertIs(True, isinstance(obj.allowed_attributes["img"], frozenset))
 
     def test_init_allowed_attributes_list_converted_to_set(self):
         """Test that list attributes are converted to sets with deprecation warning."""
@@ -52,7 +56,7 @@ class BleacherMixinTest(TestCase):
             self.assertEqual(w[0].category, DeprecationWarning)
             # Verify conversion happened
             self.assertEqual({"alt", "src"}, obj.allowed_attributes["img"])
-            self.assertIsInstance(obj.allowed_attributes["img"], set)
+            self.assertIsInstance(obj.allowed_attributes["img"], frozenset)
 
     def test_init_allowed_attributes_tuple_converted_to_set(self):
         """Test that tuple attributes are converted to sets with deprecation warning."""
@@ -74,7 +78,7 @@ class BleacherMixinTest(TestCase):
             self.assertEqual(w[0].category, DeprecationWarning)
             # Verify conversion happened
             self.assertEqual({"href", "rel"}, obj.allowed_attributes["a"])
-            self.assertIsInstance(obj.allowed_attributes["a"], set)
+            self.assertIsInstance(obj.allowed_attributes["a"], frozenset)
 
     def test_init_custom_allowed_tags(self):
         """Test initialization with custom ALLOWED_TAGS on model."""
@@ -173,3 +177,222 @@ class BleacherMixinTest(TestCase):
         """Test that BLEACH_FIELD_LIST is properly loaded."""
         obj = BleacherMixinModel()
         self.assertEqual(["content"], obj.fields_to_bleach)
+
+    def test_save_skips_unchanged_field(self):
+        """Test that a field is not sanitized again if its value didn't change since the last sanitization."""
+        obj = BleacherMixinModel.objects.create(content="<script>Evil</script>Test")
+
+        with mock.patch("ambient_toolbox.mixins.bleacher.nh3.clean") as mocked_clean:
+            obj.save()
+
+        mocked_clean.assert_not_called()
+        self.assertEqual("Test", obj.content)
+
+    def test_save_sanitizes_changed_field(self):
+        """Test that a changed field is sanitized again."""
+        obj = BleacherMixinModel.objects.create(content="Test")
+
+        obj.content = "<script>Evil</script>Changed"
+        obj.save()
+
+        self.assertEqual("Changed", obj.content)
+
+    @mock.patch.object(BleacherMixinModel, "BLEACH_SKIP_UNCHANGED", False)
+    def test_save_skip_unchanged_disabled(self):
+        """Test that all fields are sanitized on every save if skipping is disabled."""
+        obj = BleacherMixinModel.objects.create(content="Test")
+
+        with mock.patch("ambient_toolbox.mixins.bleacher.nh3.clean", return_value="Test") as mocked_clean:
+            obj.save()
+
+        mocked_clean.assert_called_once()
+
+    def test_save_loaded_values_not_trusted_by_default(self):
+        """Test that values loaded from the database are sanitized, e.g. if they were written via "update()"."""
+        obj = BleacherMixinModel.objects.create(content="Test")
+        BleacherMixinModel.objects.filter(pk=obj.pk).update(content="<script>Evil</script>Test")
+
+        obj = BleacherMixinModel.objects.get(pk=obj.pk)
+        obj.save()
+
+        self.assertEqual("Test", obj.content)
+
+    @mock.patch.object(BleacherMixinModel, "BLEACH_TRUST_LOADED_VALUES", True)
+    def test_save_trust_loaded_values(self):
+        """Test that values loaded from the database are not sanitized again if they are trusted."""
+        obj = BleacherMixinModel.objects.create(content="Test")
+        obj = BleacherMixinModel.objects.get(pk=obj.pk)
+
+        with mock.patch("ambient_toolbox.mixins.bleacher.nh3.clean") as mocked_clean:
+            obj.save()
+
+        mocked_clean.assert_not_called()
+
+    @mock.patch.object(BleacherMixinModel, "BLEACH_TRUST_LOADED_VALUES", True)
+    def test_save_trust_loaded_values_deferred_field(self):
+        """Test that deferred fields are not marked as sanitized."""
+        obj = BleacherMixinModel.objects.create(content="Test")
+        obj = BleacherMixinModel.objects.defer("content").get(pk=obj.pk)
+
+        self.assertEqual({}, obj._bleached_values)
+
+    @mock.patch.object(BleacherMixinModel, "BLEACH_VALIDATE_ONLY", True)
+    def test_save_validate_only_raises_error(self):
+        """Test that unsafe HTML raises an error instead of being rewritten in validate-only mode."""
+        obj = BleacherMixinModel(content="<script>Evil</script>Test")
+
+        with self.assertRaises(ValidationError) as context:
+            obj.save()
+
+        self.assertEqual(
+            {"content": ["This field contains HTML which is not allowed."]}, context.exception.message_dict
+        )
+        self.assertEqual("<script>Evil</script>Test", obj.content)
+        self.assertIsNone(obj.pk)
+
+    @mock.patch.object(BleacherMixinModel, "BLEACH_VALIDATE_ONLY", True)
+    def test_save_validate_only_valid_html(self):
+        """Test that safe HTML is saved unchanged in validate-only mode."""
+        obj = BleacherMixinModel.objects.create(content="<p>Test</p>")
+
+        self.assertEqual("<p>Test</p>", obj.content)
+        self.assertEqual({"content": "<p>Test</p>"}, obj._bleached_values)
+
+    @mock.patch.object(BleacherMixinModel, "BLEACH_VALIDATE_ONLY", True)
+    def test_save_validate_only_normalised_html(self):
+        """Test that values only differing in their serialisation are saved in their normalised form."""
+        for value, normalised_value in (
+            ("Tom & Jerry", "Tom &amp; Jerry"),
+            ("1 < 2", "1 &lt; 2"),
+            ("<p class=x>Test</p>", '<p class="x">Test</p>'),
+            ("<p>Test", "<p>Test</p>"),
+            (
+                '<a href="https://example.com">Link</a>',
+                '<a href="https://example.com" rel="noopener noreferrer">Link</a>',
+            ),
+        ):
+            with self.subTest(value=value):
+                obj = BleacherMixinModel.objects.create(content=value)
+
+                self.assertEqual(normalised_value, obj.content)
+
+    @mock.patch.object(BleacherMixinModel, "BLEACH_VALIDATE_ONLY", True)
+    def test_save_validate_only_disallowed_html_with_entities(self):
+        """Test that disallowed attributes and URL schemes raise an error next to normalised markup."""
+        for value in (
+            "<p class=x onclick=alert(1)>Tom & Jerry</p>",
+            '<a href="javascript:alert(1)">Link</a>',
+            '<a href="jav&#x61;script:alert(1)">Link</a>',
+        ):
+            with self.subTest(value=value), self.assertRaises(ValidationError):
+                BleacherMixinModel(content=value).save()
+
+    def test_sanitizer_config_normalize(self):
+        """Test that normalizing keeps all tags and attributes."""
+        self.assertEqual(
+            '<script>Evil</script><p class="x" onclick="y">Tom &amp; Jerry</p>',
+            SanitizerConfig.normalize("<script>Evil</script><p class=x onclick=y>Tom & Jerry</p>"),
+        )
+
+    def test_sanitizer_config_shared_between_instances(self):
+        """Test that the configuration is compiled once per class and shared by all instances."""
+        BleacherMixinModel()
+
+        with mock.patch.object(SanitizerConfig, "compile") as mocked_compile:
+            obj_1 = BleacherMixinModel()
+            obj_2 = BleacherMixinModel()
+
+        mocked_compile.assert_not_called()
+        self.assertIs(obj_1._sanitizer_config, obj_2._sanitizer_config)
+
+    def test_sanitizer_config_recompiled_on_changed_attribute(self):
+        """Test that replacing the allowlist on the class leads to a new configuration."""
+        config = BleacherMixinModel.get_sanitizer_config()
+
+        with mock.patch.object(BleacherMixinModel, "DEFAULT_ALLOWED_TAGS", ["modal"]):
+            self.assertEqual(frozenset({"modal"}), BleacherMixinModel.get_sanitizer_config().tags)
+
+        self.assertEqual(config, BleacherMixinModel.get_sanitizer_config())
+
+    def test_sanitizer_config_per_class(self):
+        """Test that subclasses with their own allowlists don't share the configuration of their parent."""
+
+        class BleacherTestModel5(BleacherMixinModel):
+            ALLOWED_TAGS = {"p"}
+
+            class Meta:
+                app_label = "testapp"
+                proxy = True
+
+        self.assertEqual(frozenset({"p"}), BleacherTestModel5.get_sanitizer_config().tags)
+        self.assertNotEqual(frozenset({"p"}), BleacherMixinModel.get_sanitizer_config().tags)
+
+    def test_sanitizer_config_immutable(self):
+        """Test that the configuration can't be changed."""
+        obj = BleacherMixinModel()
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            obj._sanitizer_config.tags = frozenset()
+        with self.assertRaises(TypeError):
+            obj.allowed_attributes["img"] = frozenset()
+        with self.assertRaises(AttributeError):
+            obj.allowed_tags.add("script")
+
+    def test_set_allowed_tags_on_instance(self):
+        """Test that assigning allowed tags compiles a configuration for this instance only."""
+        obj = BleacherMixinModel(content="<a>Link</a>")
+        obj._bleached_values["content"] = "<a>Link</a>"
+
+        obj.allowed_tags = {"p"}
+
+        self.assertEqual(frozenset({"p"}), obj.allowed_tags)
+        self.assertEqual(BleacherMixinModel.get_sanitizer_config().nh3_attributes, obj.allowed_attributes)
+        self.assertNotEqual(frozenset({"p"}), BleacherMixinModel().allowed_tags)
+        self.assertIsNot(BleacherMixinModel.get_sanitizer_config(), obj._sanitizer_config)
+
+        obj.save()
+
+        self.assertEqual("Link", obj.content)
+
+    def test_set_allowed_attributes_on_instance(self):
+        """Test that assigning allowed attributes compiles a configuration for this instance only."""
+        obj = BleacherMixinModel(content='<p id="x" class="y">Test</p>')
+
+        obj.allowed_attributes = {"p": {"class"}}
+        obj.save()
+
+        self.assertEqual({"p": frozenset({"class"})}, obj.allowed_attributes)
+        self.assertEqual(BleacherMixinModel.get_sanitizer_config().tags, obj.allowed_tags)
+        self.assertEqual('<p class="y">Test</p>', obj.content)
+
+    def test_set_fields_to_bleach_on_instance(self):
+        """Test that assigning the fields to bleach only affects this instance."""
+        obj = BleacherMixinModel(content="<script>Evil</script>Test")
+
+        obj.fields_to_bleach = []
+        obj.save()
+
+        self.assertEqual([], obj.fields_to_bleach)
+        self.assertEqual(["content"], BleacherMixinModel().fields_to_bleach)
+        self.assertEqual("<script>Evil</script>Test", obj.content)
+
+    def test_sanitizer_config_does_not_mutate_class_attributes(self):
+        """Test that list attributes are converted without changing the class attribute."""
+        allowed_attributes = {"img": ["alt"]}
+
+        with warnings.catch_warnings(record=True):
+            warnings.simplefilter("always")
+            config = SanitizerConfig.compile(tags=["img"], attributes=allowed_attributes)
+
+        self.assertEqual({"img": ["alt"]}, allowed_attributes)
+        self.assertEqual({"img": frozenset({"alt"})}, config.nh3_attributes)
+
+    def test_sanitizer_config_pickle_and_deepcopy(self):
+        """Test that instances holding the configuration can still be pickled and copied."""
+        obj = BleacherMixinModel(content="<p>Text</p>")
+
+        unpickled_obj = pickle.loads(pickle.dumps(obj))
+        copied_obj = copy.deepcopy(obj)
+
+        self.assertEqual(obj._sanitizer_config, unpickled_obj._sanitizer_config)
+        self.assertIs(obj._sanitizer_config, copied_obj._sanitizer_config)
@@ -1,3 +1,5 @@
+from unittest import mock
+
 from django.test import TestCase
 
 from testapp.models import ModelWithSaveWithoutSignalsMixin
@@ -35,3 +37,32 @@ class SaveWithoutSignalsTestCase(TestCase):
         self.instance.save()
 
         self.assertEqual(value_before + 1, self.instance.value)
+
+    def test_save_without_signals_restores_signals_on_error(self):
+        value_before = self.instance.value
+
+        with mock.patch("django.db.models.Model.save", side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                self.instance.save_without_signals()
+        self.instance.save()
+
+        self.assertEqual(value_before + 1, self.instance.value)
+
+    def test_save_many_without_signals(self):
+        instance_list = [ModelWithSaveWithoutSignalsMixin(), ModelWithSaveWithoutSignalsMixin(value=5)]
+
+        with self.assertNumQueries(4):
+            # Savepoint, two inserts and the release of the savepoint
+            result = ModelWithSaveWithoutSignalsMixin.save_many_without_signals(iter(instance_list))
+
+        self.assertEqual(result, instance_list)
+        self.assertEqual([obj.value for obj in instance_list], [0, 5])
+        self.assertTrue(all(obj.pk for obj in instance_list))
+
+    def test_save_many_without_signals_update_fields(self):
+        self.instance.value = 10
+
+        ModelWithSaveWithoutSignalsMixin.save_many_without_signals([self.instance], update_fields=["value"])
+        self.instance.refresh_from_db()
+
+        self.assertEqual(self.instance.value, 10)
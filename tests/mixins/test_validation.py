@@ -1,8 +1,15 @@
 from unittest import mock
 
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-from testapp.models import ModelWithCleanMixin
+from ambient_toolbox.mixins.validation import (
+    BatchCheck,
+    BatchValidationError,
+    ReferenceExistsCheck,
+    UniqueTogetherCheck,
+)
+from testapp.models import ModelWithBatchValidation, ModelWithCleanMixin
 
 
 class CleanOnSaveMixinTest(TestCase):
@@ -16,3 +23,156 @@ class CleanOnSaveMixinTest(TestCase):
             obj.save()
 
         mocked_method.assert_called_once()
+
+
+class BatchValidationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my-user")
+        cls.existing_obj = ModelWithBatchValidation.objects.create(owner=cls.user, name="existing", code="A1")
+
+    def test_validate_many_valid(self):
+        with self.assertNumQueries(3):
+            errors = ModelWithBatchValidation.validate_many(
+                ModelWithBatchValidation(owner=self.user, name=f"name-{i}", code=f"B{i}") for i in range(10)
+            )
+
+        self.assertEqual(errors, {})
+
+    def test_validate_many_query_count_independent_of_batch_size(self):
+        instance_list = [ModelWithBatchValidation(owner=self.user, name=f"name-{i}", code=f"B{i}") for i in range(100)]
+
+        with self.assertNumQueries(3):
+            ModelWithBatchValidation.validate_many(instance_list)
+
+    def test_validate_many_unique_in_database(self):
+        errors = ModelWithBatchValidation.validate_many(
+            [
+                ModelWithBatchValidation(owner=self.user, name="new", code="B1"),
+                ModelWithBatchValidation(owner=self.user, name="existing", code="A1"),
+            ]
+        )
+
+        self.assertEqual(list(errors), [1])
+        self.assertEqual(
+            errors[1].message_dict,
+            {
+                "code": ["Model with batch validation with this Code already exists."],
+                "__all__": ["Model with batch validation with this Owner and Name already exists."],
+            },
+        )
+
+    def test_unique_together_check_many_instances(self):
+        instance_list = [ModelWithBatchValidation(owner=self.user, name=f"name-{i}", code=f"B{i}") for i in range(3000)]
+        instance_list.append(ModelWithBatchValidation(owner=self.user, name="existing", code="A1"))
+
+        for check, expected_queries in (
+            (UniqueTogetherCheck("code"), 7),
+            (UniqueTogetherCheck("owner", "name"), 7),
+        ):
+            with self.subTest(field_names=check.field_names), self.assertNumQueries(expected_queries):
+                errors = list(check.get_errors(model=ModelWithBatchValidation, instances=instance_list))
+
+            self.assertEqual([position for position, _ in errors], [3000])
+
+    def test_validate_many_unique_within_batch(self):
+        errors = ModelWithBatchValidation.validate_many(
+            [
+                ModelWithBatchValidation(owner=self.user, name="new", code="B1"),
+                ModelWithBatchValidation(owner=self.user, name="other", code="B1"),
+            ]
+        )
+
+        self.assertEqual(list(errors), [1])
+        self.assertEqual(
+            errors[1].message_dict, {"code": ["Model with batch validation with this Code already exists."]}
+        )
+
+    def test_validate_many_unique_existing_instance_itself(self):
+        self.existing_obj.name = "changed"
+
+        errors = ModelWithBatchValidation.validate_many([self.existing_obj])
+
+        self.assertEqual(errors, {})
+
+    def test_validate_many_unique_none_skipped(self):
+        errors = ModelWithBatchValidation.validate_many(
+            [
+                ModelWithBatchValidation(owner=None, name="new", code="B1"),
+                ModelWithBatchValidation(owner=None, name="new", code="B2"),
+            ]
+        )
+
+        self.assertEqual(errors, {})
+
+    def test_validate_many_reference_missing(self):
+        errors = ModelWithBatchValidation.validate_many(
+            [
+                ModelWithBatchValidation(owner_id=self.user.id, name="new", code="B1"),
+                ModelWithBatchValidation(owner_id=self.user.id + 100, name="new", code="B2"),
+            ]
+        )
+
+        self.assertEqual(list(errors), [1])
+        self.assertEqual(
+            errors[1].message_dict, {"owner": [f"user instance with id {self.user.id + 100} is not a valid choice."]}
+        )
+
+    def test_validate_many_clean_called_per_instance(self):
+        errors = ModelWithBatchValidation.validate_many(
+            [
+                ModelWithBatchValidation(owner=self.user, name="invalid", code="A1"),
+                ModelWithBatchValidation(owner=self.user, name="valid", code="B1"),
+            ]
+        )
+
+        self.assertEqual(list(errors), [0])
+        self.assertEqual(
+            errors[0].message_dict,
+            {"code": ["Model with batch validation with this Code already exists."], "name": ["Invalid name."]},
+        )
+
+    def test_validate_many_without_checks(self):
+        with self.assertNumQueries(0):
+            errors = ModelWithCleanMixin.validate_many([ModelWithCleanMixin(), ModelWithCleanMixin()])
+
+        self.assertEqual(errors, {})
+
+    def test_bulk_create_validated(self):
+        with self.assertNumQueries(4):
+            obj_list = ModelWithBatchValidation.bulk_create_validated(
+                [
+                    ModelWithBatchValidation(owner=self.user, name="new", code="B1"),
+                    ModelWithBatchValidation(owner=self.user, name="other", code="B2"),
+                ]
+            )
+
+        self.assertEqual(len(obj_list), 2)
+        self.assertEqual(ModelWithBatchValidation.objects.count(), 3)
+
+    def test_bulk_create_validated_invalid(self):
+        with self.assertRaises(BatchValidationError) as exc:
+            ModelWithBatchValidation.bulk_create_validated(
+                [
+                    ModelWithBatchValidation(owner=self.user, name="new", code="B1"),
+                    ModelWithBatchValidation(owner=self.user, name="invalid", code="B2"),
+                ]
+            )
+
+        self.assertEqual(list(exc.exception.errors_by_position), [1])
+        self.assertEqual(exc.exception.messages, ["Invalid name."])
+        self.assertEqual(ModelWithBatchValidation.objects.count(), 1)
+
+    def test_batch_check_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            list(BatchCheck().get_errors(model=ModelWithBatchValidation, instances=[]))
+
+    def test_unique_together_check_without_fields(self):
+        with self.assertRaisesMessage(AssertionError, "Please pass at least one field name."):
+            UniqueTogetherCheck()
+
+    def test_reference_exists_check_no_foreign_key(self):
+        with self.assertRaisesMessage(AssertionError, "Field 'name' is not a foreign key."):
+            list(ReferenceExistsCheck("name").get_errors(model=ModelWithBatchValidation, instances=[]))
@@ -0,0 +1,225 @@
+from django.contrib.auth.models import Group, Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ambient_toolbox.permissions.fixtures.declarations import GroupPermissionDeclaration, PermissionModelDeclaration
+from ambient_toolbox.permissions.fixtures.services import GroupPermissionPlan, PermissionFixturePlanService
+
+
+def get_group_declaration(name: str, codename_list: list[str]) -> GroupPermissionDeclaration:
+    return GroupPermissionDeclaration(
+        name=name,
+        permission_list=[
+            PermissionModelDeclaration(app_label="testapp", codename_list=codename_list, model="mysinglesignalmodel")
+        ],
+    )
+
+
+class GroupPermissionPlanTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.group = Group.objects.create(name="my_group")
+        cls.permission_view = Permission.objects.get_by_natural_key(
+            app_label="testapp", codename="view_mysinglesignalmodel", model="mysinglesignalmodel"
+        )
+
+    def test_has_changes(self):
+        self.assertFalse(GroupPermissionPlan(group_name="my_group", group=self.group).has_changes)
+        self.assertTrue(GroupPermissionPlan(group_name="my_group", group=None).has_changes)
+        self.assertTrue(
+            GroupPermissionPlan(
+                group_name="my_group", group=self.group, new_permissions=[self.permission_view]
+            ).has_changes
+        )
+        self.assertTrue(
+            GroupPermissionPlan(
+                group_name="my_group", group=self.group, removed_permissions=[self.permission_view]
+            ).has_changes
+        )
+
+    def test_as_dict(self):
+        self.assertEqual(
+            GroupPermissionPlan(group_name="my_group", group=None, new_permissions=[self.permission_view]).as_dict(),
+            {"group": "my_group", "created": True, "added": ["testapp.view_mysinglesignalmodel"], "removed": []},
+        )
+
+
+class PermissionFixturePlanServiceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.group = Group.objects.create(name="group_1")
+
+        cls.permission_view = Permission.objects.get_by_natural_key(
+            app_label="testapp", codename="view_mysinglesignalmodel", model="mysinglesignalmodel"
+        )
+        cls.permission_change = Permission.objects.get_by_natural_key(
+            app_label="testapp", codename="change_mysinglesignalmodel", model="mysinglesignalmodel"
+        )
+
+    def test_init_duplicated_group(self):
+        with self.assertRaisesMessage(ValueError, 'Group "group_1" declared twice.'):
+            PermissionFixturePlanService(
+                group_declaration_list=[get_group_declaration("group_1", []), get_group_declaration("group_1", [])]
+            )
+
+    def test_get_plan(self):
+        self.group.permissions.add(self.permission_view)
+
+        plan = PermissionFixturePlanService(
+            group_declaration_list=[
+                get_group_declaration("group_1", ["change_mysinglesignalmodel"]),
+                get_group_declaration("group_2", ["view_mysinglesignalmodel"]),
+            ]
+        ).get_plan()
+
+        self.assertEqual(
+            plan,
+            [
+                GroupPermissionPlan(
+                    group_name="group_1",
+                    group=self.group,
+                    new_permissions=[self.permission_change],
+                    removed_permissions=[self.permission_view],
+                ),
+                GroupPermissionPlan(group_name="group_2", group=None, new_permissions=[self.permission_view]),
+            ],
+        )
+
+    def test_get_plan_invalid_permission(self):
+        service = PermissionFixturePlanService(
+            group_declaration_list=[get_group_declaration("group_1", ["invalid_permission"])]
+        )
+
+        with self.assertRaisesMessage(
+            ValueError, 'Invalid permission "mysinglesignalmodel.invalid_permission" declared.'
+        ):
+            service.get_plan()
+
+    def test_get_plan_number_of_queries_independent_of_groups(self):
+        def count_queries(group_count: int) -> int:
+            codename_list = ["view_mysinglesignalmodel", "change_mysinglesignalmodel"]
+            service = PermissionFixturePlanService(
+                group_declaration_list=[
+                    get_group_declaration("group_1", codename_list),
+                    *(get_group_declaration(f"other_group_{i}", codename_list) for i in range(group_count)),
+                ]
+            )
+            with CaptureQueriesContext(connection) as context:
+                service.get_plan()
+            return len(context.captured_queries)
+
+        # Groups, permissions and existing group permissions
+        self.assertEqual(count_queries(1), 3)
+        self.assertEqual(count_queries(10), 3)
+
+    def test_process(self):
+        self.group.permissions.add(self.permission_view)
+
+        plan = PermissionFixturePlanService(
+            group_declaration_list=[
+                get_group_declaration("group_1", ["change_mysinglesignalmodel"]),
+                get_group_declaration("group_2", ["view_mysinglesignalmodel", "change_mysinglesignalmodel"]),
+            ]
+        ).process()
+
+        self.assertEqual(len(plan), 2)
+        self.assertEqual(list(self.group.permissions.all()), [self.permission_change])
+        self.assertEqual(
+            set(Group.objects.get(name="group_2").permissions.all()), {self.permission_view, self.permission_change}
+        )
+
+    def test_process_dry_run(self):
+        self.group.permissions.add(self.permission_view)
+
+        plan = PermissionFixturePlanService(
+            group_declaration_list=[
+                get_group_declaration("group_1", ["change_mysinglesignalmodel"]),
+                get_group_declaration("group_2", ["view_mysinglesignalmodel"]),
+            ],
+            dry_run=True,
+        ).process()
+
+        self.assertTrue(all(group_plan.has_changes for group_plan in plan))
+        self.assertEqual(list(self.group.permissions.all()), [self.permission_view])
+        self.assertFalse(Group.objects.filter(name="group_2").exists())
+
+    def test_process_no_changes(self):
+        self.group.permissions.add(self.permission_view)
+        service = PermissionFixturePlanService(
+            group_declaration_list=[get_group_declaration("group_1", ["view_mysinglesignalmodel"])]
+        )
+
+        plan = service.get_plan()
+        self.assertFalse(plan[0].has_changes)
+
+        with self.assertNumQueries(0):
+            service.apply(plan)
+
+    def test_get_checksum_stable(self):
+        service = PermissionFixturePlanService(
+            group_declaration_list=[get_group_declaration("group_1", ["view_mysinglesignalmodel"])]
+        )
+
+        self.assertEqual(service.get_checksum(), service.get_checksum())
+
+    def test_get_checksum_changes_with_declarations(self):
+        checksum = PermissionFixturePlanService(
+            group_declaration_list=[get_group_declaration("group_1", ["view_mysinglesignalmodel"])]
+        ).get_checksum()
+
+        self.assertNotEqual(
+            PermissionFixturePlanService(
+                group_declaration_list=[get_group_declaration("group_1", ["change_mysinglesignalmodel"])]
+            ).get_checksum(),
+            checksum,
+        )
+
+    def test_get_checksum_changes_with_database(self):
+        service = PermissionFixturePlanService(
+            group_declaration_list=[get_group_declaration("group_1", ["view_mysinglesignalmodel"])]
+        )
+        checksum = service.get_checksum()
+
+        self.group.permissions.add(self.permission_change)
+
+        self.assertNotEqual(service.get_checksum(), checksum)
+
+    def test_get_checksum_changes_with_swapped_permissions(self):
+        other_group = Group.objects.create(name="group_2")
+        service = PermissionFixturePlanService(
+            group_declaration_list=[
+                get_group_declaration("group_1", ["view_mysinglesignalmodel"]),
+                get_group_declaration("group_2", ["change_mysinglesignalmodel"]),
+            ]
+        )
+        self.group.permissions.add(self.permission_view)
+        other_group.permissions.add(self.permission_change)
+        checksum = service.get_checksum()
+
+        self.group.permissions.set([self.permission_change])
+        other_group.permissions.set([self.permission_view])
+
+        self.assertNotEqual(service.get_checksum(), checksum)
+
+    def test_get_checksum_changes_with_group_without_permissions(self):
+        service = PermissionFixturePlanService(
+            group_declaration_list=[get_group_declaration("group_2", ["view_mysinglesignalmodel"])]
+        )
+        checksum = service.get_checksum()
+
+        Group.objects.create(name="group_2")
+
+        self.assertNotEqual(service.get_checksum(), checksum)
+
+    def test_get_checksum_single_query(self):
+        service = PermissionFixturePlanService(
+            group_declaration_list=[get_group_declaration("group_1", ["view_mysinglesignalmodel"])]
+        )
+
+        with self.assertNumQueries(1):
+            service.get_checksum()
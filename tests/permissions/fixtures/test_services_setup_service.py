@@ -1,5 +1,7 @@
 from django.contrib.auth.models import Group, Permission
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from ambient_toolbox.permissions.fixtures.declarations import GroupPermissionDeclaration, PermissionModelDeclaration
 from ambient_toolbox.permissions.fixtures.services import PermissionSetupService
@@ -172,3 +174,63 @@ class PermissionSetupServiceTest(TestCase):
         self.group.refresh_from_db()
         self.assertEqual(self.group.permissions.count(), 1)
         self.assertEqual(self.group.permissions.all().first(), self.permission_view)
+
+    def test_process_case_insensitive_declaration(self):
+        group_declaration = GroupPermissionDeclaration(
+            name="my_group",
+            permission_list=[
+                PermissionModelDeclaration(
+                    app_label="TestApp", codename_list=["Change_MySingleSignalModel"], model="MySingleSignalModel"
+                )
+            ],
+        )
+
+        new_permissions, _removed_permissions = PermissionSetupService(group_declaration=group_declaration).process()
+
+        self.assertEqual(new_permissions, [self.permission_change])
+
+    def test_process_multiple_models_keep_declaration_order(self):
+        permission_user = Permission.objects.get_by_natural_key(app_label="auth", codename="view_user", model="user")
+        group_declaration = GroupPermissionDeclaration(
+            name="my_group",
+            permission_list=[
+                PermissionModelDeclaration(
+                    app_label="testapp",
+                    codename_list=["view_mysinglesignalmodel", "change_mysinglesignalmodel"],
+                    model="mysinglesignalmodel",
+                ),
+                PermissionModelDeclaration(app_label="auth", codename_list=["view_user"], model="user"),
+            ],
+        )
+
+        new_permissions, _removed_permissions = PermissionSetupService(group_declaration=group_declaration).process()
+
+        self.assertEqual(new_permissions, [self.permission_view, self.permission_change, permission_user])
+        self.assertEqual(self.group.permissions.count(), 3)
+
+    def test_process_number_of_queries_independent_of_permissions(self):
+        def count_queries(codename_list: list[str]) -> int:
+            self.group.permissions.clear()
+            group_declaration = GroupPermissionDeclaration(
+                name="my_group",
+                permission_list=[
+                    PermissionModelDeclaration(
+                        app_label="testapp", codename_list=codename_list, model="mysinglesignalmodel"
+                    )
+                ],
+            )
+            with CaptureQueriesContext(connection) as context:
+                PermissionSetupService(group_declaration=group_declaration).process()
+            return len(context.captured_queries)
+
+        self.assertEqual(
+            count_queries(["view_mysinglesignalmodel"]),
+            count_queries(
+                [
+                    "add_mysinglesignalmodel",
+                    "change_mysinglesignalmodel",
+                    "delete_mysinglesignalmodel",
+                    "view_mysinglesignalmodel",
+                ]
+            ),
+        )
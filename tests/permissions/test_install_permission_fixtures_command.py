@@ -1,11 +1,16 @@
+import json
 from argparse import ArgumentParser
+from io import StringIO
 from unittest import mock
 
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 from django.test.utils import override_settings
 
-from ambient_toolbox.management.commands.install_permission_fixtures import Command
-from ambient_toolbox.permissions.fixtures.services import PermissionSetupService
+from ambient_toolbox.management.commands.install_permission_fixtures import CHECKSUM_CACHE_KEY, Command
+from ambient_toolbox.permissions.fixtures.services import PermissionFixturePlanService
 
 
 class InstallPermissionFixturesCommandTest(TestCase):
@@ -13,6 +18,11 @@ class InstallPermissionFixturesCommandTest(TestCase):
     def setUpTestData(cls):
         super().setUpTestData()
 
+    def setUp(self):
+        super().setUp()
+
+        cache.delete(CHECKSUM_CACHE_KEY)
+
     def test_add_arguments_regular(self):
         command = Command()
 
@@ -20,26 +30,104 @@ class InstallPermissionFixturesCommandTest(TestCase):
 
         command.add_arguments(parser)
 
-        self.assertTrue("--dry-run" in [action.option_strings[0] for action in parser._actions])
+        option_list = [action.option_strings[0] for action in parser._actions]
+        self.assertTrue("--dry-run" in option_list)
+        self.assertTrue("--format" in option_list)
+        self.assertTrue("--skip-unchanged" in option_list)
 
     @override_settings(GROUP_PERMISSION_FIXTURES=["testapp.permissions.TestGroupDeclaration"])
-    @mock.patch.object(PermissionSetupService, "process", return_value=([], []))
+    @mock.patch.object(PermissionFixturePlanService, "process", return_value=[])
     def test_run_command_regular(self, mocked_process):
         command = Command()
         command.handle()
 
         mocked_process.assert_called_once()
 
-    @mock.patch.object(PermissionSetupService, "process")
+    @mock.patch.object(PermissionFixturePlanService, "process", return_value=[])
     def test_run_command_no_settings_variable(self, mocked_process):
-        command = Command()
-        command.handle()
+        stdout = StringIO()
+        call_command("install_permission_fixtures", stdout=stdout)
 
-        mocked_process.assert_not_called()
+        self.assertIn("No fixtures found in Django settings.", stdout.getvalue())
 
-    @mock.patch.object(PermissionSetupService, "process")
-    def test_run_command_dry_run(self, mocked_process):
-        command = Command()
-        command.handle(dry_run=True)
+    @override_settings(GROUP_PERMISSION_FIXTURES=["testapp.permissions.TestGroupDeclaration"])
+    def test_run_command_dry_run(self):
+        stdout = StringIO()
+        call_command("install_permission_fixtures", "--dry-run", stdout=stdout)
+
+        self.assertIn('Starting in "dry-run" mode...', stdout.getvalue())
+        self.assertIn("> Newly installed permissions: testapp.view_mysinglesignalmodel", stdout.getvalue())
+        self.assertFalse(Group.objects.filter(name="group_1").exists())
+
+    @override_settings(GROUP_PERMISSION_FIXTURES=["testapp.permissions.TestGroupDeclaration"])
+    def test_run_command_installs_permissions(self):
+        stdout = StringIO()
+        call_command("install_permission_fixtures", stdout=stdout)
+
+        group = Group.objects.get(name="group_1")
+        self.assertEqual(
+            list(group.permissions.all()),
+            [Permission.objects.get_by_natural_key("view_mysinglesignalmodel", "testapp", "mysinglesignalmodel")],
+        )
+        self.assertIn('Reading fixture declaration "testapp.permissions.TestGroupDeclaration"...', stdout.getvalue())
+        self.assertIn('> Installing permissions of group "group_1"...', stdout.getvalue())
+        self.assertIn("> Group created", stdout.getvalue())
+        self.assertIn("> Removed permissions: -", stdout.getvalue())
+
+    @override_settings(GROUP_PERMISSION_FIXTURES=["testapp.permissions.NotExistingDeclaration"])
+    def test_run_command_invalid_declaration_path(self):
+        with self.assertRaisesMessage(
+            AssertionError, 'Could\'t load group declaration "testapp.permissions.NotExistingDeclaration".'
+        ):
+            call_command("install_permission_fixtures", stdout=StringIO())
+
+    @override_settings(GROUP_PERMISSION_FIXTURES=["testapp.permissions.TestGroupDeclaration"])
+    def test_run_command_json_format(self):
+        stdout = StringIO()
+        call_command("install_permission_fixtures", "--format", "json", stdout=stdout)
+
+        self.assertEqual(
+            json.loads(stdout.getvalue()),
+            {
+                "dry_run": False,
+                "skipped": False,
+                "groups": [
+                    {
+                        "group": "group_1",
+                        "created": True,
+                        "added": ["testapp.view_mysinglesignalmodel"],
+                        "removed": [],
+                    }
+                ],
+            },
+        )
+
+    @override_settings(GROUP_PERMISSION_FIXTURES=["testapp.permissions.TestGroupDeclaration"])
+    def test_run_command_skip_unchanged(self):
+        call_command("install_permission_fixtures", "--skip-unchanged", stdout=StringIO())
+        self.assertIsNotNone(cache.get(CHECKSUM_CACHE_KEY))
+
+        stdout = StringIO()
+        with mock.patch.object(PermissionFixturePlanService, "process") as mocked_process:
+            call_command("install_permission_fixtures", "--skip-unchanged", "--format", "json", stdout=stdout)
 
         mocked_process.assert_not_called()
+        self.assertEqual(json.loads(stdout.getvalue()), {"dry_run": False, "skipped": True, "groups": []})
+
+    @override_settings(GROUP_PERMISSION_FIXTURES=["testapp.permissions.TestGroupDeclaration"])
+    def test_run_command_skip_unchanged_detects_manual_changes(self):
+        call_command("install_permission_fixtures", "--skip-unchanged", stdout=StringIO())
+
+        Group.objects.get(name="group_1").permissions.clear()
+
+        stdout = StringIO()
+        call_command("install_permission_fixtures", "--skip-unchanged", stdout=stdout)
+
+        self.assertIn("> Newly installed permissions: testapp.view_mysinglesignalmodel", stdout.getvalue())
+        self.assertEqual(Group.objects.get(name="group_1").permissions.count(), 1)
+
+    @override_settings(GROUP_PERMISSION_FIXTURES=["testapp.permissions.TestGroupDeclaration"])
+    def test_run_command_skip_unchanged_ignored_in_dry_run(self):
+        call_command("install_permission_fixtures", "--skip-unchanged", "--dry-run", stdout=StringIO())
+
+        self.assertIsNone(cache.get(CHECKSUM_CACHE_KEY))
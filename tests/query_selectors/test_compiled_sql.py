@@ -0,0 +1,254 @@
+from django.contrib.auth.models import Group, User
+from django.db.models import F
+from django.test import TestCase
+
+from ambient_toolbox.selectors.compiled_sql import CompiledSqlTemplate, _get_sentinel, cache_compiled_sql
+from testapp.managers import ModelWithVisibilityIndexRuleQuerySet
+from testapp.models import ModelWithVisibilityIndex
+from testapp.selectors import ModelWithVisibilityIndexSelector
+
+
+class CompiledSqlTemplateTest(TestCase):
+    def test_bind(self):
+        template = CompiledSqlTemplate(sql="SELECT ...", params=(1, True, 1), argument_positions=(0, 2))
+
+        self.assertEqual(template.bind(42), [42, True, 42])
+        self.assertEqual(template.params, (1, True, 1))
+
+
+class GetSentinelTest(TestCase):
+    def test_int(self):
+        self.assertEqual(_get_sentinel(1), 2)
+
+    def test_str(self):
+        self.assertEqual(_get_sentinel("abc"), "abc_")
+
+
+class CacheCompiledSqlTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my-user")
+        cls.group_member = User.objects.create(username="group-member")
+        cls.inactive_user = User.objects.create(username="inactive-user", is_active=False)
+        group = Group.objects.create(name="my-group")
+        cls.user.groups.add(group)
+        cls.group_member.groups.add(group)
+
+        cls.own_obj = ModelWithVisibilityIndex.objects.create(owner=cls.user)
+        cls.group_obj = ModelWithVisibilityIndex.objects.create(owner=cls.group_member)
+        cls.public_obj = ModelWithVisibilityIndex.objects.create(owner=cls.group_member, is_public=True)
+        cls.inactive_public_obj = ModelWithVisibilityIndex.objects.create(owner=cls.inactive_user, is_public=True)
+
+    def setUp(self):
+        super().setUp()
+
+        for method in (
+            ModelWithVisibilityIndexSelector.visible_for,
+            ModelWithVisibilityIndexSelector.editable_for,
+            ModelWithVisibilityIndexSelector.deletable_for,
+            ModelWithVisibilityIndexRuleQuerySet.owned_by,
+        ):
+            method.compiled_sql_templates.clear()
+
+    def test_result_matches_plain_orm(self):
+        plain_visible_for = ModelWithVisibilityIndexSelector.visible_for.__wrapped__
+
+        for user in (self.user, self.group_member, self.inactive_user):
+            self.assertEqual(
+                set(ModelWithVisibilityIndex.selectors.visible_for(user_id=user.id)),
+                set(plain_visible_for(ModelWithVisibilityIndex.selectors, user.id)),
+            )
+
+    def test_template_created_once(self):
+        ModelWithVisibilityIndex.selectors.visible_for(user_id=self.user.id)
+        ModelWithVisibilityIndex.selectors.visible_for(self.group_member.id)
+
+        templates = ModelWithVisibilityIndexSelector.visible_for.compiled_sql_templates
+        self.assertEqual(len(templates), 1)
+        template = next(iter(templates.values()))
+        self.assertIsInstance(template, CompiledSqlTemplate)
+        self.assertEqual(len(template.argument_positions), 2)
+
+    def test_rebinding_uses_raw_sql(self):
+        ModelWithVisibilityIndex.selectors.visible_for(user_id=self.user.id)
+
+        qs = ModelWithVisibilityIndex.selectors.visible_for(user_id=self.group_member.id)
+
+        self.assertEqual(set(qs), {self.group_obj, self.public_obj, self.own_obj})
+        self.assertEqual(qs.model, ModelWithVisibilityIndex)
+
+    def test_result_can_be_chained(self):
+        qs = ModelWithVisibilityIndex.selectors.visible_for(user_id=self.user.id).filter(is_public=True)
+
+        self.assertEqual(set(qs), {self.public_obj})
+
+    def test_non_scalar_argument_not_cached(self):
+        qs = ModelWithVisibilityIndex.selectors.visible_for(user_id=self.user)
+
+        self.assertEqual(set(qs), {self.own_obj, self.group_obj, self.public_obj})
+        self.assertEqual(ModelWithVisibilityIndexSelector.visible_for.compiled_sql_templates, {})
+
+    def test_bool_argument_not_cached(self):
+        ModelWithVisibilityIndex.selectors.visible_for(user_id=True)
+
+        self.assertEqual(ModelWithVisibilityIndexSelector.visible_for.compiled_sql_templates, {})
+
+    def test_shape_key(self):
+        self.assertEqual(list(ModelWithVisibilityIndex.selectors.editable_for(user_id=-1)), [])
+        self.assertEqual(list(ModelWithVisibilityIndex.selectors.editable_for(user_id=self.user.id)), [self.own_obj])
+        self.assertEqual(list(ModelWithVisibilityIndex.selectors.editable_for(user_id=-2)), [])
+
+        templates = ModelWithVisibilityIndexSelector.editable_for.compiled_sql_templates
+        self.assertEqual(len(templates), 2)
+        self.assertIn(None, templates.values())
+
+    def test_shape_changing_with_argument_falls_back(self):
+        self.assertEqual(
+            set(ModelWithVisibilityIndex.selectors.deletable_for(user_id=self.group_member.id)),
+            set(ModelWithVisibilityIndex.objects.filter(owner=self.group_member)),
+        )
+
+        templates = ModelWithVisibilityIndexSelector.deletable_for.compiled_sql_templates
+        self.assertEqual(list(templates.values()), [None])
+
+    def test_queryset_method(self):
+        qs = ModelWithVisibilityIndexRuleQuerySet(model=ModelWithVisibilityIndex)
+
+        self.assertEqual(list(qs.owned_by(self.user.id)), [self.own_obj])
+        self.assertEqual(set(qs.owned_by(owner_id=self.group_member.id)), {self.group_obj, self.public_obj})
+
+    def test_queryset_method_keeps_previous_filters(self):
+        qs = ModelWithVisibilityIndexRuleQuerySet(model=ModelWithVisibilityIndex)
+        qs.owned_by(self.user.id)
+
+        self.assertEqual(list(qs.filter(is_public=True).owned_by(self.group_member.id)), [self.public_obj])
+
+    def test_other_model_returned_not_cached(self):
+        class UserSelector(ModelWithVisibilityIndexSelector):
+            @cache_compiled_sql()
+            def visible_for(self, user_id: int):
+                return User.objects.filter(id=user_id)
+
+        selector = UserSelector()
+        selector.model = ModelWithVisibilityIndex
+
+        self.assertEqual(list(selector.visible_for(self.user.id)), [self.user])
+        self.assertEqual(list(UserSelector.visible_for.compiled_sql_templates.values()), [None])
+
+    def test_unhashable_argument_not_cached(self):
+        class ListSelector(ModelWithVisibilityIndexSelector):
+            @cache_compiled_sql()
+            def visible_for(self, user_id: int, is_public_list=(True,)):
+                return self.model.objects.filter(owner_id=user_id, is_public__in=is_public_list)
+
+        selector = ListSelector()
+        selector.model = ModelWithVisibilityIndex
+
+        self.assertEqual(list(selector.visible_for(self.group_member.id, is_public_list=[True])), [self.public_obj])
+        self.assertEqual(ListSelector.visible_for.compiled_sql_templates, {})
+
+    def test_sliced_queryset_not_cached(self):
+        class SlicedSelector(ModelWithVisibilityIndexSelector):
+            @cache_compiled_sql()
+            def visible_for(self, user_id: int):
+                return self.model.objects.filter(owner_id=user_id)[:1]
+
+        selector = SlicedSelector()
+        selector.model = ModelWithVisibilityIndex
+
+        self.assertEqual(list(selector.visible_for(self.user.id)), [self.own_obj])
+        self.assertEqual(list(SlicedSelector.visible_for.compiled_sql_templates.values()), [None])
+
+    def test_annotated_and_ordered_queryset_not_cached(self):
+        class AnnotatedSelector(ModelWithVisibilityIndexSelector):
+            @cache_compiled_sql()
+            def visible_for(self, user_id: int):
+                return (
+                    self.model.objects.filter(owner__groups__user=user_id)
+                    .annotate(owner_name=F("owner__username"))
+                    .order_by("-id")
+                )
+
+        selector = AnnotatedSelector()
+        selector.model = ModelWithVisibilityIndex
+
+        for _ in range(2):
+            obj_list = list(selector.visible_for(self.user.id))
+
+            self.assertEqual(obj_list, [self.public_obj, self.group_obj, self.own_obj])
+            self.assertEqual(obj_list[0].owner_name, "group-member")
+        self.assertEqual(list(AnnotatedSelector.visible_for.compiled_sql_templates.values()), [None])
+
+    def test_queryset_beyond_filtering_not_cached(self):
+        for method_name, arguments in (
+            ("select_related", ("owner",)),
+            ("prefetch_related", ("owner",)),
+            ("only", ("id",)),
+            ("defer", ("is_public",)),
+            ("order_by", ()),
+            ("values", ("id",)),
+        ):
+
+            class ChainedSelector(ModelWithVisibilityIndexSelector):
+                @cache_compiled_sql()
+                def visible_for(self, user_id: int, method_name=method_name, arguments=arguments):
+                    return getattr(self.model.objects.filter(owner_id=user_id), method_name)(*arguments)
+
+            selector = ChainedSelector()
+            selector.model = ModelWithVisibilityIndex
+
+            with self.subTest(method_name=method_name):
+                self.assertEqual(len(selector.visible_for(self.user.id)), 1)
+                self.assertEqual(list(ChainedSelector.visible_for.compiled_sql_templates.values()), [None])
+
+    def test_argument_not_used_as_parameter_not_cached(self):
+        class ConstantSelector(ModelWithVisibilityIndexSelector):
+            @cache_compiled_sql()
+            def visible_for(self, user_id: int):
+                return self.model.objects.filter(is_public=True)
+
+        selector = ConstantSelector()
+        selector.model = ModelWithVisibilityIndex
+
+        self.assertEqual(len(selector.visible_for(self.user.id)), 2)
+        self.assertEqual(list(ConstantSelector.visible_for.compiled_sql_templates.values()), [None])
+
+    def test_derived_parameter_not_cached(self):
+        class DerivedSelector(ModelWithVisibilityIndexSelector):
+            @cache_compiled_sql()
+            def visible_for(self, user_id: int):
+                return self.model.objects.filter(owner_id=user_id - 1)
+
+        selector = DerivedSelector()
+        selector.model = ModelWithVisibilityIndex
+
+        self.assertEqual(list(selector.visible_for(self.group_member.id)), [self.own_obj])
+        self.assertEqual(list(DerivedSelector.visible_for.compiled_sql_templates.values()), [None])
+
+    def test_exception_for_sentinel_not_cached(self):
+        class LookupSelector(ModelWithVisibilityIndexSelector):
+            @cache_compiled_sql()
+            def visible_for(self, user_id: int):
+                user = User.objects.get(pk=user_id)
+                return self.model.objects.filter(owner=user)
+
+        selector = LookupSelector()
+        selector.model = ModelWithVisibilityIndex
+        highest_user_id = User.objects.order_by("-pk").values_list("pk", flat=True).first()
+
+        self.assertEqual(list(selector.visible_for(highest_user_id)), [self.inactive_public_obj])
+        self.assertEqual(list(LookupSelector.visible_for.compiled_sql_templates.values()), [None])
+
+    def test_exception_for_argument_raised(self):
+        class LookupSelector(ModelWithVisibilityIndexSelector):
+            @cache_compiled_sql()
+            def visible_for(self, user_id: int):
+                return self.model.objects.filter(owner=User.objects.get(pk=user_id))
+
+        selector = LookupSelector()
+        selector.model = ModelWithVisibilityIndex
+
+        with self.assertRaises(User.DoesNotExist):
+            selector.visible_for(-1)
@@ -7,3 +7,5 @@ PERMISSIONS_DICT = {
 }
 
 PERMISSIONS_LIST = []
+
+EMPTY = {}
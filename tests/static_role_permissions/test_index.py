@@ -0,0 +1,310 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from ambient_toolbox.static_role_permissions import index
+from ambient_toolbox.static_role_permissions.index import (
+    StaticRolePermissionIndex,
+    compile_static_role_permissions,
+    expand_permission_pattern,
+    get_static_role_permission_index,
+    reset_static_role_permission_index,
+)
+from ambient_toolbox.static_role_permissions.permissions import get_role_definition
+
+MODEL_PERMISSIONS = {
+    "auth.add_user",
+    "auth.view_user",
+    "auth.view_group",
+    "blog.view_article",
+}
+
+
+class GetRoleDefinitionTest(TestCase):
+    def test_set(self):
+        self.assertEqual(get_role_definition({"auth.add_user"}), ({"auth.add_user"}, []))
+
+    def test_dict(self):
+        self.assertEqual(
+            get_role_definition({"inherits": ["role_1"], "permissions": {"auth.add_user"}}),
+            ({"auth.add_user"}, ["role_1"]),
+        )
+
+    def test_empty_dict(self):
+        self.assertEqual(get_role_definition({}), (set(), []))
+
+
+class StaticRolePermissionIndexTest(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.index = StaticRolePermissionIndex(role_permissions={"role_1": frozenset({"auth.add_user"})})
+
+    def test_get_permissions(self):
+        self.assertEqual(self.index.get_permissions("role_1"), frozenset({"auth.add_user"}))
+
+    def test_get_permissions_unknown_role(self):
+        self.assertEqual(self.index.get_permissions("role_2"), frozenset())
+
+    def test_has_perm(self):
+        self.assertTrue(self.index.has_perm("role_1", "auth.add_user"))
+        self.assertFalse(self.index.has_perm("role_1", "auth.view_user"))
+        self.assertFalse(self.index.has_perm("role_2", "auth.add_user"))
+
+    def test_permission_bits_are_unique(self):
+        permission_index = StaticRolePermissionIndex(
+            role_permissions={
+                "role_1": frozenset({"auth.add_user", "auth.view_user"}),
+                "role_2": frozenset({"auth.view_user", "auth.view_group"}),
+            }
+        )
+
+        self.assertEqual(
+            dict(permission_index.permission_bits),
+            {"auth.add_user": 0b001, "auth.view_group": 0b010, "auth.view_user": 0b100},
+        )
+        self.assertEqual(dict(permission_index.role_masks), {"role_1": 0b101, "role_2": 0b110})
+
+    def test_get_mask(self):
+        permission_index = StaticRolePermissionIndex(
+            role_permissions={
+                "role_1": frozenset({"auth.add_user"}),
+                "role_2": frozenset({"auth.view_user"}),
+            }
+        )
+
+        self.assertEqual(permission_index.get_mask([]), 0)
+        self.assertEqual(permission_index.get_mask(["role_1"]), 0b01)
+        self.assertEqual(permission_index.get_mask(["role_1", "role_2", "role_999"]), 0b11)
+
+    def test_get_required_mask(self):
+        self.assertEqual(self.index.get_required_mask([]), 0)
+        self.assertEqual(self.index.get_required_mask(["auth.add_user"]), 0b1)
+        self.assertIsNone(self.index.get_required_mask(["auth.add_user", "auth.view_user"]))
+
+    def test_mask_has_perm(self):
+        mask = self.index.get_mask(["role_1"])
+
+        self.assertTrue(self.index.mask_has_perm(mask, "auth.add_user"))
+        self.assertFalse(self.index.mask_has_perm(mask, "auth.view_user"))
+        self.assertFalse(self.index.mask_has_perm(0, "auth.add_user"))
+
+    def test_mask_has_perms(self):
+        permission_index = StaticRolePermissionIndex(
+            role_permissions={
+                "role_1": frozenset({"auth.add_user"}),
+                "role_2": frozenset({"auth.view_user"}),
+            }
+        )
+        mask = permission_index.get_mask(["role_1"])
+
+        self.assertTrue(permission_index.mask_has_perms(mask, []))
+        self.assertTrue(permission_index.mask_has_perms(mask, ["auth.add_user"]))
+        self.assertFalse(permission_index.mask_has_perms(mask, ["auth.add_user", "auth.view_user"]))
+        self.assertFalse(permission_index.mask_has_perms(mask, ["auth.add_user", "auth.unknown"]))
+
+    def test_immutable(self):
+        with self.assertRaisesMessage(AttributeError, "StaticRolePermissionIndex is immutable."):
+            self.index.role_permissions = {}
+
+        with self.assertRaises(TypeError):
+            self.index.role_permissions["role_2"] = frozenset()
+
+
+class ExpandPermissionPatternTest(TestCase):
+    def test_without_wildcard(self):
+        self.assertEqual(expand_permission_pattern("app.unknown", MODEL_PERMISSIONS), {"app.unknown"})
+
+    def test_app_wildcard(self):
+        self.assertEqual(
+            expand_permission_pattern("auth.*", MODEL_PERMISSIONS),
+            {"auth.add_user", "auth.view_user", "auth.view_group"},
+        )
+
+    def test_codename_wildcard(self):
+        self.assertEqual(
+            expand_permission_pattern("*.view_*", MODEL_PERMISSIONS),
+            {"auth.view_user", "auth.view_group", "blog.view_article"},
+        )
+
+    def test_no_match(self):
+        self.assertEqual(expand_permission_pattern("shop.*", MODEL_PERMISSIONS), set())
+
+
+class CompileStaticRolePermissionsTest(TestCase):
+    def test_plain_sets(self):
+        permission_index = compile_static_role_permissions({"role_1": {"auth.add_user"}}, MODEL_PERMISSIONS)
+
+        self.assertEqual(permission_index.role_permissions, {"role_1": frozenset({"auth.add_user"})})
+
+    def test_inheritance_is_flattened(self):
+        permission_index = compile_static_role_permissions(
+            {
+                "admin": {"inherits": ["editor", "viewer"], "permissions": {"auth.add_user"}},
+                "editor": {"inherits": ["viewer"], "permissions": {"blog.*"}},
+                "viewer": {"auth.view_*"},
+            },
+            MODEL_PERMISSIONS,
+        )
+
+        self.assertEqual(permission_index.get_permissions("viewer"), {"auth.view_user", "auth.view_group"})
+        self.assertEqual(
+            permission_index.get_permissions("editor"), {"auth.view_user", "auth.view_group", "blog.view_article"}
+        )
+        self.assertEqual(permission_index.get_permissions("admin"), MODEL_PERMISSIONS)
+        self.assertIsInstance(permission_index.get_permissions("admin"), frozenset)
+
+    def test_unknown_parent_role(self):
+        with self.assertRaisesMessage(
+            ImproperlyConfigured, "Static role 'editor' inherits from unknown role 'viewer'."
+        ):
+            compile_static_role_permissions({"editor": {"inherits": ["viewer"]}}, MODEL_PERMISSIONS)
+
+    def test_circular_inheritance(self):
+        with self.assertRaisesMessage(
+            ImproperlyConfigured,
+            "Static role permissions contain circular inheritance: ('role_1', 'role_2', 'role_1').",
+        ):
+            compile_static_role_permissions(
+                {"role_1": {"inherits": ["role_2"]}, "role_2": {"inherits": ["role_1"]}}, MODEL_PERMISSIONS
+            )
+
+
+class GetStaticRolePermissionIndexTest(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        reset_static_role_permission_index()
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_PATH="tests.static_role_permissions.dummy_permissions.PERMISSIONS_DICT")
+    def test_compiled_once(self):
+        with mock.patch.object(
+            index, "compile_static_role_permissions", wraps=compile_static_role_permissions
+        ) as mocked_compile:
+            permission_index = get_static_role_permission_index()
+
+            self.assertIs(get_static_role_permission_index(), permission_index)
+            self.assertEqual(mocked_compile.call_count, 1)
+        self.assertEqual(permission_index.get_permissions("role_1"), {"auth.add_user", "auth.view_user"})
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_PATH="tests.static_role_permissions.dummy_permissions.PERMISSIONS_DICT")
+    def test_reset_on_setting_changed(self):
+        permission_index = get_static_role_permission_index()
+
+        with override_settings(STATIC_ROLE_PERMISSIONS_PATH="tests.static_role_permissions.dummy_permissions.EMPTY"):
+            self.assertIsNone(index._static_role_permission_index)
+
+        self.assertIsNot(get_static_role_permission_index(), permission_index)
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_PATH="tests.static_role_permissions.dummy_permissions.PERMISSIONS_DICT")
+    def test_not_reset_on_other_setting_changed(self):
+        permission_index = get_static_role_permission_index()
+
+        with override_settings(TIME_ZONE="Europe/Berlin"):
+            self.assertIs(get_static_role_permission_index(), permission_index)
+
+
+class ReloadStaticRolePermissionIndexTest(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.file_path = Path(temp_dir.name) / "permissions.json"
+        self.write_permissions({"role_1": ["auth.view_user"]}, mtime_ns=1_000_000_000)
+
+        reset_static_role_permission_index()
+
+    def write_permissions(self, permissions: dict, mtime_ns: int) -> None:
+        self.file_path.write_text(json.dumps(permissions), encoding="utf-8")
+        os.utime(self.file_path, ns=(mtime_ns, mtime_ns))
+
+    def test_reload_on_change(self):
+        with override_settings(
+            STATIC_ROLE_PERMISSIONS_FILE=str(self.file_path), STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL=0
+        ):
+            permission_index = get_static_role_permission_index()
+            self.assertTrue(permission_index.has_perm("role_1", "auth.view_user"))
+
+            self.write_permissions({"role_1": ["auth.add_user"]}, mtime_ns=2_000_000_000)
+            reloaded_index = get_static_role_permission_index()
+
+            self.assertIsNot(reloaded_index, permission_index)
+            self.assertTrue(reloaded_index.has_perm("role_1", "auth.add_user"))
+            self.assertFalse(reloaded_index.has_perm("role_1", "auth.view_user"))
+
+    def test_no_reload_without_change(self):
+        with override_settings(
+            STATIC_ROLE_PERMISSIONS_FILE=str(self.file_path), STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL=0
+        ):
+            permission_index = get_static_role_permission_index()
+
+            with mock.patch.object(index, "compile_static_role_permissions") as mocked_compile:
+                self.assertIs(get_static_role_permission_index(), permission_index)
+            mocked_compile.assert_not_called()
+
+    def test_no_reload_within_interval(self):
+        with override_settings(
+            STATIC_ROLE_PERMISSIONS_FILE=str(self.file_path), STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL=60
+        ):
+            # First check is done right after compiling
+            permission_index = get_static_role_permission_index()
+            get_static_role_permission_index()
+
+            self.write_permissions({"role_1": ["auth.add_user"]}, mtime_ns=2_000_000_000)
+
+            self.assertIs(get_static_role_permission_index(), permission_index)
+
+    def test_reload_disabled(self):
+        with override_settings(
+            STATIC_ROLE_PERMISSIONS_FILE=str(self.file_path), STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL=None
+        ):
+            permission_index = get_static_role_permission_index()
+
+            self.write_permissions({"role_1": ["auth.add_user"]}, mtime_ns=2_000_000_000)
+
+            self.assertIs(get_static_role_permission_index(), permission_index)
+
+    def test_invalid_file_keeps_current_index(self):
+        with override_settings(
+            STATIC_ROLE_PERMISSIONS_FILE=str(self.file_path), STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL=0
+        ):
+            permission_index = get_static_role_permission_index()
+
+            self.write_permissions({"role_1": {"inherits": ["role_999"]}}, mtime_ns=2_000_000_000)
+            with self.assertLogs(index.logger, level="ERROR") as logs:
+                self.assertIs(get_static_role_permission_index(), permission_index)
+
+            self.assertIn("Reloading static role permissions failed", logs.output[0])
+
+            # Fixing the file is picked up with the next check
+            self.write_permissions({"role_1": ["auth.add_user"]}, mtime_ns=3_000_000_000)
+            self.assertTrue(get_static_role_permission_index().has_perm("role_1", "auth.add_user"))
+
+    def test_reload_skipped_while_other_thread_compiles(self):
+        with override_settings(
+            STATIC_ROLE_PERMISSIONS_FILE=str(self.file_path), STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL=0
+        ):
+            permission_index = get_static_role_permission_index()
+            self.write_permissions({"role_1": ["auth.add_user"]}, mtime_ns=2_000_000_000)
+
+            with index._compile_lock:
+                self.assertIs(get_static_role_permission_index(), permission_index)
+
+            self.assertIsNot(get_static_role_permission_index(), permission_index)
+
+    def test_dotted_path_never_reloaded(self):
+        with override_settings(
+            STATIC_ROLE_PERMISSIONS_PATH="tests.static_role_permissions.dummy_permissions.PERMISSIONS_DICT",
+            STATIC_ROLE_PERMISSIONS_RELOAD_INTERVAL=0,
+        ):
+            permission_index = get_static_role_permission_index()
+
+            with mock.patch.object(index, "get_static_role_permissions_version") as mocked_version:
+                self.assertIs(get_static_role_permission_index(), permission_index)
+            mocked_version.assert_not_called()
@@ -0,0 +1,212 @@
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.db.models import Q
+from django.test import TestCase
+
+from ambient_toolbox.static_role_permissions.row_rules import (
+    ALL_ROWS,
+    CompiledRowRule,
+    RowRules,
+    UserAttribute,
+    compile_role_rules,
+    compile_row_rule,
+)
+from testapp.managers import ModelWithRowRulesQuerySet
+from testapp.models import ModelWithOneToOneToSelf, ModelWithRowRules
+
+
+class UserAttributeTest(TestCase):
+    def test_resolve(self):
+        self.assertEqual(UserAttribute("tenant_id").resolve(SimpleNamespace(tenant_id=3)), 3)
+
+    def test_resolve_dotted_path(self):
+        user = SimpleNamespace(profile=SimpleNamespace(tenant_id=3))
+
+        self.assertEqual(UserAttribute("profile.tenant_id").resolve(user), 3)
+
+    def test_resolve_dotted_path_intermediate_none(self):
+        self.assertIsNone(UserAttribute("profile.tenant_id").resolve(SimpleNamespace(profile=None)))
+
+    def test_resolve_dotted_path_related_object_missing(self):
+        obj = ModelWithOneToOneToSelf.objects.create()
+
+        self.assertIsNone(UserAttribute("related_peer.pk").resolve(obj))
+
+    def test_resolve_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            UserAttribute("profile.unknown").resolve(SimpleNamespace(profile=SimpleNamespace()))
+
+    def test_repr(self):
+        self.assertEqual(repr(UserAttribute("tenant_id")), "UserAttribute('tenant_id')")
+
+
+class CompileRowRuleTest(TestCase):
+    def test_dict_is_split(self):
+        tenant_attribute = UserAttribute("tenant_id")
+        compiled_rule = compile_row_rule({"is_public": False, "tenant": tenant_attribute})
+
+        self.assertEqual(compiled_rule.static_q, Q(is_public=False))
+        self.assertEqual(compiled_rule.user_lookups, (("tenant", tenant_attribute),))
+
+    def test_q_object(self):
+        self.assertEqual(
+            compile_row_rule(Q(is_public=True)), CompiledRowRule(static_q=Q(is_public=True), user_lookups=())
+        )
+
+    def test_empty_dict(self):
+        with self.assertRaisesMessage(AssertionError, "Row rules have to be a non-empty dict"):
+            compile_row_rule({})
+
+    def test_compile_role_rules(self):
+        self.assertIs(compile_role_rules(ALL_ROWS), ALL_ROWS)
+        self.assertEqual(len(compile_role_rules({"is_public": True})), 1)
+        self.assertEqual(len(compile_role_rules([{"is_public": True}, Q(tenant=1)])), 2)
+
+
+class CompiledRowRuleTest(TestCase):
+    def test_bind_static_and_user_lookups(self):
+        compiled_rule = compile_row_rule({"is_public": False, "tenant": UserAttribute("tenant_id")})
+
+        self.assertEqual(compiled_rule.bind(SimpleNamespace(tenant_id=3)), Q(is_public=False) & Q(tenant=3))
+
+    def test_bind_user_lookups_only(self):
+        compiled_rule = compile_row_rule({"tenant": UserAttribute("tenant_id")})
+
+        self.assertEqual(compiled_rule.bind(SimpleNamespace(tenant_id=3)), Q(tenant=3))
+
+    def test_bind_static_only(self):
+        compiled_rule = compile_row_rule({"is_public": True})
+
+        self.assertEqual(compiled_rule.bind(SimpleNamespace()), Q(is_public=True))
+
+    def test_bind_none_value(self):
+        compiled_rule = compile_row_rule({"tenant": UserAttribute("tenant_id")})
+
+        self.assertIsNone(compiled_rule.bind(SimpleNamespace(tenant_id=None)))
+
+
+class RowRulesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="author")
+        cls.other_user = User.objects.create(username="other")
+
+        cls.own_obj = ModelWithRowRules.objects.create(owner=cls.user, tenant=1)
+        cls.public_obj = ModelWithRowRules.objects.create(owner=cls.other_user, tenant=2, is_public=True)
+        cls.tenant_obj = ModelWithRowRules.objects.create(owner=cls.other_user, tenant=1)
+        cls.other_obj = ModelWithRowRules.objects.create(owner=cls.other_user, tenant=2)
+
+    def setUp(self):
+        super().setUp()
+
+        # Role attributes are set per test on a fresh instance
+        self.user = User.objects.get(pk=self.user.pk)
+        self.user.tenant_id = 1
+
+    def test_unknown_action(self):
+        with self.assertRaisesMessage(NotImplementedError, "Please define row rules for 'deletable_for'."):
+            ModelWithRowRules.objects.deletable_for(self.user)
+
+    def test_get_filter_all_rows(self):
+        self.user.role = "admin"
+
+        self.assertIs(ModelWithRowRulesQuerySet.row_rules.get_filter("visible_for", self.user), ALL_ROWS)
+
+    def test_visible_for_admin(self):
+        self.user.role = "admin"
+
+        self.assertEqual(ModelWithRowRules.objects.visible_for(self.user).count(), 4)
+
+    def test_visible_for_author(self):
+        self.user.role = "author"
+
+        self.assertQuerySetEqual(
+            ModelWithRowRules.objects.visible_for(self.user), [self.own_obj, self.public_obj], ordered=False
+        )
+
+    def test_visible_for_editor(self):
+        self.user.role = "editor"
+
+        self.assertQuerySetEqual(
+            ModelWithRowRules.objects.visible_for(self.user), [self.own_obj, self.tenant_obj], ordered=False
+        )
+
+    def test_visible_for_editor_without_tenant(self):
+        self.user.role = "editor"
+        self.user.tenant_id = None
+
+        self.assertFalse(ModelWithRowRules.objects.visible_for(self.user).exists())
+
+    def test_visible_for_multiple_roles(self):
+        self.user.roles = ["author", "editor"]
+
+        self.assertQuerySetEqual(
+            ModelWithRowRules.objects.visible_for(self.user),
+            [self.own_obj, self.public_obj, self.tenant_obj],
+            ordered=False,
+        )
+
+    def test_visible_for_multiple_roles_including_all_rows(self):
+        self.user.roles = ["author", "admin"]
+
+        self.assertEqual(ModelWithRowRules.objects.visible_for(self.user).count(), 4)
+
+    def test_visible_for_unknown_role(self):
+        self.user.role = "viewer"
+
+        self.assertFalse(ModelWithRowRules.objects.visible_for(self.user).exists())
+
+    def test_visible_for_without_role(self):
+        self.assertFalse(ModelWithRowRules.objects.visible_for(self.user).exists())
+
+    def test_visible_for_inactive_user(self):
+        self.user.role = "admin"
+        self.user.is_active = False
+
+        self.assertFalse(ModelWithRowRules.objects.visible_for(self.user).exists())
+
+    def test_visible_for_anonymous_user(self):
+        self.assertFalse(ModelWithRowRules.objects.visible_for(AnonymousUser()).exists())
+
+    def test_editable_for_editor(self):
+        self.user.role = "editor"
+
+        self.assertQuerySetEqual(
+            ModelWithRowRules.objects.editable_for(self.user), [self.own_obj, self.tenant_obj], ordered=False
+        )
+
+    def test_editable_for_author(self):
+        self.user.role = "author"
+
+        self.assertQuerySetEqual(ModelWithRowRules.objects.editable_for(self.user), [self.own_obj])
+
+    def test_single_query(self):
+        self.user.roles = ["author", "editor"]
+
+        with self.assertNumQueries(1):
+            list(ModelWithRowRules.objects.visible_for(self.user))
+
+    def test_chainable(self):
+        self.user.role = "author"
+
+        self.assertQuerySetEqual(
+            ModelWithRowRules.objects.filter(tenant=2).visible_for(self.user).filter(is_public=True), [self.public_obj]
+        )
+
+    def test_filter_with_selector_queryset(self):
+        self.user.role = "author"
+        row_rules = RowRules({"visible_for": {"author": {"owner": UserAttribute("pk")}}})
+
+        self.assertQuerySetEqual(
+            row_rules.filter(ModelWithRowRules.objects.all(), action="visible_for", user=self.user), [self.own_obj]
+        )
+
+    def test_missing_row_rules(self):
+        queryset_class = type("RowRuleQuerySetWithoutRules", (ModelWithRowRulesQuerySet,), {})
+        queryset_class.row_rules = None
+
+        with self.assertRaisesMessage(AssertionError, "Please set the attribute 'row_rules'."):
+            queryset_class(model=ModelWithRowRules).visible_for(self.user)
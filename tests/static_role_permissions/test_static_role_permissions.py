@@ -1,10 +1,25 @@
+from pathlib import Path
 from unittest import mock
 
-from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.auth.models import AnonymousUser, Group, Permission, User
 from django.test import TestCase, override_settings
 
-from ambient_toolbox.static_role_permissions.auth_backend import StaticRolePermissionBackend
-from ambient_toolbox.static_role_permissions.permissions import load_static_role_permissions
+from ambient_toolbox.static_role_permissions.auth_backend import (
+    StaticRoleAndGroupPermissionBackend,
+    StaticRolePermissionBackend,
+)
+from ambient_toolbox.static_role_permissions.index import reset_static_role_permission_index
+from ambient_toolbox.static_role_permissions.permissions import (
+    get_static_role_permissions_version,
+    load_static_role_permissions,
+)
+
+DUMMY_PERMISSIONS_DIR = Path(__file__).resolve().parent
+
+FILE_PERMISSIONS = {
+    "role_1": ["auth.view_user", "auth.add_user"],
+    "role_2": {"inherits": ["role_1"], "permissions": ["auth.change_user"]},
+}
 
 
 class LoadStaticRolePermissionsTest(TestCase):
@@ -30,6 +45,43 @@ class LoadStaticRolePermissionsTest(TestCase):
         with self.assertRaisesMessage(AssertionError, "STATIC_ROLE_PERMISSIONS_PATH must point to a dict"):
             load_static_role_permissions()
 
+    @override_settings(
+        STATIC_ROLE_PERMISSIONS_PATH="tests.static_role_permissions.dummy_permissions.PERMISSIONS_DICT",
+        STATIC_ROLE_PERMISSIONS_FILE=str(DUMMY_PERMISSIONS_DIR / "dummy_permissions.json"),
+    )
+    def test_load_permissions_from_json_file(self):
+        """Test loading permissions from a JSON file, which takes precedence over the dotted path."""
+        self.assertEqual(load_static_role_permissions(), FILE_PERMISSIONS)
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_FILE=str(DUMMY_PERMISSIONS_DIR / "dummy_permissions.toml"))
+    def test_load_permissions_from_toml_file(self):
+        """Test loading permissions from a TOML file."""
+        self.assertEqual(load_static_role_permissions(), FILE_PERMISSIONS)
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_FILE=str(DUMMY_PERMISSIONS_DIR / "dummy_permissions.py"))
+    def test_load_permissions_from_file_with_invalid_suffix(self):
+        """Test that an error is raised for files which are neither JSON nor TOML."""
+        with self.assertRaisesMessage(AssertionError, "STATIC_ROLE_PERMISSIONS_FILE must be a .json or .toml file"):
+            load_static_role_permissions()
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_FILE=str(DUMMY_PERMISSIONS_DIR / "dummy_permissions_list.json"))
+    def test_load_permissions_from_file_with_invalid_content(self):
+        """Test that an error is raised when the file doesn't contain an object."""
+        with self.assertRaisesMessage(AssertionError, "STATIC_ROLE_PERMISSIONS_FILE must contain an object / table"):
+            load_static_role_permissions()
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_FILE=str(DUMMY_PERMISSIONS_DIR / "dummy_permissions.json"))
+    def test_get_static_role_permissions_version_file(self):
+        """Test that the version of a file is based on its mtime and size."""
+        stat_result = (DUMMY_PERMISSIONS_DIR / "dummy_permissions.json").stat()
+
+        self.assertEqual(get_static_role_permissions_version(), (stat_result.st_mtime_ns, stat_result.st_size))
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_PATH="tests.static_role_permissions.dummy_permissions.PERMISSIONS_DICT")
+    def test_get_static_role_permissions_version_dotted_path(self):
+        """Test that a definition imported from Python has no version."""
+        self.assertIsNone(get_static_role_permissions_version())
+
 
 @override_settings(
     AUTHENTICATION_BACKENDS=[
@@ -39,57 +91,175 @@ class LoadStaticRolePermissionsTest(TestCase):
 class StaticRolePermissionBackendTest(TestCase):
     """Test suite for StaticRolePermissionBackend."""
 
-    def test_init_sets_cache_to_none(self):
-        """Test that __init__ sets _static_permissions_cache to None."""
-        backend = StaticRolePermissionBackend()
-        self.assertIsNone(backend._static_permissions_cache)
+    def setUp(self):
+        super().setUp()
+
+        reset_static_role_permission_index()
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={"role_1": {"perm1"}},
     )
-    def test_get_static_role_permissions_caches_result(self, mock_load):
-        """Test that _get_static_role_permissions caches the result."""
-        backend = StaticRolePermissionBackend()
+    def test_permission_index_shared_between_instances(self, mock_load):
+        """Test that the permissions are only loaded once for all backend instances."""
+        user = User()
+        user.role = "role_1"
 
-        # First call should load permissions
-        result1 = backend._get_static_role_permissions()
-        self.assertEqual(result1, {"role_1": {"perm1"}})
+        self.assertEqual(StaticRolePermissionBackend().get_all_permissions(user), {"perm1"})
+        self.assertEqual(StaticRolePermissionBackend().get_all_permissions(user), {"perm1"})
         self.assertEqual(mock_load.call_count, 1)
 
-        # Second call should use cache
-        result2 = backend._get_static_role_permissions()
-        self.assertEqual(result2, {"role_1": {"perm1"}})
-        self.assertEqual(mock_load.call_count, 1)  # Still 1, not called again
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"perm1"}},
+    )
+    def test_get_all_permissions_missing_role(self, _):
+        """Test getting permissions for a non-existent role returns empty set."""
+        user = User()
+        user.role = "role_999"
 
-        # Verify cache is set
-        self.assertIsNotNone(backend._static_permissions_cache)
+        self.assertEqual(StaticRolePermissionBackend().get_all_permissions(user), set())
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
-        return_value={
-            "role_1": {"app_label.permission_1", "app_label.permission_2"},
-            "role_2": {"app_label.permission_3"},
-        },
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"app_label.permission_1"}},
     )
-    def test_get_permissions_for_role_existing_role(self, _):
-        """Test getting permissions for an existing role."""
+    def test_has_perm_with_obj_returns_false(self, _):
+        """Test that has_perm returns False when obj is provided."""
+        user = User()
+        user.role = "role_1"
+
+        self.assertFalse(StaticRolePermissionBackend().has_perm(user, "app_label.permission_1", obj=object()))
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"app_label.permission_1"}},
+    )
+    def test_has_perm_valid_user(self, _):
+        """Test that has_perm checks the role's permissions."""
+        user = User()
+        user.role = "role_1"
+
+        self.assertTrue(StaticRolePermissionBackend().has_perm(user, "app_label.permission_1"))
+        self.assertFalse(StaticRolePermissionBackend().has_perm(user, "app_label.permission_2"))
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"app_label.permission_1"}, "role_2": {"app_label.permission_2"}},
+    )
+    def test_has_perm_multiple_roles(self, _):
+        """Test that users with a "roles" attribute get the permissions of all their roles."""
+        user = User()
+        user.role = "role_999"
+        user.roles = ["role_1", "role_2"]
+
+        self.assertTrue(StaticRolePermissionBackend().has_perm(user, "app_label.permission_1"))
+        self.assertTrue(StaticRolePermissionBackend().has_perm(user, "app_label.permission_2"))
+        self.assertFalse(StaticRolePermissionBackend().has_perm(user, "app_label.permission_3"))
+        self.assertEqual(
+            StaticRolePermissionBackend().get_all_permissions(user),
+            {"app_label.permission_1", "app_label.permission_2"},
+        )
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"app_label.permission_1"}},
+    )
+    def test_has_perm_empty_roles(self, _):
+        """Test that users with an empty "roles" attribute have no permissions."""
+        user = User()
+        user.roles = []
+
+        self.assertFalse(StaticRolePermissionBackend().has_perm(user, "app_label.permission_1"))
+        self.assertEqual(StaticRolePermissionBackend().get_all_permissions(user), set())
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"app_label.permission_1"}, "role_2": {"app_label.permission_2"}},
+    )
+    def test_has_perm_mask_cached_on_user(self, _):
+        """Test that the combined bitmask is cached on the user and refreshed once the roles change."""
         backend = StaticRolePermissionBackend()
-        permissions = backend._get_permissions_for_role("role_1")
-        self.assertEqual(permissions, {"app_label.permission_1", "app_label.permission_2"})
+        user = User()
+        user.roles = ["role_1"]
+
+        self.assertTrue(backend.has_perm(user, "app_label.permission_1"))
+        cached_index, cached_roles, cached_mask = user._static_role_permission_mask_cache
+        self.assertEqual(cached_roles, ("role_1",))
+        self.assertEqual(cached_mask, 0b01)
+
+        with mock.patch.object(cached_index.__class__, "get_mask") as mocked_get_mask:
+            self.assertTrue(backend.has_perm(user, "app_label.permission_1"))
+        mocked_get_mask.assert_not_called()
+
+        user.roles = ["role_2"]
+        self.assertFalse(backend.has_perm(user, "app_label.permission_1"))
+        self.assertTrue(backend.has_perm(user, "app_label.permission_2"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
-        return_value={"role_1": {"perm1"}},
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"app_label.permission_1"}},
     )
-    def test_get_permissions_for_role_missing_role(self, _):
-        """Test getting permissions for a non-existent role returns empty set."""
+    def test_has_perm_mask_cache_invalidated_with_index(self, mock_load):
+        """Test that a cached bitmask isn't used anymore once the index was reset."""
         backend = StaticRolePermissionBackend()
-        permissions = backend._get_permissions_for_role("role_999")
-        self.assertEqual(permissions, set())
+        user = User()
+        user.role = "role_1"
+
+        self.assertTrue(backend.has_perm(user, "app_label.permission_1"))
+
+        reset_static_role_permission_index()
+        mock_load.return_value = {"role_1": {"app_label.permission_2"}}
+
+        self.assertFalse(backend.has_perm(user, "app_label.permission_1"))
+        self.assertTrue(backend.has_perm(user, "app_label.permission_2"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"app_label.permission_1"}, "role_2": {"app_label.permission_2"}},
+    )
+    def test_has_perms(self, _):
+        """Test that has_perms checks all permissions at once."""
+        backend = StaticRolePermissionBackend()
+        user = User()
+        user.roles = ["role_1", "role_2"]
+
+        self.assertTrue(backend.has_perms(user, ["app_label.permission_1", "app_label.permission_2"]))
+        self.assertFalse(backend.has_perms(user, ["app_label.permission_1", "app_label.permission_3"]))
+        self.assertFalse(backend.has_perms(user, ["app_label.permission_1"], obj=object()))
+
+        user.roles = ["role_1"]
+        self.assertFalse(backend.has_perms(user, ["app_label.permission_1", "app_label.permission_2"]))
+
+    def test_has_perms_user_without_role(self):
+        """Test that has_perms is False for users without a role, without loading the permissions."""
+        self.assertFalse(StaticRolePermissionBackend().has_perms(User(), ["app_label.permission_1"]))
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={
+            "role_1": {"auth.view_user"},
+            "role_2": {"inherits": ["role_1"], "permissions": {"contenttypes.*"}},
+        },
+    )
+    def test_get_all_permissions_wildcard_and_inheritance(self, _):
+        """Test that wildcards are expanded and inherited permissions are included."""
+        user = User()
+        user.role = "role_2"
+
+        self.assertEqual(
+            StaticRolePermissionBackend().get_all_permissions(user),
+            {
+                "auth.view_user",
+                "contenttypes.add_contenttype",
+                "contenttypes.change_contenttype",
+                "contenttypes.delete_contenttype",
+                "contenttypes.view_contenttype",
+            },
+        )
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={"role_1": {"app_label.permission_1"}},
     )
     def test_get_all_permissions_with_obj_returns_empty(self, _):
@@ -103,7 +273,7 @@ class StaticRolePermissionBackendTest(TestCase):
         self.assertEqual(permissions, set())
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={"role_1": {"app_label.permission_1"}},
     )
     def test_get_all_permissions_inactive_user(self, _):
@@ -117,7 +287,7 @@ class StaticRolePermissionBackendTest(TestCase):
         self.assertEqual(permissions, set())
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={"role_1": {"app_label.permission_1"}},
     )
     def test_get_all_permissions_anonymous_user(self, _):
@@ -130,7 +300,7 @@ class StaticRolePermissionBackendTest(TestCase):
         self.assertEqual(permissions, set())
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={"role_1": {"app_label.permission_1"}},
     )
     def test_get_all_permissions_user_without_role(self, _):
@@ -143,7 +313,7 @@ class StaticRolePermissionBackendTest(TestCase):
         self.assertEqual(permissions, set())
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={"role_1": {"app_label.permission_1", "app_label.permission_2"}},
     )
     def test_get_all_permissions_valid_user(self, _):
@@ -165,13 +335,18 @@ class StaticRolePermissionBackendTest(TestCase):
 class StaticRolePermissionIntegrationTest(TestCase):
     """Integration tests for StaticRolePermissionBackend with Django's permission system."""
 
+    def setUp(self):
+        super().setUp()
+
+        reset_static_role_permission_index()
+
     def test_has_perm_without_user_role(self):
         """Test that users without a role attribute have no permissions."""
         user = User()  # user.role does not exist
         self.assertEqual(False, user.has_perm("auth.add_user"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={
             "role_1": {"app_label.permission_1", "app_label.permission_2"},
         },
@@ -183,7 +358,7 @@ class StaticRolePermissionIntegrationTest(TestCase):
         self.assertEqual(True, user.has_perm("app_label.permission_1"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={
             "role_1": {"app_label.permission_1", "app_label.permission_2"},
         },
@@ -195,7 +370,7 @@ class StaticRolePermissionIntegrationTest(TestCase):
         self.assertEqual(False, user.has_perm("app_label.permission_3"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={
             "role_1": {},
         },
@@ -207,7 +382,7 @@ class StaticRolePermissionIntegrationTest(TestCase):
         self.assertEqual(False, user.has_perm("app_label.permission_1"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={
             "role_2": {"app_label.permission_1"},  # <-- role_1 is missing
         },
@@ -219,7 +394,7 @@ class StaticRolePermissionIntegrationTest(TestCase):
         self.assertEqual(False, user.has_perm("app_label.permission_1"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={
             "role_1": {"app_label.permission_1"},
         },
@@ -232,7 +407,7 @@ class StaticRolePermissionIntegrationTest(TestCase):
         self.assertEqual(False, user.has_perm("app_label.permission_1"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={},
     )
     def test_has_perm_true_for_superuser_without_role(self, _):
@@ -242,7 +417,7 @@ class StaticRolePermissionIntegrationTest(TestCase):
         self.assertEqual(True, user.has_perm("foo"))
 
     @mock.patch(
-        "ambient_toolbox.static_role_permissions.auth_backend.load_static_role_permissions",
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
         return_value={
             "role_1": {"app_label.permission_1"},
         },
@@ -252,3 +427,99 @@ class StaticRolePermissionIntegrationTest(TestCase):
         anon = AnonymousUser()
         anon.role = "role_1"
         self.assertEqual(False, anon.has_perm("app_label.permission_1"))
+
+
+@mock.patch(
+    "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+    return_value={"role_1": {"auth.view_user"}},
+)
+class StaticRoleAndGroupPermissionBackendTest(TestCase):
+    """Test suite for StaticRoleAndGroupPermissionBackend."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.group = Group.objects.create(name="group_1")
+        cls.group.permissions.add(Permission.objects.get_by_natural_key("add_user", "auth", "user"))
+
+    def setUp(self):
+        super().setUp()
+
+        reset_static_role_permission_index()
+
+        self.user = User.objects.create(username="user_1")
+        self.user.groups.add(self.group)
+        self.user.role = "role_1"
+
+    def test_get_all_permissions(self, _):
+        """Test that static and group permissions are merged."""
+        self.assertEqual(
+            StaticRoleAndGroupPermissionBackend().get_all_permissions(self.user), {"auth.view_user", "auth.add_user"}
+        )
+
+    def test_has_perm_static_permission_without_query(self, _):
+        """Test that static permissions don't need a database query."""
+        with self.assertNumQueries(0):
+            self.assertTrue(StaticRoleAndGroupPermissionBackend().has_perm(self.user, "auth.view_user"))
+
+    def test_has_perm_group_permission_queried_once(self, _):
+        """Test that group permissions are loaded once and cached on the user object."""
+        backend = StaticRoleAndGroupPermissionBackend()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(backend.has_perm(self.user, "auth.add_user"))
+            self.assertFalse(backend.has_perm(self.user, "auth.delete_user"))
+            self.assertTrue(backend.has_perm(self.user, "auth.add_user"))
+
+    def test_has_perm_group_permission_without_role(self, _):
+        """Test that users without a role still get their group permissions."""
+        del self.user.role
+
+        self.assertTrue(StaticRoleAndGroupPermissionBackend().has_perm(self.user, "auth.add_user"))
+        self.assertFalse(StaticRoleAndGroupPermissionBackend().has_perm(self.user, "auth.view_user"))
+
+    def test_has_perm_with_obj_returns_false(self, _):
+        """Test that object permissions are not granted."""
+        self.assertFalse(StaticRoleAndGroupPermissionBackend().has_perm(self.user, "auth.add_user", obj=object()))
+
+    def test_has_perms(self, _):
+        """Test that has_perms checks static and group permissions in one pass."""
+        backend = StaticRoleAndGroupPermissionBackend()
+
+        with self.assertNumQueries(1):
+            self.assertTrue(backend.has_perms(self.user, ["auth.view_user", "auth.add_user"]))
+            self.assertFalse(backend.has_perms(self.user, ["auth.view_user", "auth.delete_user"]))
+
+    def test_has_perms_static_permissions_without_query(self, _):
+        """Test that the database isn't queried if the roles grant all permissions."""
+        with self.assertNumQueries(0):
+            self.assertTrue(StaticRoleAndGroupPermissionBackend().has_perms(self.user, ["auth.view_user"]))
+
+    def test_has_perms_without_role(self, _):
+        """Test that has_perms falls back to group permissions for users without a role."""
+        del self.user.role
+
+        self.assertTrue(StaticRoleAndGroupPermissionBackend().has_perms(self.user, ["auth.add_user"]))
+        self.assertFalse(StaticRoleAndGroupPermissionBackend().has_perms(self.user, ["auth.view_user"]))
+
+    def test_has_perms_inactive_user(self, _):
+        """Test that inactive users have no permissions."""
+        self.user.is_active = False
+
+        self.assertFalse(StaticRoleAndGroupPermissionBackend().has_perms(self.user, ["auth.view_user"]))
+
+    def test_has_perms_with_obj_returns_false(self, _):
+        """Test that object permissions are not granted."""
+        self.assertFalse(StaticRoleAndGroupPermissionBackend().has_perms(self.user, ["auth.view_user"], obj=object()))
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=[
+            "ambient_toolbox.static_role_permissions.auth_backend.StaticRoleAndGroupPermissionBackend",
+        ]
+    )
+    def test_user_has_perms_integration(self, _):
+        """Test that the backend works with Django's permission system."""
+        with self.assertNumQueries(1):
+            self.assertTrue(self.user.has_perms(["auth.view_user", "auth.add_user"]))
+            self.assertFalse(self.user.has_perms(["auth.add_user", "auth.delete_user"]))
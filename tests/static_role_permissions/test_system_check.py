@@ -215,3 +215,54 @@ class CheckPermissionsAgainstModelsTest(TestCase):
         app_configs = [apps.get_app_config("auth")]
         errors = check_permissions_against_models(app_configs)
         self.assertEqual(errors, [])
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.system_check.load_static_role_permissions",
+        return_value={
+            "admin": {"inherits": ["viewer"], "permissions": {"auth.*"}},
+            "viewer": {"auth.view_*"},
+        },
+    )
+    def test_check_permissions_against_models_wildcards_and_inheritance_valid(self, _):
+        """Test that matching wildcards and valid inheritance don't raise any warning."""
+        app_configs = [apps.get_app_config("auth")]
+        errors = check_permissions_against_models(app_configs)
+        self.assertEqual(errors, [])
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.system_check.load_static_role_permissions",
+        return_value={"admin": {"permissions": {"shop.*"}}},
+    )
+    def test_check_permissions_against_models_wildcard_without_match(self, _):
+        """Test when a wildcard doesn't match any model permission."""
+        app_configs = [apps.get_app_config("auth")]
+        errors = check_permissions_against_models(app_configs)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].msg, "Permission pattern does not match any model permission.")
+        self.assertEqual(errors[0].obj, "'shop.*' (Role 'admin')")
+
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.system_check.load_static_role_permissions",
+        return_value={"admin": {"inherits": ["viewer"]}},
+    )
+    def test_check_permissions_against_models_unknown_parent_role(self, _):
+        """Test when a role inherits from an undefined role."""
+        app_configs = [apps.get_app_config("auth")]
+        errors = check_permissions_against_models(app_configs)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].msg, "Static role 'admin' inherits from unknown role 'viewer'.")
+        self.assertEqual(errors[0].obj, "STATIC_ROLE_PERMISSIONS_PATH")
+
+    @override_settings(STATIC_ROLE_PERMISSIONS_FILE="permissions.json")
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.system_check.load_static_role_permissions",
+        return_value={"admin": {"inherits": ["viewer"]}},
+    )
+    def test_check_permissions_against_models_unknown_parent_role_from_file(self, _):
+        """Test that the warning points to the file setting if the definition is loaded from a file."""
+        errors = check_permissions_against_models([apps.get_app_config("auth")])
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].obj, "STATIC_ROLE_PERMISSIONS_FILE")
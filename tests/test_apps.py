@@ -28,6 +28,18 @@ def test_app_ready_static_role_permissions_checks_registered(mocked_register):
     assert mocked_register.call_count == 1
 
 
+@override_settings(STATIC_ROLE_PERMISSIONS_PATH=None)
+@override_settings(STATIC_ROLE_PERMISSIONS_FILE="/path/to/permissions.json")
+@override_settings(STATIC_ROLE_PERMISSIONS_ENABLE_SYSTEM_CHECK=True)
+@mock.patch("ambient_toolbox.apps.register")
+def test_app_ready_static_role_permissions_checks_registered_file(mocked_register):
+    config = AmbientToolboxConfig(app_name="ambient_toolbox", app_module=sys.modules[__name__])
+    config.path = str(Path(__file__).resolve().parent)
+    config.ready()
+
+    assert mocked_register.call_count == 1
+
+
 @override_settings(STATIC_ROLE_PERMISSIONS_PATH=None)
 @override_settings(STATIC_ROLE_PERMISSIONS_ENABLE_SYSTEM_CHECK=True)
 @mock.patch("ambient_toolbox.apps.register")
@@ -67,3 +79,24 @@ def test_app_ready_autodiscover_called_autodiscovery_disabled_by_default(mocked_
     config.ready()
 
     assert mocked_autodiscover.call_count == 0
+
+
+@override_settings(VISIBILITY_INDEX_SERVICES=["testapp.services.ModelWithVisibilityIndexService"])
+@mock.patch("ambient_toolbox.visibility_index.signals.connect_registered_visibility_indices")
+def test_app_ready_visibility_index_signals_connected(mocked_connect):
+    config = AmbientToolboxConfig(app_name="ambient_toolbox", app_module=sys.modules[__name__])
+    config.path = str(Path(__file__).resolve().parent)
+    config.ready()
+
+    assert mocked_connect.call_count == 1
+
+
+@override_settings(VISIBILITY_INDEX_SERVICES=["testapp.services.ModelWithVisibilityIndexService"])
+@override_settings(VISIBILITY_INDEX_CONNECT_SIGNALS=False)
+@mock.patch("ambient_toolbox.visibility_index.signals.connect_registered_visibility_indices")
+def test_app_ready_visibility_index_signals_not_connected_disabled(mocked_connect):
+    config = AmbientToolboxConfig(app_name="ambient_toolbox", app_module=sys.modules[__name__])
+    config.path = str(Path(__file__).resolve().parent)
+    config.ready()
+
+    assert mocked_connect.call_count == 0
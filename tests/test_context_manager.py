@@ -1,8 +1,13 @@
+import asyncio
+import threading
+from unittest import mock
+
 from django.core import mail
 from django.db.models import signals
+from django.dispatch import Signal
 from django.test import TestCase
 
-from ambient_toolbox.context_manager import TempDisconnectSignal
+from ambient_toolbox.context_manager import TempDisconnectSignal, suppress_signals
 from testapp.models import (
     MyMultipleSignalModel,
     MySingleSignalModel,
@@ -66,3 +71,206 @@ class TempDisconnectSignalTest(TestCase):
 
         self.assertEqual(obj.value, 0)
         self.assertEqual(outbox, 1)
+
+
+class TempDisconnectSignalScopeTest(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.signal = Signal()
+        self.call_list = []
+        self.signal.connect(self._receiver_a, weak=False)
+        self.signal.connect(self._receiver_b, weak=False)
+
+    def _receiver_a(self, sender, **kwargs):
+        self.call_list.append(("a", sender))
+
+    def _receiver_b(self, sender, **kwargs):
+        self.call_list.append(("b", sender))
+
+    def test_only_given_receiver_muted(self):
+        with TempDisconnectSignal(signal=self.signal, receiver=self._receiver_a, sender=MySingleSignalModel):
+            self.signal.send(sender=MySingleSignalModel)
+            self.signal.send(sender=MyMultipleSignalModel)
+
+        self.assertEqual(
+            self.call_list, [("b", MySingleSignalModel), ("a", MyMultipleSignalModel), ("b", MyMultipleSignalModel)]
+        )
+
+    def test_receiver_resolved_via_dispatch_uid(self):
+        signal = Signal()
+        signal.connect(self._receiver_a, sender=MySingleSignalModel, dispatch_uid="uid-a")
+        signal.connect(self._receiver_b, sender=MySingleSignalModel, dispatch_uid="uid-b")
+
+        with TempDisconnectSignal(signal=signal, receiver=None, sender=MySingleSignalModel, dispatch_uid="uid-a"):
+            signal.send(sender=MySingleSignalModel)
+
+        self.assertEqual(self.call_list, [("b", MySingleSignalModel)])
+
+    def test_unknown_dispatch_uid(self):
+        with self.assertRaisesMessage(ValueError, "No receiver connected with dispatch_uid 'unknown'."):
+            with TempDisconnectSignal(
+                signal=self.signal, receiver=None, sender=MySingleSignalModel, dispatch_uid="unknown"
+            ):
+                pass
+
+    def test_unknown_dispatch_uid_with_receiver(self):
+        with TempDisconnectSignal(
+            signal=self.signal, receiver=self._receiver_a, sender=MySingleSignalModel, dispatch_uid="unknown"
+        ):
+            self.signal.send(sender=MySingleSignalModel)
+
+        self.assertEqual(self.call_list, [("b", MySingleSignalModel)])
+
+    def test_all_senders_muted(self):
+        with TempDisconnectSignal(signal=self.signal, receiver=self._receiver_a, sender=None):
+            self.signal.send(sender=MySingleSignalModel)
+            self.signal.send(sender=MyMultipleSignalModel)
+
+        self.assertEqual(self.call_list, [("b", MySingleSignalModel), ("b", MyMultipleSignalModel)])
+
+    def test_receivers_not_disconnected(self):
+        with mock.patch.object(self.signal, "disconnect") as mocked_disconnect:
+            with mock.patch.object(self.signal, "connect") as mocked_connect:
+                with TempDisconnectSignal(signal=self.signal, receiver=self._receiver_a, sender=MySingleSignalModel):
+                    self.assertEqual(len(self.signal.receivers), 2)
+
+        mocked_disconnect.assert_not_called()
+        mocked_connect.assert_not_called()
+
+    def test_receiver_order_kept(self):
+        with TempDisconnectSignal(signal=self.signal, receiver=self._receiver_a, sender=MySingleSignalModel):
+            pass
+        self.signal.send(sender=MySingleSignalModel)
+
+        self.assertEqual(self.call_list, [("a", MySingleSignalModel), ("b", MySingleSignalModel)])
+
+    def test_reentered(self):
+        temp_disconnect = TempDisconnectSignal(signal=self.signal, receiver=self._receiver_a, sender=None)
+
+        with temp_disconnect:
+            with temp_disconnect:
+                self.signal.send(sender=MySingleSignalModel)
+            self.signal.send(sender=MySingleSignalModel)
+        self.signal.send(sender=MySingleSignalModel)
+
+        self.assertEqual(
+            self.call_list,
+            [
+                ("b", MySingleSignalModel),
+                ("b", MySingleSignalModel),
+                ("a", MySingleSignalModel),
+                ("b", MySingleSignalModel),
+            ],
+        )
+
+    def test_other_threads_not_affected(self):
+        thread = threading.Thread(target=self.signal.send, kwargs={"sender": MySingleSignalModel})
+
+        with TempDisconnectSignal(signal=self.signal, receiver=self._receiver_a, sender=MySingleSignalModel):
+            thread.start()
+            thread.join()
+
+        self.assertEqual(self.call_list, [("a", MySingleSignalModel), ("b", MySingleSignalModel)])
+
+    def test_async_send(self):
+        async def send():
+            with TempDisconnectSignal(signal=self.signal, receiver=self._receiver_b, sender=MySingleSignalModel):
+                await self.signal.asend(sender=MySingleSignalModel)
+
+        asyncio.run(send())
+
+        self.assertEqual(self.call_list, [("a", MySingleSignalModel)])
+
+
+class SuppressSignalsTest(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.signal = Signal()
+        self.call_list = []
+        self.signal.connect(self._receiver, weak=False)
+
+    def _receiver(self, sender, **kwargs):
+        self.call_list.append(sender)
+
+    def test_signal_suppressed(self):
+        with suppress_signals(signals.pre_save):
+            obj = MySingleSignalModel.objects.create()
+
+        self.assertEqual(obj.value, 0)
+
+    def test_signal_restored_after_context(self):
+        with suppress_signals(signals.pre_save):
+            pass
+        obj = MySingleSignalModel.objects.create()
+
+        self.assertEqual(obj.value, 1)
+
+    def test_signal_restored_after_error(self):
+        with self.assertRaises(ValueError), suppress_signals(self.signal):
+            raise ValueError
+
+        self.signal.send(sender=MySingleSignalModel)
+
+        self.assertEqual(self.call_list, [MySingleSignalModel])
+
+    def test_signal_suppressed_per_sender(self):
+        with suppress_signals(signals.pre_save, sender=MyMultipleSignalModel):
+            single_obj = MySingleSignalModel.objects.create()
+            multiple_obj = MyMultipleSignalModel.objects.create()
+
+        self.assertEqual(single_obj.value, 1)
+        self.assertEqual(multiple_obj.value, 0)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_nested(self):
+        with suppress_signals(self.signal, sender=MySingleSignalModel):
+            with suppress_signals(self.signal, sender=MyMultipleSignalModel):
+                self.signal.send(sender=MySingleSignalModel)
+                self.signal.send(sender=MyMultipleSignalModel)
+            self.signal.send(sender=MyMultipleSignalModel)
+
+        self.assertEqual(self.call_list, [MyMultipleSignalModel])
+
+    def test_send_robust_suppressed(self):
+        with suppress_signals(self.signal):
+            self.assertEqual(self.signal.send_robust(sender=MySingleSignalModel), [])
+
+        self.assertEqual(self.call_list, [])
+
+    def test_async_send_suppressed(self):
+        async def send():
+            with suppress_signals(self.signal):
+                await self.signal.asend(sender=MySingleSignalModel)
+            await self.signal.asend(sender=MyMultipleSignalModel)
+
+        asyncio.run(send())
+
+        self.assertEqual(self.call_list, [MyMultipleSignalModel])
+
+    def test_other_threads_not_affected(self):
+        thread = threading.Thread(target=self.signal.send, kwargs={"sender": MySingleSignalModel})
+
+        with suppress_signals(self.signal):
+            thread.start()
+            thread.join()
+            self.signal.send(sender=MyMultipleSignalModel)
+
+        self.assertEqual(self.call_list, [MySingleSignalModel])
+
+    def test_receivers_stay_connected(self):
+        with suppress_signals(self.signal):
+            self.assertFalse(self.signal.has_listeners())
+            self.assertEqual(len(self.signal.receivers), 1)
+
+        self.assertTrue(self.signal.has_listeners())
+
+    def test_receiver_cache_kept(self):
+        MySingleSignalModel.objects.create()
+        cached_receivers = signals.pre_save.sender_receivers_cache[MySingleSignalModel]
+
+        with suppress_signals(signals.pre_save):
+            MySingleSignalModel.objects.create()
+
+        self.assertIs(signals.pre_save.sender_receivers_cache[MySingleSignalModel], cached_receivers)
@@ -1,11 +1,21 @@
+from unittest import mock
+
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import models
 from django.test import TestCase
 
+from ambient_toolbox import managers
 from ambient_toolbox.managers import (
     AbstractUserSpecificManager,
     AbstractUserSpecificQuerySet,
+    ReferenceDataManager,
+    ReferenceDataSnapshot,
+    get_reference_data_cache_key,
+    invalidate_reference_data,
+    reset_reference_data,
 )
-from testapp.models import ModelWithGetOrNoneManagerModel, MySingleSignalModel
+from testapp.models import ModelWithGetOrNoneManagerModel, ModelWithReferenceDataManager, MySingleSignalModel
 
 
 class AbstractUserSpecificQuerySetTest(TestCase):
@@ -128,3 +138,306 @@ class GetOrNoneMixinTest(TestCase):
             "get() returned more than one ModelWithGetOrNoneManagerModel -- it returned 2!",
         ):
             ModelWithGetOrNoneManagerModel.objects.get_or_none(my_field=True)
+
+
+class ReferenceDataSnapshotTest(TestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.obj_1 = ModelWithReferenceDataManager(id=1, code="DE", name="Germany")
+        self.obj_2 = ModelWithReferenceDataManager(id=2, code="AT", name="Austria")
+        self.snapshot = ReferenceDataSnapshot(
+            objects=[self.obj_1, self.obj_2],
+            unique_fields=[
+                ModelWithReferenceDataManager._meta.pk,
+                ModelWithReferenceDataManager._meta.get_field("code"),
+            ],
+            version="abc",
+        )
+
+    def test_objects_are_immutable_tuple(self):
+        self.assertEqual(self.snapshot.objects, (self.obj_1, self.obj_2))
+
+    def test_setting_attribute_not_allowed(self):
+        with self.assertRaisesMessage(AttributeError, "ReferenceDataSnapshot is immutable."):
+            self.snapshot.version = "def"
+
+    def test_indices_are_read_only(self):
+        with self.assertRaises(TypeError):
+            self.snapshot.indices["code"]["CH"] = self.obj_1
+
+    def test_lookup_via_unique_index(self):
+        self.assertEqual(self.snapshot.lookup({"code": "AT"}), [self.obj_2])
+
+    def test_lookup_via_unique_index_no_match(self):
+        self.assertEqual(self.snapshot.lookup({"code": "CH"}), [])
+
+    def test_lookup_via_unique_index_with_further_attributes(self):
+        self.assertEqual(self.snapshot.lookup({"id": 1, "name": "Austria"}), [])
+
+    def test_lookup_via_scan(self):
+        self.assertEqual(self.snapshot.lookup({"name": "Germany"}), [self.obj_1])
+
+
+class ReferenceDataManagerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.obj_de = ModelWithReferenceDataManager.objects.create(code="DE", name="Germany")
+        cls.obj_at = ModelWithReferenceDataManager.objects.create(code="AT", name="Austria", parent=cls.obj_de)
+        cls.obj_ch = ModelWithReferenceDataManager.objects.create(code="CH", name="Austria")
+
+    def setUp(self):
+        super().setUp()
+
+        # Transaction rollbacks between tests don't trigger any signals
+        reset_reference_data(model=ModelWithReferenceDataManager)
+
+    def test_get_snapshot_contains_whole_table(self):
+        snapshot = ModelWithReferenceDataManager.objects.get_snapshot()
+
+        self.assertEqual(snapshot.objects, (self.obj_at, self.obj_ch, self.obj_de))
+        self.assertEqual(set(snapshot.indices.keys()), {"id", "code"})
+
+    def test_get_snapshot_reused(self):
+        snapshot = ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertIs(ModelWithReferenceDataManager.objects.get_snapshot(), snapshot)
+
+    def test_get_snapshot_rebuilt_after_version_change(self):
+        snapshot = ModelWithReferenceDataManager.objects.get_snapshot()
+        cache.set(get_reference_data_cache_key(model=ModelWithReferenceDataManager), "other-version")
+
+        with self.assertNumQueries(1):
+            self.assertIsNot(ModelWithReferenceDataManager.objects.get_snapshot(), snapshot)
+
+    def test_get_snapshot_version_created_if_missing(self):
+        cache.delete(get_reference_data_cache_key(model=ModelWithReferenceDataManager))
+
+        snapshot = ModelWithReferenceDataManager.objects.get_snapshot()
+
+        self.assertEqual(snapshot.version, cache.get(get_reference_data_cache_key(model=ModelWithReferenceDataManager)))
+
+    @mock.patch.object(ReferenceDataManager, "version_check_interval", 60)
+    def test_get_snapshot_version_check_interval(self):
+        snapshot = ModelWithReferenceDataManager.objects.get_snapshot()
+        cache.set(get_reference_data_cache_key(model=ModelWithReferenceDataManager), "other-version")
+
+        self.assertIs(ModelWithReferenceDataManager.objects.get_snapshot(), snapshot)
+
+    def test_get_via_pk(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(ModelWithReferenceDataManager.objects.get(pk=self.obj_de.id), self.obj_de)
+
+    def test_get_via_unique_field_with_exact_lookup(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(ModelWithReferenceDataManager.objects.get(code__exact="AT"), self.obj_at)
+
+    def test_get_via_relation_attname(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(ModelWithReferenceDataManager.objects.get(parent_id=self.obj_de.id), self.obj_at)
+
+    def test_get_casts_values(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(ModelWithReferenceDataManager.objects.get(pk=str(self.obj_de.id)), self.obj_de)
+
+    def test_get_does_not_exist(self):
+        with self.assertRaisesMessage(
+            ModelWithReferenceDataManager.DoesNotExist, "ModelWithReferenceDataManager matching query does not exist."
+        ):
+            ModelWithReferenceDataManager.objects.get(code="FR")
+
+    def test_get_multiple_objects_returned(self):
+        with self.assertRaisesMessage(
+            ModelWithReferenceDataManager.MultipleObjectsReturned,
+            "get() returned more than one ModelWithReferenceDataManager -- it returned 2!",
+        ):
+            ModelWithReferenceDataManager.objects.get(name="Austria")
+
+    def test_get_complex_lookup_falls_back_to_database(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(ModelWithReferenceDataManager.objects.get(code__startswith="D"), self.obj_de)
+
+    def test_get_relation_via_instance_falls_back_to_database(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(ModelWithReferenceDataManager.objects.get(parent=self.obj_de), self.obj_at)
+
+    def test_related_manager_keeps_relation_filter(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        self.assertEqual(list(self.obj_de.children_with_reference_data.filter(code="AT")), [self.obj_at])
+        self.assertEqual(list(self.obj_ch.children_with_reference_data.filter(code="AT")), [])
+        self.assertEqual(self.obj_de.children_with_reference_data.get(code="AT"), self.obj_at)
+        with self.assertRaises(ModelWithReferenceDataManager.DoesNotExist):
+            self.obj_ch.children_with_reference_data.get(code="AT")
+
+    def test_get_unknown_field_falls_back_to_database(self):
+        with self.assertRaises(Exception):  # noqa: B017
+            ModelWithReferenceDataManager.objects.get(unknown_field=1)
+
+    def test_get_invalid_value_falls_back_to_database(self):
+        with self.assertRaises(ValueError):
+            ModelWithReferenceDataManager.objects.get(pk="no-number")
+
+    def test_get_or_none_served_from_memory(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(ModelWithReferenceDataManager.objects.get_or_none(code="FR"))
+
+    def test_filter_served_from_memory(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(0):
+            qs = ModelWithReferenceDataManager.objects.filter(name="Austria")
+            self.assertEqual(list(qs), [self.obj_at, self.obj_ch])
+            self.assertEqual(qs.count(), 2)
+            self.assertTrue(qs.exists())
+
+    def test_filter_chaining_hits_database(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(1):
+            qs = ModelWithReferenceDataManager.objects.filter(name="Austria").filter(code="CH")
+            self.assertEqual(list(qs), [self.obj_ch])
+
+    def test_filter_with_q_object_hits_database(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.assertNumQueries(1):
+            qs = ModelWithReferenceDataManager.objects.filter(models.Q(code="DE") | models.Q(code="AT"))
+            self.assertEqual(list(qs), [self.obj_at, self.obj_de])
+
+    def test_visible_for_available(self):
+        self.assertEqual(ModelWithReferenceDataManager.objects.visible_for(None).count(), 3)
+
+    def test_save_invalidates_snapshot(self):
+        ModelWithReferenceDataManager.objects.get(code="DE")
+
+        self.obj_de.name = "Deutschland"
+        self.obj_de.save()
+
+        self.assertEqual(ModelWithReferenceDataManager.objects.get(code="DE").name, "Deutschland")
+
+    def test_delete_invalidates_snapshot(self):
+        ModelWithReferenceDataManager.objects.get(code="CH")
+
+        self.obj_ch.delete()
+
+        self.assertIsNone(ModelWithReferenceDataManager.objects.get_or_none(code="CH"))
+
+    def test_queryset_update_invalidates_snapshot(self):
+        ModelWithReferenceDataManager.objects.get(code="DE")
+
+        ModelWithReferenceDataManager.objects.all().filter(code="DE").update(name="Deutschland")
+
+        self.assertEqual(ModelWithReferenceDataManager.objects.get(code="DE").name, "Deutschland")
+
+    def test_queryset_delete_invalidates_snapshot(self):
+        ModelWithReferenceDataManager.objects.get(code="CH")
+
+        ModelWithReferenceDataManager.objects.all().filter(code="CH").delete()
+
+        self.assertIsNone(ModelWithReferenceDataManager.objects.get_or_none(code="CH"))
+
+    def test_bulk_create_invalidates_snapshot(self):
+        ModelWithReferenceDataManager.objects.get(code="DE")
+
+        ModelWithReferenceDataManager.objects.bulk_create([ModelWithReferenceDataManager(code="FR", name="France")])
+
+        self.assertEqual(ModelWithReferenceDataManager.objects.get(code="FR").name, "France")
+
+    def test_bulk_update_invalidates_snapshot(self):
+        ModelWithReferenceDataManager.objects.get(code="DE")
+
+        obj = ModelWithReferenceDataManager.objects.all().get(code="DE")
+        obj.name = "Deutschland"
+        ModelWithReferenceDataManager.objects.bulk_update([obj], fields=["name"])
+
+        self.assertEqual(ModelWithReferenceDataManager.objects.get(code="DE").name, "Deutschland")
+
+    def test_get_returns_copy(self):
+        obj = ModelWithReferenceDataManager.objects.get(code="DE")
+        obj.name = "Changed"
+        obj._prefetched_objects_cache = {"children": []}
+
+        snapshot_obj = ModelWithReferenceDataManager.objects.get_snapshot().indices["code"]["DE"]
+        self.assertEqual(ModelWithReferenceDataManager.objects.get(code="DE").name, "Germany")
+        self.assertEqual(snapshot_obj.name, "Germany")
+        self.assertFalse(hasattr(snapshot_obj, "_prefetched_objects_cache"))
+
+    def test_filter_returns_copies(self):
+        obj_list = list(ModelWithReferenceDataManager.objects.filter(name="Austria"))
+        obj_list[0].name = "Changed"
+
+        self.assertEqual(
+            [obj.name for obj in ModelWithReferenceDataManager.objects.filter(name="Austria")], ["Austria", "Austria"]
+        )
+
+    def test_invalidation_waits_for_commit(self):
+        cache_key = get_reference_data_cache_key(model=ModelWithReferenceDataManager)
+        version = ModelWithReferenceDataManager.objects.get_snapshot().version
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            ModelWithReferenceDataManager.objects.filter(code="DE").update(name="Deutschland")
+
+            # Other processes keep their snapshot until the write is committed
+            self.assertEqual(cache.get(cache_key), version)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertNotEqual(cache.get(cache_key), version)
+
+    def test_pending_write_read_from_database(self):
+        snapshot = ModelWithReferenceDataManager.objects.get_snapshot()
+
+        with self.captureOnCommitCallbacks():
+            self.obj_de.name = "Deutschland"
+            self.obj_de.save()
+
+            with self.assertNumQueries(1):
+                self.assertEqual(ModelWithReferenceDataManager.objects.get(code="DE").name, "Deutschland")
+            # The uncommitted rows aren't shared with other threads
+            self.assertIs(
+                managers._reference_data_snapshot_registry[
+                    get_reference_data_cache_key(model=ModelWithReferenceDataManager)
+                ],
+                snapshot,
+            )
+
+    def test_pending_write_cleared_after_rollback(self):
+        ModelWithReferenceDataManager.objects.get_snapshot()
+        cache_key = get_reference_data_cache_key(model=ModelWithReferenceDataManager)
+
+        with mock.patch("ambient_toolbox.managers.transaction.on_commit"):
+            invalidate_reference_data(model=ModelWithReferenceDataManager)
+        with mock.patch("ambient_toolbox.managers.transaction.get_connection") as mocked_get_connection:
+            mocked_get_connection.return_value.in_atomic_block = False
+
+            with self.assertNumQueries(0):
+                ModelWithReferenceDataManager.objects.get(code="DE")
+
+        self.assertNotIn(cache_key, managers._get_pending_writes())
+
+    def test_invalidate_outside_of_transaction(self):
+        cache_key = get_reference_data_cache_key(model=ModelWithReferenceDataManager)
+        version = ModelWithReferenceDataManager.objects.get_snapshot().version
+
+        with mock.patch("ambient_toolbox.managers.transaction.on_commit", side_effect=lambda func, using: func()):
+            invalidate_reference_data(model=ModelWithReferenceDataManager)
+
+        self.assertNotEqual(cache.get(cache_key), version)
+        self.assertNotIn(cache_key, managers._get_pending_writes())
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from ambient_toolbox.services.bleacher import RebleachProgress, RebleachService
+from testapp.models import BleacherMixinModel, ModelWithCleanMixin
+
+
+class RebleachProgressTest(TestCase):
+    def test_rows_per_second(self):
+        progress = RebleachProgress(processed=100, started_at=0)
+
+        with mock.patch("ambient_toolbox.services.bleacher.time.monotonic", return_value=4):
+            self.assertEqual(progress.elapsed, 4)
+            self.assertEqual(progress.rows_per_second, 25)
+
+    def test_rows_per_second_without_elapsed_time(self):
+        progress = RebleachProgress(processed=100, started_at=4)
+
+        with mock.patch("ambient_toolbox.services.bleacher.time.monotonic", return_value=4):
+            self.assertEqual(progress.rows_per_second, 0)
+
+
+class RebleachServiceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        # "bulk_create()" bypasses the mixin, like rows written before the allowlists were tightened
+        cls.obj_list = BleacherMixinModel.objects.bulk_create(
+            [
+                BleacherMixinModel(content="<p>Clean</p>"),
+                BleacherMixinModel(content="<script>Evil</script>Dirty"),
+                BleacherMixinModel(content=""),
+                BleacherMixinModel(content="<modal>Dirty</modal>"),
+                BleacherMixinModel(content="Clean"),
+            ]
+        )
+
+    def test_init_missing_model(self):
+        with self.assertRaisesMessage(AssertionError, "Please set the attribute 'model'."):
+            RebleachService()
+
+    def test_init_model_without_bleacher_mixin(self):
+        with self.assertRaisesMessage(
+            AssertionError, "Model 'testapp.ModelWithCleanMixin' doesn't use the BleacherMixin."
+        ):
+            RebleachService(model=ModelWithCleanMixin)
+
+    def test_process(self):
+        progress = RebleachService(model=BleacherMixinModel, chunk_size=2, workers=2).process()
+
+        self.assertEqual(progress.processed, 5)
+        self.assertEqual(progress.changed, 2)
+        self.assertEqual(progress.last_pk, self.obj_list[-1].pk)
+        self.assertEqual(
+            list(BleacherMixinModel.objects.order_by("pk").values_list("content", flat=True)),
+            ["<p>Clean</p>", "Dirty", "", "Dirty", "Clean"],
+        )
+
+    def test_process_progress_callback(self):
+        progress_list = []
+
+        RebleachService(model=BleacherMixinModel, chunk_size=2).process(
+            progress_callback=lambda progress: progress_list.append((progress.processed, progress.last_pk))
+        )
+
+        self.assertEqual(
+            progress_list,
+            [(2, self.obj_list[1].pk), (4, self.obj_list[3].pk), (5, self.obj_list[4].pk)],
+        )
+
+    def test_process_resume(self):
+        progress = RebleachService(model=BleacherMixinModel).process(start_after_pk=self.obj_list[2].pk)
+
+        self.assertEqual(progress.processed, 2)
+        self.assertEqual(progress.changed, 1)
+        self.assertEqual(BleacherMixinModel.objects.get(pk=self.obj_list[1].pk).content, "<script>Evil</script>Dirty")
+        self.assertEqual(BleacherMixinModel.objects.get(pk=self.obj_list[3].pk).content, "Dirty")
+
+    def test_process_dry_run(self):
+        progress = RebleachService(model=BleacherMixinModel, dry_run=True).process()
+
+        self.assertEqual(progress.changed, 2)
+        self.assertEqual(BleacherMixinModel.objects.get(pk=self.obj_list[1].pk).content, "<script>Evil</script>Dirty")
+
+    def test_process_only_changed_rows_written(self):
+        with mock.patch.object(BleacherMixinModel._default_manager, "bulk_update") as mocked_bulk_update:
+            RebleachService(model=BleacherMixinModel).process()
+
+        mocked_bulk_update.assert_called_once()
+        self.assertEqual(
+            [obj.pk for obj in mocked_bulk_update.call_args.args[0]], [self.obj_list[1].pk, self.obj_list[3].pk]
+        )
+        self.assertEqual(mocked_bulk_update.call_args.kwargs, {"fields": ["content"]})
+
+    def test_process_empty_table(self):
+        BleacherMixinModel.objects.all().delete()
+
+        progress = RebleachService(model=BleacherMixinModel).process()
+
+        self.assertEqual(progress.processed, 0)
+        self.assertIsNone(progress.last_pk)
+
+    def test_process_one_query_per_chunk(self):
+        with self.assertNumQueries(3 * 2 + 1):
+            # Two chunks with a select, a bulk update and the savepoints each, the last (empty) one is skipped
+            RebleachService(model=BleacherMixinModel, chunk_size=5).process()
@@ -0,0 +1,142 @@
+import calendar
+import datetime
+import random
+
+import pytest
+
+from ambient_toolbox.utils.business_calendar import BusinessCalendar, get_business_calendar
+
+HOLIDAYS = (datetime.date(2024, 1, 1), datetime.date(2024, 12, 25), datetime.date(2025, 4, 18))
+RECURRING_HOLIDAYS = ((5, 1), (10, 3), (2, 29))
+
+
+def get_calendar() -> BusinessCalendar:
+    return BusinessCalendar(holidays=HOLIDAYS, recurring_holidays=RECURRING_HOLIDAYS)
+
+
+def is_business_day_naive(business_calendar: BusinessCalendar, date: datetime.date) -> bool:
+    return (
+        date.weekday() not in business_calendar.weekend_days
+        and date not in business_calendar.holidays
+        and (date.month, date.day) not in business_calendar.recurring_holidays
+    )
+
+
+def get_random_dates(count: int) -> list[datetime.date]:
+    randomizer = random.Random(45)
+    start_ordinal = datetime.date(2022, 1, 1).toordinal()
+    return [datetime.date.fromordinal(start_ordinal + randomizer.randint(0, 5 * 365)) for _ in range(count)]
+
+
+def test_is_business_day():
+    business_calendar = get_calendar()
+    assert business_calendar.is_business_day(datetime.date(2024, 1, 2)) is True
+    # Weekend, holiday and recurring holiday
+    assert business_calendar.is_business_day(datetime.date(2024, 1, 6)) is False
+    assert business_calendar.is_business_day(datetime.date(2024, 12, 25)) is False
+    assert business_calendar.is_business_day(datetime.date(2025, 5, 1)) is False
+
+
+def test_is_business_day_matches_naive_check():
+    business_calendar = get_calendar()
+    day = datetime.date(2023, 1, 1)
+    while day.year < 2026:  # noqa: PLR2004
+        assert business_calendar.is_business_day(day) == is_business_day_naive(business_calendar, day)
+        day += datetime.timedelta(days=1)
+
+
+def test_recurring_holiday_on_leap_day():
+    business_calendar = get_calendar()
+    assert business_calendar.is_business_day(datetime.date(2024, 2, 29)) is False
+    assert business_calendar.get_business_year(2023).total == 260 - 2
+
+
+def test_custom_weekend_days():
+    business_calendar = BusinessCalendar(weekend_days=(calendar.FRIDAY, calendar.SATURDAY))
+    assert business_calendar.is_business_day(datetime.date(2024, 9, 20)) is False
+    assert business_calendar.is_business_day(datetime.date(2024, 9, 22)) is True
+
+
+def test_no_working_day():
+    with pytest.raises(ValueError, match="at least one working day per week"):
+        BusinessCalendar(weekend_days=range(7))
+
+
+def test_business_days_between():
+    business_calendar = get_calendar()
+    # Monday to next Monday, end date excluded
+    assert business_calendar.business_days_between(datetime.date(2024, 9, 16), datetime.date(2024, 9, 23)) == 5  # noqa: PLR2004
+    assert business_calendar.business_days_between(datetime.date(2024, 9, 16), datetime.date(2024, 9, 16)) == 0
+    assert business_calendar.business_days_between(datetime.date(2024, 9, 23), datetime.date(2024, 9, 16)) == -5  # noqa: PLR2004
+
+
+def test_business_days_between_matches_naive_count():
+    business_calendar = get_calendar()
+    date_list = get_random_dates(count=100)
+    for start_date, end_date in zip(date_list, reversed(date_list)):
+        low, high = sorted((start_date, end_date))
+        expected_count = sum(
+            is_business_day_naive(business_calendar, low + datetime.timedelta(days=offset))
+            for offset in range((high - low).days)
+        )
+
+        assert business_calendar.business_days_between(low, high) == expected_count
+
+
+def test_add_business_days():
+    business_calendar = get_calendar()
+    # Friday plus one business day is Monday
+    assert business_calendar.add_business_days(datetime.date(2024, 9, 20), 1) == datetime.date(2024, 9, 23)
+    # From a Saturday
+    assert business_calendar.add_business_days(datetime.date(2024, 9, 21), 1) == datetime.date(2024, 9, 23)
+    assert business_calendar.add_business_days(datetime.date(2024, 9, 21), -1) == datetime.date(2024, 9, 20)
+    assert business_calendar.add_business_days(datetime.date(2024, 9, 21), 0) == datetime.date(2024, 9, 21)
+    # Across the turn of the year and its holidays
+    assert business_calendar.add_business_days(datetime.date(2023, 12, 29), 1) == datetime.date(2024, 1, 2)
+    assert business_calendar.add_business_days(datetime.date(2024, 1, 2), -1) == datetime.date(2023, 12, 29)
+
+
+@pytest.mark.parametrize("days", [1, 2, 5, 20, 300, 700, -1, -2, -5, -20, -300, -700])
+def test_add_business_days_matches_naive_stepping(days):
+    business_calendar = get_calendar()
+    step = datetime.timedelta(days=1 if days > 0 else -1)
+    for source_date in get_random_dates(count=20):
+        expected_date, remaining_days = source_date, abs(days)
+        while remaining_days:
+            expected_date += step
+            remaining_days -= is_business_day_naive(business_calendar, expected_date)
+
+        assert business_calendar.add_business_days(source_date, days) == expected_date
+
+
+def test_add_business_days_inverse_of_business_days_between():
+    business_calendar = get_calendar()
+    for source_date in get_random_dates(count=50):
+        days = 42
+        target_date = business_calendar.add_business_days(source_date, days)
+
+        assert (
+            business_calendar.business_days_between(
+                source_date + datetime.timedelta(days=1), target_date + datetime.timedelta(days=1)
+            )
+            == days
+        )
+
+
+def test_business_year_computed_once():
+    business_calendar = get_calendar()
+    business_calendar.is_business_day(datetime.date(2024, 1, 2))
+    business_year = business_calendar.get_business_year(2024)
+
+    business_calendar.business_days_between(datetime.date(2024, 1, 2), datetime.date(2024, 6, 1))
+
+    assert business_calendar.get_business_year(2024) is business_year
+    assert list(business_calendar._business_years) == [2024]
+
+
+def test_get_business_calendar_cached_per_configuration():
+    business_calendar = get_business_calendar(holidays=[datetime.date(2024, 1, 1)])
+
+    assert get_business_calendar(holidays={datetime.date(2024, 1, 1)}) is business_calendar
+    assert get_business_calendar() is not business_calendar
+    assert get_business_calendar(weekend_days=[calendar.SUNDAY]).weekend_days == frozenset({calendar.SUNDAY})
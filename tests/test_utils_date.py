@@ -1,5 +1,10 @@
 import calendar
 import datetime
+import random
+from decimal import ROUND_HALF_EVEN, Decimal
+from fractions import Fraction
+from unittest import mock
+from zoneinfo import ZoneInfo
 
 import pytest
 from django.test.utils import override_settings
@@ -8,7 +13,10 @@ from freezegun import freeze_time
 from ambient_toolbox.utils import get_previous_quarter_starting_date_for_date
 from ambient_toolbox.utils.date import (
     DateHelper,
+    DatetimeFormatter,
     MonthHelper,
+    ProrationCalculator,
+    Recurrence,
     add_days,
     add_minutes,
     add_months,
@@ -23,6 +31,7 @@ from ambient_toolbox.utils.date import (
     get_next_month,
     get_start_and_end_date_from_calendar_week,
     get_time_from_seconds,
+    merge_occurrences,
     next_weekday,
     tz_today,
 )
@@ -350,6 +359,150 @@ def test_datetime_format_with_invalid_timezone():
     assert datetime_format(source_date, "%d.%m.%Y %H:%M") == "26.06.2020 08:00"
 
 
+@override_settings(TIME_ZONE="Europe/Berlin")
+def test_datetime_format_time_zone_resolved_once():
+    """Test that the time zone is only looked up once."""
+    source_date = datetime.datetime(year=2020, month=6, day=26, hour=8, tzinfo=datetime.timezone.utc)
+    with mock.patch("ambient_toolbox.utils.date.ZoneInfo", wraps=ZoneInfo) as mocked_zone_info:
+        datetime_format(source_date, "%H:%M")
+        datetime_format(source_date, "%H:%M")
+    assert mocked_zone_info.call_count == 1
+
+
+@override_settings(TIME_ZONE="Invalid/Timezone")
+def test_datetime_format_invalid_time_zone_resolved_once():
+    """Test that an unknown time zone isn't looked up on every call."""
+    source_date = datetime.datetime(year=2020, month=6, day=26, hour=8, tzinfo=datetime.timezone.utc)
+    datetime_format(source_date, "%H:%M")
+    with mock.patch("ambient_toolbox.utils.date.ZoneInfo") as mocked_zone_info:
+        assert datetime_format(source_date, "%H:%M") == "08:00"
+    mocked_zone_info.assert_not_called()
+
+
+def test_datetime_format_time_zone_reset_on_setting_change():
+    """Test that the cached time zone follows changes of the TIME_ZONE setting."""
+    source_date = datetime.datetime(year=2020, month=6, day=26, hour=8, tzinfo=datetime.timezone.utc)
+    with override_settings(TIME_ZONE="Europe/Berlin"):
+        assert datetime_format(source_date, "%H:%M") == "10:00"
+    with override_settings(TIME_ZONE="America/New_York"):
+        assert datetime_format(source_date, "%H:%M") == "04:00"
+
+
+# ==============================================================================
+# DatetimeFormatter
+# ==============================================================================
+
+
+@override_settings(TIME_ZONE="Europe/Berlin")
+def test_datetime_formatter_matches_datetime_format():
+    """Test that the formatter returns the same values as "datetime_format()", including DST transitions."""
+    randomizer = random.Random(44)
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    value_list = [start + datetime.timedelta(seconds=randomizer.randint(0, 5 * 365 * 86400)) for _ in range(2000)]
+    # Every quarter-hour around the DST transitions of 2021
+    for transition in (
+        datetime.datetime(2021, 3, 28, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2021, 10, 31, tzinfo=datetime.timezone.utc),
+    ):
+        value_list += [transition + datetime.timedelta(minutes=15 * quarter) for quarter in range(96)]
+    # Other time zones are converted as well
+    value_list.append(datetime.datetime(2021, 3, 28, 3, tzinfo=ZoneInfo("America/New_York")))
+
+    formatter = DatetimeFormatter("%d.%m.%Y %H:%M:%S %Z %z")
+
+    assert formatter.format_many(value_list) == [
+        datetime_format(value, "%d.%m.%Y %H:%M:%S %Z %z") for value in value_list
+    ]
+
+
+@pytest.mark.parametrize(
+    "str_format",
+    [
+        "%d.%m.%Y %H:%M",
+        "%Y-%m-%dT%H:%M:%S.%f%z",
+        "%a, %d %b %Y %H:%M:%S %Z",
+        "%H:%M {braces} 100%%",
+        "%I:%M %p",
+        "%",
+        "",
+    ],
+)
+@override_settings(TIME_ZONE="Europe/Berlin")
+def test_datetime_formatter_formats(str_format):
+    """Test that split formats and formats falling back to "strftime()" return the same values."""
+    value_list = [
+        datetime.datetime(2021, 3, 28, 0, 59, 59, 123, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2021, 3, 28, 1, 0, 0, 0, tzinfo=datetime.timezone.utc),
+        datetime.datetime(2021, 7, 1, 23, 5, 7, 999_999, tzinfo=datetime.timezone.utc),
+    ]
+
+    assert DatetimeFormatter(str_format).format_many(value_list) == [
+        datetime_format(value, str_format) for value in value_list
+    ]
+
+
+def test_datetime_formatter_compile():
+    """Test that date parts are rendered per day and time directives per value."""
+    assert DatetimeFormatter._compile("%d.%m.%Y %H:%M") == ("{0}{2:02d}{1}{3:02d}", ["%d.%m.%Y ", ":"])
+    assert DatetimeFormatter._compile("%I:%M %p") == (None, [])
+
+
+@override_settings(TIME_ZONE="Europe/Berlin")
+def test_datetime_formatter_date_parts_rendered_once_per_day():
+    """Test that the date parts are only rendered once per local day."""
+    formatter = DatetimeFormatter("%d.%m.%Y %H:%M")
+    formatter.format_many(
+        [
+            datetime.datetime(2021, 7, 1, 8, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2021, 7, 1, 9, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2021, 7, 1, 23, tzinfo=datetime.timezone.utc),
+        ]
+    )
+
+    assert formatter._date_part_table == {
+        datetime.date(2021, 7, 1).toordinal(): ("01.07.2021 ", ":"),
+        datetime.date(2021, 7, 2).toordinal(): ("02.07.2021 ", ":"),
+    }
+
+
+@override_settings(TIME_ZONE="Europe/Berlin")
+def test_datetime_formatter_offset_table():
+    """Test that the offset is stored once per UTC day and not for days with a DST transition."""
+    formatter = DatetimeFormatter("%H:%M")
+    formatter.format_many(
+        [
+            datetime.datetime(2021, 3, 27, 8, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2021, 3, 27, 9, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2021, 3, 28, 8, tzinfo=datetime.timezone.utc),
+        ]
+    )
+
+    assert formatter._offset_table == {
+        datetime.date(2021, 3, 27).toordinal(): datetime.timezone(datetime.timedelta(hours=1), "CET"),
+        datetime.date(2021, 3, 28).toordinal(): None,
+    }
+
+
+@override_settings(TIME_ZONE="Europe/Berlin")
+def test_datetime_formatter_none():
+    """Test that None is replaced."""
+    assert DatetimeFormatter("%H:%M", replacement="n/a").format(None) == "n/a"
+
+
+@override_settings(TIME_ZONE="Europe/Berlin")
+def test_datetime_formatter_naive_datetime():
+    """Test that naive datetimes are converted like in "datetime_format()"."""
+    value = datetime.datetime(2020, 6, 26, 8)
+    assert DatetimeFormatter("%d.%m.%Y %H:%M").format(value) == datetime_format(value, "%d.%m.%Y %H:%M")
+
+
+@override_settings(TIME_ZONE="Invalid/Timezone")
+def test_datetime_formatter_invalid_time_zone():
+    """Test that values aren't converted if the time zone is unknown."""
+    value = datetime.datetime(2020, 6, 26, 8, tzinfo=datetime.timezone.utc)
+    assert DatetimeFormatter("%d.%m.%Y %H:%M").format(value) == "26.06.2020 08:00"
+
+
 # ==============================================================================
 # get_start_and_end_date_from_calendar_week
 # ==============================================================================
@@ -527,6 +680,276 @@ def test_date_month_delta_start_greater_than_end():
         date_month_delta(start_date, end_date)
 
 
+def test_date_month_delta_matches_day_by_day_sum():
+    """Test the closed form against summing up the share of every single day."""
+    randomizer = random.Random(43)
+    for _ in range(200):
+        start_date = datetime.date(2000, 1, 1) + datetime.timedelta(days=randomizer.randint(0, 10_000))
+        end_date = start_date + datetime.timedelta(days=randomizer.randint(0, 800))
+
+        expected_delta = sum(
+            (
+                Fraction(1, calendar.monthrange(day.year, day.month)[1])
+                for day in (
+                    start_date + datetime.timedelta(days=offset) for offset in range((end_date - start_date).days)
+                )
+            ),
+            Fraction(0),
+        )
+
+        assert date_month_delta(start_date, end_date) == float(expected_delta)
+
+
+def test_date_month_delta_leap_february():
+    """Test that February of a leap year has 29 days."""
+    start_date = datetime.date(year=2024, month=2, day=15)
+    end_date = datetime.date(year=2024, month=3, day=16)
+    assert date_month_delta(start_date, end_date) == 15 / 29 + 15 / 31
+
+
+# ==============================================================================
+# ProrationCalculator
+# ==============================================================================
+
+
+def test_proration_calculator_full_month():
+    """Test that a full month returns the whole amount."""
+    calculator = ProrationCalculator()
+    assert calculator.prorate(datetime.date(2024, 2, 1), datetime.date(2024, 3, 1), Decimal("99.99")) == Decimal(
+        "99.99"
+    )
+
+
+def test_proration_calculator_partial_months():
+    """Test prorating a period starting and ending in the middle of a month."""
+    calculator = ProrationCalculator()
+    # January, February and 15/31 of March
+    assert calculator.prorate(datetime.date(2024, 1, 1), datetime.date(2024, 3, 16), "100") == Decimal("248.39")
+    # 15/29 of February and 15/31 of March
+    assert calculator.prorate(datetime.date(2024, 2, 15), datetime.date(2024, 3, 16), "100") == Decimal("100.11")
+
+
+def test_proration_calculator_exact_rounding():
+    """Test that results are rounded only once, like commercial rounding of the exact value."""
+    calculator = ProrationCalculator()
+    # 1/30 of 0.15 is 0.005 which rounds up, although its float representation is slightly below
+    assert calculator.prorate(datetime.date(2024, 4, 1), datetime.date(2024, 4, 2), Decimal("0.15")) == Decimal("0.01")
+
+
+def test_proration_calculator_rounding_mode():
+    """Test that the rounding mode and decimal places can be customised."""
+    calculator = ProrationCalculator(decimal_places=0, rounding=ROUND_HALF_EVEN)
+    assert calculator.prorate(datetime.date(2024, 4, 1), datetime.date(2024, 4, 16), 5) == Decimal(2)
+    assert calculator.prorate(datetime.date(2024, 4, 1), datetime.date(2024, 4, 16), 7) == Decimal(4)
+
+
+def test_proration_calculator_negative_amount():
+    """Test that credits are rounded symmetrically."""
+    calculator = ProrationCalculator()
+    assert calculator.prorate(datetime.date(2024, 4, 1), datetime.date(2024, 4, 2), Decimal("-0.15")) == Decimal(
+        "-0.01"
+    )
+
+
+def test_proration_calculator_empty_period():
+    """Test that an empty period returns zero."""
+    calculator = ProrationCalculator()
+    assert calculator.prorate(datetime.date(2024, 4, 1), datetime.date(2024, 4, 1), Decimal(10)) == Decimal("0.00")
+
+
+def test_proration_calculator_start_greater_than_end():
+    """Test that start date greater than end date raises NotImplementedError."""
+    calculator = ProrationCalculator()
+    with pytest.raises(NotImplementedError):
+        calculator.prorate(datetime.date(2024, 4, 2), datetime.date(2024, 4, 1), Decimal(10))
+
+
+def test_proration_calculator_prorate_many():
+    """Test prorating many intervals at once, reusing the month fraction of equal periods."""
+    calculator = ProrationCalculator()
+    intervals = [
+        (datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), Decimal(10)),
+        (datetime.date(2024, 4, 16), datetime.date(2024, 5, 1), Decimal(30)),
+        (datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), Decimal(20)),
+    ]
+
+    assert calculator.prorate_many(intervals) == [Decimal("10.00"), Decimal("15.00"), Decimal("20.00")]
+    assert len(calculator._fraction_cache) == 2  # noqa: PLR2004
+
+
+def test_proration_calculator_matches_month_delta():
+    """Test that prorating matches the month delta up to rounding."""
+    calculator = ProrationCalculator(decimal_places=6)
+    randomizer = random.Random(43)
+    for _ in range(200):
+        start_date = datetime.date(2000, 1, 1) + datetime.timedelta(days=randomizer.randint(0, 10_000))
+        end_date = start_date + datetime.timedelta(days=randomizer.randint(0, 800))
+
+        assert float(calculator.prorate(start_date, end_date, 1)) == pytest.approx(
+            date_month_delta(start_date, end_date), abs=1e-6
+        )
+
+
+# ==============================================================================
+# Recurrence
+# ==============================================================================
+
+
+def test_recurrence_invalid_frequency():
+    """Test unknown frequencies are rejected."""
+    with pytest.raises(ValueError, match=r"Unknown frequency 'hourly'\."):
+        Recurrence(start_date=datetime.date(2024, 1, 1), frequency="hourly")
+
+
+def test_recurrence_invalid_interval():
+    """Test intervals below one are rejected."""
+    with pytest.raises(ValueError, match=r"at least 1"):
+        Recurrence(start_date=datetime.date(2024, 1, 1), frequency=Recurrence.DAILY, interval=0)
+
+
+def test_recurrence_weekly_occurrences():
+    """Test weekly occurrences with an interval."""
+    recurrence = Recurrence(start_date=datetime.date(2024, 1, 3), frequency=Recurrence.WEEKLY, interval=2)
+    assert list(recurrence.iter_occurrences(window_end=datetime.date(2024, 2, 15))) == [
+        datetime.date(2024, 1, 3),
+        datetime.date(2024, 1, 17),
+        datetime.date(2024, 1, 31),
+        datetime.date(2024, 2, 14),
+    ]
+
+
+def test_recurrence_monthly_clamps_without_drifting():
+    """Test monthly occurrences are clamped to shorter months but keep the original day afterward."""
+    recurrence = Recurrence(start_date=datetime.date(2024, 1, 31), frequency=Recurrence.MONTHLY, count=4)
+    assert list(recurrence.iter_occurrences()) == [
+        datetime.date(2024, 1, 31),
+        datetime.date(2024, 2, 29),
+        datetime.date(2024, 3, 31),
+        datetime.date(2024, 4, 30),
+    ]
+
+
+def test_recurrence_yearly_leap_day():
+    """Test yearly occurrences starting on a leap day."""
+    recurrence = Recurrence(start_date=datetime.date(2024, 2, 29), frequency=Recurrence.YEARLY)
+    assert recurrence.get_occurrences(datetime.date(2025, 1, 1), datetime.date(2029, 1, 1)) == (
+        datetime.date(2025, 2, 28),
+        datetime.date(2026, 2, 28),
+        datetime.date(2027, 2, 28),
+        datetime.date(2028, 2, 29),
+    )
+
+
+def test_recurrence_until_is_inclusive():
+    """Test the rule ends on "until"."""
+    recurrence = Recurrence(
+        start_date=datetime.date(2024, 1, 1), frequency=Recurrence.DAILY, until=datetime.date(2024, 1, 3)
+    )
+    assert list(recurrence.iter_occurrences()) == [
+        datetime.date(2024, 1, 1),
+        datetime.date(2024, 1, 2),
+        datetime.date(2024, 1, 3),
+    ]
+
+
+def test_recurrence_count_applies_to_whole_rule():
+    """Test "count" counts from the start date, not from the window start."""
+    recurrence = Recurrence(start_date=datetime.date(2024, 1, 1), frequency=Recurrence.MONTHLY, count=3)
+    assert recurrence.get_occurrences(datetime.date(2024, 2, 1), datetime.date(2025, 1, 1)) == (
+        datetime.date(2024, 2, 1),
+        datetime.date(2024, 3, 1),
+    )
+
+
+def test_recurrence_window_before_start():
+    """Test a window starting before the rule starts at the first occurrence."""
+    recurrence = Recurrence(start_date=datetime.date(2024, 5, 10), frequency=Recurrence.MONTHLY)
+    assert recurrence.get_occurrences(datetime.date(2020, 1, 1), datetime.date(2024, 7, 1)) == (
+        datetime.date(2024, 5, 10),
+        datetime.date(2024, 6, 10),
+    )
+
+
+def test_recurrence_datetime_start():
+    """Test the time of day is kept and considered for the window start."""
+    recurrence = Recurrence(start_date=datetime.datetime(2024, 1, 15, 9), frequency=Recurrence.MONTHLY)
+    assert recurrence.get_occurrences(datetime.datetime(2024, 2, 15, 10), datetime.datetime(2024, 4, 1)) == (
+        datetime.datetime(2024, 3, 15, 9),
+    )
+
+
+def test_recurrence_infinite_generator_is_lazy():
+    """Test occurrences are only created when they are consumed."""
+    recurrence = Recurrence(start_date=datetime.date(2024, 1, 1), frequency=Recurrence.DAILY)
+    occurrences = recurrence.iter_occurrences(window_start=datetime.date(3024, 1, 1))
+    assert next(occurrences) == datetime.date(3024, 1, 1)
+
+
+@pytest.mark.parametrize(
+    ("frequency", "step"),
+    [
+        (Recurrence.DAILY, add_days),
+        (Recurrence.WEEKLY, lambda date, n: add_days(date, 7 * n)),
+        (Recurrence.MONTHLY, add_months),
+        (Recurrence.YEARLY, lambda date, n: add_months(date, 12 * n)),
+    ],
+)
+def test_recurrence_matches_manual_loop(frequency, step):
+    """Test windows match a hand-written loop over "add_days()" and "add_months()"."""
+    randomizer = random.Random(47)
+    for _ in range(100):
+        start_date = datetime.date(2020, 1, 1) + datetime.timedelta(days=randomizer.randint(0, 1500))
+        window_start = datetime.date(2019, 1, 1) + datetime.timedelta(days=randomizer.randint(0, 3000))
+        window_end = window_start + datetime.timedelta(days=randomizer.randint(0, 800))
+        interval = randomizer.randint(1, 4)
+        recurrence = Recurrence(start_date=start_date, frequency=frequency, interval=interval)
+
+        expected_list = []
+        n = 0
+        while (occurrence := step(start_date, n * interval)) < window_end:
+            if occurrence >= window_start:
+                expected_list.append(occurrence)
+            n += 1
+
+        assert list(recurrence.iter_occurrences(window_start, window_end)) == expected_list
+
+
+def test_recurrence_get_occurrences_is_cached():
+    """Test equal rules share their expanded windows."""
+    window = (datetime.date(2024, 1, 1), datetime.date(2025, 1, 1))
+    recurrence = Recurrence(start_date=datetime.date(2023, 6, 1), frequency=Recurrence.WEEKLY)
+
+    occurrences = recurrence.get_occurrences(*window)
+
+    assert (
+        Recurrence(start_date=datetime.date(2023, 6, 1), frequency=Recurrence.WEEKLY).get_occurrences(*window)
+        is occurrences
+    )
+
+
+def test_recurrence_next_occurrence():
+    """Test the next occurrence is strictly after the given date."""
+    recurrence = Recurrence(start_date=datetime.date(2024, 1, 31), frequency=Recurrence.MONTHLY, count=3)
+    assert recurrence.next_occurrence(datetime.date(2023, 1, 1)) == datetime.date(2024, 1, 31)
+    assert recurrence.next_occurrence(datetime.date(2024, 1, 31)) == datetime.date(2024, 2, 29)
+    assert recurrence.next_occurrence(datetime.date(2024, 3, 1)) == datetime.date(2024, 3, 31)
+    assert recurrence.next_occurrence(datetime.date(2024, 3, 31)) is None
+
+
+def test_merge_occurrences():
+    """Test occurrences of many rules are merged chronologically with the position of their rule."""
+    recurrences = [
+        Recurrence(start_date=datetime.date(2024, 1, 10), frequency=Recurrence.MONTHLY),
+        Recurrence(start_date=datetime.date(2024, 1, 1), frequency=Recurrence.WEEKLY, interval=2),
+    ]
+    assert list(merge_occurrences(recurrences, datetime.date(2024, 1, 1), datetime.date(2024, 2, 1))) == [
+        (datetime.date(2024, 1, 1), 1),
+        (datetime.date(2024, 1, 10), 0),
+        (datetime.date(2024, 1, 15), 1),
+        (datetime.date(2024, 1, 29), 1),
+    ]
+
+
 # ==============================================================================
 # get_first_and_last_of_month
 # ==============================================================================
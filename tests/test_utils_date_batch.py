@@ -0,0 +1,145 @@
+import calendar
+import datetime
+import random
+
+import pytest
+
+from ambient_toolbox.utils import date as scalar_date
+from ambient_toolbox.utils import date_batch
+
+# Fixed seed, so a failing comparison can be reproduced
+RANDOM = random.Random(20261019)
+MIN_ORDINAL = datetime.date(1900, 1, 1).toordinal()
+MAX_ORDINAL = datetime.date(2100, 12, 31).toordinal()
+
+
+def get_random_dates(count: int = 2000) -> list[datetime.date]:
+    date_list = [datetime.date.fromordinal(RANDOM.randint(MIN_ORDINAL, MAX_ORDINAL)) for _ in range(count)]
+    # Month ends and leap days are where clamping goes wrong
+    date_list += [
+        datetime.date(year, month, calendar.monthrange(year, month)[1])
+        for year in (1900, 2000, 2023, 2024)
+        for month in range(1, 13)
+    ]
+    return date_list
+
+
+# ==============================================================================
+# add_months
+# ==============================================================================
+
+
+def test_add_months_matches_scalar():
+    date_list = get_random_dates()
+    month_list = [RANDOM.randint(-48, 48) for _ in date_list]
+
+    assert date_batch.add_months(date_list, month_list) == [
+        scalar_date.add_months(source_date, months) for source_date, months in zip(date_list, month_list)
+    ]
+
+
+def test_add_months_single_value():
+    date_list = get_random_dates()
+
+    assert date_batch.add_months(date_list, 1) == [scalar_date.add_months(source_date, 1) for source_date in date_list]
+
+
+def test_add_months_clamps_month_end():
+    assert date_batch.add_months([datetime.date(2024, 1, 31), datetime.date(2024, 3, 31)], -1) == [
+        datetime.date(2023, 12, 31),
+        datetime.date(2024, 2, 29),
+    ]
+
+
+def test_add_months_keeps_time():
+    assert date_batch.add_months([datetime.datetime(2024, 1, 31, 8, 30)], 1) == [datetime.datetime(2024, 2, 29, 8, 30)]
+
+
+def test_add_months_length_mismatch():
+    with pytest.raises(ValueError, match=r"Expected 2 values, got 1\."):
+        date_batch.add_months([datetime.date(2024, 1, 1), datetime.date(2024, 2, 1)], [1])
+
+
+def test_add_months_empty():
+    assert date_batch.add_months([], 1) == []
+
+
+# ==============================================================================
+# date_month_delta
+# ==============================================================================
+
+
+def test_date_month_delta_matches_scalar():
+    start_date_list = get_random_dates()
+    end_date_list = [start_date + datetime.timedelta(days=RANDOM.randint(0, 3000)) for start_date in start_date_list]
+
+    assert date_batch.date_month_delta(start_date_list, end_date_list) == [
+        scalar_date.date_month_delta(start_date, end_date)
+        for start_date, end_date in zip(start_date_list, end_date_list)
+    ]
+
+
+def test_date_month_delta_exact_values():
+    assert date_batch.date_month_delta(
+        [datetime.date(2017, 2, 1), datetime.date(2017, 4, 15), datetime.date(2017, 4, 15), datetime.date(2017, 1, 1)],
+        [datetime.date(2017, 3, 1), datetime.date(2017, 4, 16), datetime.date(2017, 4, 15), datetime.date(2019, 7, 1)],
+    ) == [1, 1 / 30, 0, 30]
+
+
+def test_date_month_delta_start_greater_than_end():
+    with pytest.raises(NotImplementedError):
+        date_batch.date_month_delta([datetime.date(2017, 4, 15)], [datetime.date(2017, 4, 14)])
+
+
+def test_date_month_delta_length_mismatch():
+    with pytest.raises(ValueError, match=r"Expected 1 values, got 0\."):
+        date_batch.date_month_delta([datetime.date(2017, 4, 15)], [])
+
+
+# ==============================================================================
+# get_first_and_last_of_month
+# ==============================================================================
+
+
+def test_get_first_and_last_of_month_matches_scalar():
+    date_list = get_random_dates()
+
+    assert date_batch.get_first_and_last_of_month(date_list) == [
+        scalar_date.get_first_and_last_of_month(date_object) for date_object in date_list
+    ]
+
+
+# ==============================================================================
+# next_weekday
+# ==============================================================================
+
+
+@pytest.mark.parametrize("weekday", range(7))
+def test_next_weekday_matches_scalar(weekday):
+    date_list = get_random_dates(count=500)
+
+    assert date_batch.next_weekday(date_list, weekday) == [
+        scalar_date.next_weekday(given_date, weekday) for given_date in date_list
+    ]
+
+
+# ==============================================================================
+# check_date_is_weekend
+# ==============================================================================
+
+
+def test_check_date_is_weekend_matches_scalar():
+    date_list = get_random_dates(count=500)
+
+    assert date_batch.check_date_is_weekend(date_list) == [
+        scalar_date.check_date_is_weekend(compare_date) for compare_date in date_list
+    ]
+
+
+def test_check_date_is_weekend_custom_weekend_days():
+    date_list = get_random_dates(count=500)
+    weekend_days = (calendar.FRIDAY, calendar.SATURDAY)
+
+    assert date_batch.check_date_is_weekend(date_list, weekend_days=iter(weekend_days)) == [
+        scalar_date.check_date_is_weekend(compare_date, weekend_days=weekend_days) for compare_date in date_list
+    ]
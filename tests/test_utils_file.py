@@ -1,6 +1,20 @@
+import builtins
+import hashlib
+import json
+import os
+import zlib
+
 import pytest
 
-from ambient_toolbox.utils.file import crc, get_filename_without_ending, md5_checksum
+from ambient_toolbox.utils import file as file_module
+from ambient_toolbox.utils.file import (
+    CHECKSUM_CHUNK_SIZE,
+    checksum_tree,
+    crc,
+    file_checksums,
+    get_filename_without_ending,
+    md5_checksum,
+)
 
 
 def test_get_filename_without_ending_full_path():
@@ -50,3 +64,213 @@ def test_crc_and_md5(gen_test_file, content, crc_result, md5_result):
     assert result == crc_result
     result = md5_checksum(test_file)
     assert result == md5_result
+
+
+def test_file_checksums_single_pass(gen_test_file, mocker):
+    """Calculates all checksums with a single read of the file and matches the single checksum functions"""
+    test_file = str(gen_test_file("The quick brown fox jumps over the lazy dog"))
+    open_spy = mocker.spy(builtins, "open")
+
+    result = file_checksums(test_file)
+
+    assert open_spy.call_count == 1
+    assert result == {
+        "crc32": "414FA339",
+        "md5": "9e107d9d372bb6826bd81d3542a419d6",
+        "sha256": "d7a8fbb307d7809469ca9abcb0082e4f8d5651e46d3cdb762d02d0bf37c9e592",
+    }
+    assert result["crc32"] == crc(test_file)
+    assert result["md5"] == md5_checksum(test_file)
+
+
+def test_file_checksums_selected_algorithms(gen_test_file):
+    test_file = str(gen_test_file(""))
+    assert file_checksums(test_file, algorithms=["sha1", "crc32"]) == {
+        "sha1": "da39a3ee5e6b4b0d3255bfef95601890afd80709",
+        "crc32": "00000000",
+    }
+
+
+def test_file_checksums_unknown_algorithm(gen_test_file):
+    test_file = str(gen_test_file(""))
+    with pytest.raises(ValueError, match=r"Unsupported checksum algorithms: crc64\."):
+        file_checksums(test_file, algorithms=["md5", "crc64"])
+
+
+def test_file_checksums_binary_file_larger_than_chunk(tmp_path):
+    """Binary content without newlines spanning several chunks gives the same checksums as hashing it at once"""
+    content = bytes(range(256)) * (CHECKSUM_CHUNK_SIZE // 256 * 2 + 3)
+    test_file = tmp_path / "test_file.bin"
+    test_file.write_bytes(content)
+
+    assert file_checksums(str(test_file), algorithms=["crc32", "md5", "sha256"]) == {
+        "crc32": "%08X" % zlib.crc32(content),
+        "md5": hashlib.md5(content).hexdigest(),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+@pytest.fixture
+def file_tree(tmp_path):
+    root = tmp_path / "media"
+    (root / "images").mkdir(parents=True)
+    (root / "a.txt").write_text("The quick brown fox jumps over the lazy dog")
+    (root / "images" / "b.bin").write_bytes(b"")
+    return root
+
+
+def test_checksum_tree(file_tree):
+    result = checksum_tree(str(file_tree), algorithms=["crc32", "md5"], workers=2)
+
+    assert result.checksums == {
+        "a.txt": {"crc32": "414FA339", "md5": "9e107d9d372bb6826bd81d3542a419d6"},
+        os.path.join("images", "b.bin"): {"crc32": "00000000", "md5": "d41d8cd98f00b204e9800998ecf8427e"},
+    }
+    assert result.hashed_files == 2  # noqa: PLR2004
+    assert result.cached_files == 0
+    assert result.hashed_bytes == 43  # noqa: PLR2004
+    assert result.duration > 0
+
+
+def test_checksum_tree_skips_unchanged_files(file_tree, tmp_path, mocker):
+    cache_path = str(tmp_path / "checksums.json")
+    first_result = checksum_tree(str(file_tree), cache_path=cache_path)
+    file_checksums_spy = mocker.spy(file_module, "file_checksums")
+
+    result = checksum_tree(str(file_tree), cache_path=cache_path)
+
+    assert file_checksums_spy.call_count == 0
+    assert result.checksums == first_result.checksums
+    assert (result.hashed_files, result.cached_files, result.hashed_bytes) == (0, 2, 0)
+    assert result.bytes_per_second == 0.0
+
+
+def test_checksum_tree_hashes_changed_files_again(file_tree, tmp_path):
+    cache_path = str(tmp_path / "checksums.json")
+    checksum_tree(str(file_tree), cache_path=cache_path)
+    changed_file = file_tree / "a.txt"
+    changed_file.write_text("")
+    # Make sure the modification time differs even on file systems with a coarse resolution
+    os.utime(changed_file, ns=(0, os.stat(changed_file).st_mtime_ns + 1))
+    (file_tree / "images" / "b.bin").unlink()
+
+    result = checksum_tree(str(file_tree), cache_path=cache_path)
+
+    assert result.checksums == {"a.txt": {"md5": "d41d8cd98f00b204e9800998ecf8427e"}}
+    assert (result.hashed_files, result.cached_files) == (1, 0)
+    with open(cache_path, encoding="utf-8") as f:
+        assert list(json.load(f)) == [str(changed_file)]
+
+
+def test_checksum_tree_keeps_other_algorithms_in_cache(file_tree, tmp_path):
+    cache_path = str(tmp_path / "checksums.json")
+    checksum_tree(str(file_tree), algorithms=["md5"], cache_path=cache_path)
+
+    result = checksum_tree(str(file_tree), algorithms=["sha256"], cache_path=cache_path)
+    assert result.hashed_files == 2  # noqa: PLR2004
+
+    result = checksum_tree(str(file_tree), algorithms=["md5", "sha256"], cache_path=cache_path)
+    assert result.cached_files == 2  # noqa: PLR2004
+
+
+def test_checksum_tree_keeps_entries_of_other_trees(file_tree, tmp_path):
+    cache_path = str(tmp_path / "checksums.json")
+    other_tree = tmp_path / "other"
+    other_tree.mkdir()
+    (other_tree / "c.txt").write_text("c")
+    checksum_tree(str(other_tree), cache_path=cache_path)
+
+    checksum_tree(str(file_tree), cache_path=cache_path)
+
+    with open(cache_path, encoding="utf-8") as f:
+        assert str(other_tree / "c.txt") in json.load(f)
+
+
+def test_checksum_tree_ignores_cache_file_in_tree(file_tree):
+    cache_path = str(file_tree / "checksums.json")
+    checksum_tree(str(file_tree), cache_path=cache_path)
+
+    result = checksum_tree(str(file_tree), cache_path=cache_path)
+
+    assert "checksums.json" not in result.checksums
+    assert result.cached_files == 2  # noqa: PLR2004
+
+
+def test_checksum_tree_broken_cache(file_tree, tmp_path, caplog):
+    cache_file = tmp_path / "checksums.json"
+    cache_file.write_text("{broken")
+
+    result = checksum_tree(str(file_tree), cache_path=str(cache_file))
+
+    assert result.hashed_files == 2  # noqa: PLR2004
+    assert "can't be read" in caplog.text
+    with open(cache_file, encoding="utf-8") as f:
+        assert len(json.load(f)) == 2  # noqa: PLR2004
+
+
+def test_checksum_tree_skips_broken_symlink(file_tree, caplog):
+    (file_tree / "broken").symlink_to(file_tree / "missing")
+
+    result = checksum_tree(str(file_tree))
+
+    assert list(result.checksums) == ["a.txt", os.path.join("images", "b.bin")]
+    assert list(result.failed_files) == ["broken"]
+    assert "No such file or directory" in result.failed_files["broken"]
+    assert "can't be calculated" in caplog.text
+
+
+def test_checksum_tree_skips_unreadable_file(file_tree, tmp_path, mocker):
+    cache_path = str(tmp_path / "checksums.json")
+    original_file_checksums = file_module.file_checksums
+
+    def fail_for_a(file_path, **kwargs):
+        if file_path.endswith("a.txt"):
+            raise PermissionError("Permission denied")
+        return original_file_checksums(file_path, **kwargs)
+
+    mocker.patch.object(file_module, "file_checksums", side_effect=fail_for_a)
+
+    result = checksum_tree(str(file_tree), cache_path=cache_path)
+
+    assert list(result.checksums) == [os.path.join("images", "b.bin")]
+    assert result.failed_files == {"a.txt": "Permission denied"}
+    assert result.hashed_files == 1
+    with open(cache_path, encoding="utf-8") as f:
+        assert list(json.load(f)) == [str(file_tree / "images" / "b.bin")]
+
+
+def test_checksum_tree_saves_cache_periodically(file_tree, tmp_path, mocker):
+    cache_path = str(tmp_path / "checksums.json")
+    mocker.patch.object(file_module, "CHECKSUM_CACHE_SAVE_INTERVAL", 0)
+    save_spy = mocker.spy(file_module, "_save_checksum_cache")
+
+    checksum_tree(str(file_tree), cache_path=cache_path, workers=1)
+
+    # Once per hashed file and once at the end
+    assert save_spy.call_count == 3  # noqa: PLR2004
+
+
+def test_checksum_tree_reports_unreadable_directory(file_tree, mocker):
+    original_walk = os.walk
+
+    def walk_with_error(top, onerror=None, **kwargs):
+        onerror(PermissionError(13, "Permission denied", str(file_tree / "secret")))
+        return original_walk(top, onerror=onerror, **kwargs)
+
+    mocker.patch.object(file_module.os, "walk", side_effect=walk_with_error)
+
+    result = checksum_tree(str(file_tree))
+
+    assert list(result.failed_files) == ["secret"]
+    assert "Permission denied" in result.failed_files["secret"]
+    assert result.hashed_files == 2  # noqa: PLR2004
+
+
+def test_checksum_tree_missing_root(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        checksum_tree(str(tmp_path / "missing"))
+
+
+def test_checksum_tree_root_is_file(file_tree):
+    with pytest.raises(NotADirectoryError):
+        checksum_tree(str(file_tree / "a.txt"))
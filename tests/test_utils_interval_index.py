@@ -0,0 +1,167 @@
+import datetime
+import itertools
+import random
+
+import pytest
+
+from ambient_toolbox.utils.date import get_first_and_last_of_month
+from ambient_toolbox.utils.interval_index import IntervalIndex
+
+
+def get_random_intervals(randomizer: random.Random, count: int) -> list[tuple[datetime.date, datetime.date]]:
+    interval_list = []
+    for _ in range(count):
+        start_date = datetime.date(2024, 1, 1) + datetime.timedelta(days=randomizer.randint(0, 730))
+        interval_list.append((start_date, start_date + datetime.timedelta(days=randomizer.randint(0, 90))))
+    return interval_list
+
+
+def get_random_period(randomizer: random.Random) -> tuple[datetime.date, datetime.date]:
+    start_date = datetime.date(2023, 10, 1) + datetime.timedelta(days=randomizer.randint(0, 900))
+    return start_date, start_date + datetime.timedelta(days=randomizer.randint(0, 60))
+
+
+def test_invalid_range():
+    with pytest.raises(ValueError, match=r"Range at position 1 ends before it starts\."):
+        IntervalIndex(
+            [
+                (datetime.date(2024, 1, 1), datetime.date(2024, 1, 1)),
+                (datetime.date(2024, 1, 2), datetime.date(2024, 1, 1)),
+            ]
+        )
+
+
+def test_empty_index():
+    interval_index = IntervalIndex([])
+
+    assert len(interval_index) == 0
+    assert interval_index.get_overlapping(datetime.date(2024, 1, 1), datetime.date(2024, 12, 31)) == []
+    assert interval_index.get_containing(datetime.date(2024, 1, 1)) == []
+    assert interval_index.get_gaps(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)) == [
+        (datetime.date(2024, 1, 1), datetime.date(2024, 1, 31))
+    ]
+
+
+def test_get_overlapping():
+    interval_index = IntervalIndex(
+        [
+            (datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)),
+            (datetime.date(2024, 2, 1), datetime.date(2024, 2, 29)),
+            (datetime.date(2024, 1, 15), datetime.date(2024, 3, 15)),
+        ]
+    )
+
+    # Both borders are included
+    assert sorted(interval_index.get_overlapping(datetime.date(2024, 1, 31), datetime.date(2024, 1, 31))) == [0, 2]
+    assert sorted(interval_index.get_overlapping(datetime.date(2024, 2, 20), datetime.date(2024, 4, 1))) == [1, 2]
+    assert interval_index.get_overlapping(datetime.date(2024, 3, 16), datetime.date(2024, 4, 1)) == []
+    assert interval_index.get_overlapping(datetime.date(2024, 2, 1), datetime.date(2024, 1, 1)) == []
+
+
+def test_get_containing_and_within():
+    interval_index = IntervalIndex(
+        [
+            (datetime.date(2024, 1, 1), datetime.date(2024, 12, 31)),
+            (datetime.date(2024, 3, 1), datetime.date(2024, 3, 31)),
+        ]
+    )
+
+    assert sorted(interval_index.get_containing(datetime.date(2024, 3, 5))) == [0, 1]
+    assert interval_index.get_containing(datetime.date(2024, 3, 5), datetime.date(2024, 4, 5)) == [0]
+    assert interval_index.get_within(datetime.date(2024, 2, 1), datetime.date(2024, 3, 31)) == [1]
+
+
+def test_queries_match_brute_force():
+    randomizer = random.Random(48)
+    interval_list = get_random_intervals(randomizer, count=300)
+    interval_index = IntervalIndex(interval_list)
+
+    for _ in range(300):
+        start_date, end_date = get_random_period(randomizer)
+        positions = range(len(interval_list))
+
+        assert sorted(interval_index.get_overlapping(start_date, end_date)) == [
+            position
+            for position in positions
+            if interval_list[position][0] <= end_date and interval_list[position][1] >= start_date
+        ]
+        assert sorted(interval_index.get_containing(start_date, end_date)) == [
+            position
+            for position in positions
+            if interval_list[position][0] <= start_date and interval_list[position][1] >= end_date
+        ]
+        assert sorted(interval_index.get_within(start_date, end_date)) == [
+            position
+            for position in positions
+            if interval_list[position][0] >= start_date and interval_list[position][1] <= end_date
+        ]
+
+
+def test_get_gaps():
+    interval_index = IntervalIndex(
+        [
+            (datetime.date(2024, 1, 5), datetime.date(2024, 1, 10)),
+            # Adjacent and overlapping ranges are merged
+            (datetime.date(2024, 1, 11), datetime.date(2024, 1, 12)),
+            (datetime.date(2024, 1, 8), datetime.date(2024, 1, 9)),
+            (datetime.date(2024, 1, 20), datetime.date(2024, 2, 10)),
+        ]
+    )
+
+    assert interval_index.get_gaps(datetime.date(2024, 1, 1), datetime.date(2024, 1, 31)) == [
+        (datetime.date(2024, 1, 1), datetime.date(2024, 1, 4)),
+        (datetime.date(2024, 1, 13), datetime.date(2024, 1, 19)),
+    ]
+    assert interval_index.get_gaps(datetime.date(2024, 1, 6), datetime.date(2024, 1, 12)) == []
+    assert interval_index.get_gaps(datetime.date(2024, 2, 5), datetime.date(2024, 2, 15)) == [
+        (datetime.date(2024, 2, 11), datetime.date(2024, 2, 15))
+    ]
+
+
+def test_get_gaps_match_brute_force():
+    randomizer = random.Random(480)
+    interval_list = get_random_intervals(randomizer, count=20)
+    interval_index = IntervalIndex(interval_list)
+
+    for _ in range(200):
+        start_date, end_date = get_random_period(randomizer)
+        uncovered_days = {
+            start_date + datetime.timedelta(days=offset)
+            for offset in range((end_date - start_date).days + 1)
+            if not any(
+                interval_start <= start_date + datetime.timedelta(days=offset) <= interval_end
+                for interval_start, interval_end in interval_list
+            )
+        }
+
+        gaps = interval_index.get_gaps(start_date, end_date)
+
+        assert {
+            gap_start + datetime.timedelta(days=offset)
+            for gap_start, gap_end in gaps
+            for offset in range((gap_end - gap_start).days + 1)
+        } == uncovered_days
+        # Gaps are sorted and never adjacent
+        for (_, gap_end), (next_gap_start, _) in itertools.pairwise(gaps):
+            assert next_gap_start > gap_end + datetime.timedelta(days=1)
+
+
+def test_get_months_with_gaps():
+    interval_index = IntervalIndex(
+        [
+            (datetime.date(2024, 1, 1), datetime.date(2024, 2, 29)),
+            (datetime.date(2024, 3, 1), datetime.date(2024, 3, 30)),
+            (datetime.date(2024, 5, 1), datetime.date(2024, 5, 31)),
+            (datetime.date(2024, 7, 2), datetime.date(2024, 7, 10)),
+            (datetime.date(2024, 7, 12), datetime.date(2024, 7, 31)),
+        ]
+    )
+
+    assert interval_index.get_months_with_gaps(datetime.date(2023, 12, 15), datetime.date(2024, 8, 1)) == [
+        get_first_and_last_of_month(datetime.date(2023, 12, 1)),
+        get_first_and_last_of_month(datetime.date(2024, 3, 1)),
+        get_first_and_last_of_month(datetime.date(2024, 4, 1)),
+        get_first_and_last_of_month(datetime.date(2024, 6, 1)),
+        get_first_and_last_of_month(datetime.date(2024, 7, 1)),
+        get_first_and_last_of_month(datetime.date(2024, 8, 1)),
+    ]
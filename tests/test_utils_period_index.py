@@ -0,0 +1,211 @@
+import datetime
+import random
+
+import pytest
+from django.test import TestCase, override_settings
+
+from ambient_toolbox.utils.date import (
+    get_first_and_last_of_month,
+    get_previous_quarter_starting_date_for_date,
+    get_start_and_end_date_from_calendar_week,
+)
+from ambient_toolbox.utils.period_index import PeriodIndex
+from testapp.models import ModelNameTimeBasedFieldTest
+
+
+def get_random_dates(count: int) -> list[datetime.date]:
+    randomizer = random.Random(46)
+    start_ordinal = datetime.date(2019, 6, 1).toordinal()
+    return [datetime.date.fromordinal(start_ordinal + randomizer.randint(0, 4 * 365)) for _ in range(count)]
+
+
+def test_unknown_period_type():
+    with pytest.raises(AssertionError, match=r"Unknown period type 'day'\."):
+        PeriodIndex(start_year=2020, end_year=2021, period_type="day")
+
+
+def test_start_year_after_end_year():
+    with pytest.raises(AssertionError):
+        PeriodIndex(start_year=2021, end_year=2020)
+
+
+def test_month_boundaries():
+    period_index = PeriodIndex(start_year=2020, end_year=2021, period_type=PeriodIndex.MONTH)
+
+    assert len(period_index.periods) == 24  # noqa: PLR2004
+    period = period_index.get_period(1)
+    assert (period.year, period.number) == (2020, 2)
+    assert (period.start_date, period.end_date) == get_first_and_last_of_month(datetime.date(2020, 2, 10))
+
+
+def test_quarter_boundaries():
+    period_index = PeriodIndex(start_year=2020, end_year=2020, period_type=PeriodIndex.QUARTER)
+
+    assert [(period.start_date, period.end_date) for period in period_index.periods] == [
+        (datetime.date(2020, 1, 1), datetime.date(2020, 3, 31)),
+        (datetime.date(2020, 4, 1), datetime.date(2020, 6, 30)),
+        (datetime.date(2020, 7, 1), datetime.date(2020, 9, 30)),
+        (datetime.date(2020, 10, 1), datetime.date(2020, 12, 31)),
+    ]
+
+
+def test_week_boundaries():
+    period_index = PeriodIndex(start_year=2020, end_year=2021, period_type=PeriodIndex.WEEK)
+
+    # 2020 has 53 calendar weeks
+    assert len(period_index.periods) == 53 + 52
+    for period in period_index.periods:
+        assert (period.start_date, period.end_date) == get_start_and_end_date_from_calendar_week(
+            period.year, period.number
+        )
+    assert period_index.first_date == datetime.date(2019, 12, 30)
+    assert period_index.last_date == datetime.date(2022, 1, 2)
+
+
+@pytest.mark.parametrize("period_type", [PeriodIndex.WEEK, PeriodIndex.MONTH, PeriodIndex.QUARTER])
+def test_periods_are_contiguous(period_type):
+    period_index = PeriodIndex(start_year=2019, end_year=2023, period_type=period_type)
+
+    for period, next_period in zip(period_index.periods, period_index.periods[1:]):
+        assert next_period.period_id == period.period_id + 1
+        assert next_period.start_date == period.end_date + datetime.timedelta(days=1)
+
+
+def test_get_period_id():
+    period_index = PeriodIndex(start_year=2020, end_year=2021, period_type=PeriodIndex.QUARTER)
+
+    assert period_index.get_period_id(datetime.date(2020, 1, 1)) == 0
+    assert period_index.get_period_id(datetime.date(2020, 4, 1)) == 1
+    assert period_index.get_period_id(datetime.date(2021, 12, 31)) == 7  # noqa: PLR2004
+    assert period_index.get_period_id(datetime.datetime(2021, 12, 31, 23, 59)) == 7  # noqa: PLR2004
+    assert period_index.get_period_id(datetime.date(2019, 12, 31)) is None
+    assert period_index.get_period_id(datetime.date(2022, 1, 1)) is None
+
+
+def test_get_period_ids_matches_date_helpers():
+    date_list = get_random_dates(count=500)
+    week_index = PeriodIndex(start_year=2019, end_year=2023, period_type=PeriodIndex.WEEK)
+    month_index = PeriodIndex(start_year=2019, end_year=2023, period_type=PeriodIndex.MONTH)
+    quarter_index = PeriodIndex(start_year=2019, end_year=2023, period_type=PeriodIndex.QUARTER)
+
+    for date, week_id, month_id, quarter_id in zip(
+        date_list,
+        week_index.get_period_ids(date_list),
+        month_index.get_period_ids(date_list),
+        quarter_index.get_period_ids(date_list),
+    ):
+        week = week_index.get_period(week_id)
+        assert (week.year, week.number) == date.isocalendar()[:2]
+        assert month_index.get_period(month_id).start_date == get_first_and_last_of_month(date)[0]
+        # The quarter after the previous one is the current quarter
+        previous_quarter_start = get_previous_quarter_starting_date_for_date(date=date)
+        assert quarter_index.get_period(quarter_id - 1).start_date == previous_quarter_start
+
+
+def test_get_period_ids_outside_index():
+    period_index = PeriodIndex(start_year=2020, end_year=2020)
+
+    assert period_index.get_period_ids([datetime.date(2019, 12, 31), datetime.date(2020, 3, 1)]) == [None, 2]
+
+
+def test_count_per_period():
+    period_index = PeriodIndex(start_year=2020, end_year=2020, period_type=PeriodIndex.QUARTER)
+
+    counts = period_index.count_per_period(
+        [datetime.date(2020, 1, 5), datetime.date(2020, 2, 5), datetime.date(2020, 12, 5), datetime.date(2021, 1, 5)]
+    )
+
+    assert counts == [2, 0, 0, 1]
+
+
+def test_get_period_id_for_start_date():
+    period_index = PeriodIndex(start_year=2020, end_year=2020)
+
+    assert period_index.get_period_id_for_start_date(datetime.date(2020, 5, 1)) == 4  # noqa: PLR2004
+    assert period_index.get_period_id_for_start_date(datetime.date(2020, 5, 2)) is None
+
+
+@override_settings(USE_TZ=True)
+class PeriodIndexQuerySetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        for date in (
+            datetime.date(2019, 12, 31),
+            datetime.date(2020, 1, 1),
+            datetime.date(2020, 3, 31),
+            datetime.date(2020, 4, 1),
+            datetime.date(2020, 11, 15),
+            datetime.date(2021, 1, 1),
+        ):
+            timestamp = datetime.datetime.combine(date, datetime.time(12), tzinfo=datetime.timezone.utc)
+            ModelNameTimeBasedFieldTest.objects.create(
+                wrongly_named_date_field=date,
+                wrongly_named_datetime_field=timestamp,
+                timestamp_date=date,
+                timestamped_at=timestamp,
+            )
+
+    def test_case_expression(self):
+        period_index = PeriodIndex(start_year=2020, end_year=2020, period_type=PeriodIndex.QUARTER)
+
+        period_ids = list(
+            ModelNameTimeBasedFieldTest.objects.annotate(period_id=period_index.get_case_expression("timestamp_date"))
+            .order_by("timestamp_date")
+            .values_list("period_id", flat=True)
+        )
+
+        self.assertEqual(period_ids, [None, 0, 0, 1, 3, None])
+
+    def test_case_expression_datetime_field(self):
+        period_index = PeriodIndex(start_year=2020, end_year=2020, period_type=PeriodIndex.QUARTER)
+
+        period_ids = list(
+            ModelNameTimeBasedFieldTest.objects.annotate(
+                period_id=period_index.get_case_expression("timestamped_at__date")
+            )
+            .order_by("timestamped_at")
+            .values_list("period_id", flat=True)
+        )
+
+        self.assertEqual(period_ids, [None, 0, 0, 1, 3, None])
+
+    def test_trunc_expression(self):
+        period_index = PeriodIndex(start_year=2020, end_year=2020, period_type=PeriodIndex.MONTH)
+
+        start_dates = list(
+            ModelNameTimeBasedFieldTest.objects.annotate(
+                period_start_date=period_index.get_trunc_expression("timestamped_at")
+            )
+            .order_by("timestamped_at")
+            .values_list("period_start_date", flat=True)
+        )
+
+        self.assertEqual(start_dates[1], datetime.date(2020, 1, 1))
+        self.assertEqual(
+            [period_index.get_period_id_for_start_date(start_date) for start_date in start_dates],
+            [None, 0, 2, 3, 10, None],
+        )
+
+    def test_count_queryset(self):
+        period_index = PeriodIndex(start_year=2020, end_year=2020, period_type=PeriodIndex.QUARTER)
+
+        with self.assertNumQueries(1):
+            counts = period_index.count_queryset(ModelNameTimeBasedFieldTest.objects.all(), "timestamp_date")
+
+        self.assertEqual(counts, [2, 1, 0, 1])
+
+    def test_count_queryset_weeks_datetime_field(self):
+        period_index = PeriodIndex(start_year=2020, end_year=2020, period_type=PeriodIndex.WEEK)
+
+        counts = period_index.count_queryset(ModelNameTimeBasedFieldTest.objects.all(), "timestamped_at")
+
+        # 31.12.2019 and 1.1.2020 are both in the first calendar week of 2020, 1.1.2021 is in week 53 of 2020
+        self.assertEqual(counts[0], 2)
+        self.assertEqual(counts[-1], 1)
+        self.assertEqual(sum(counts), 6)
+        self.assertEqual(
+            counts,
+            period_index.count_per_period(ModelNameTimeBasedFieldTest.objects.values_list("timestamp_date", flat=True)),
+        )
@@ -1,10 +1,13 @@
 from unittest import mock
 
-from django.contrib.auth.models import AnonymousUser, Permission, User
+from django.contrib.auth.models import AnonymousUser, Group, Permission, User
+from django.core.exceptions import PermissionDenied
 from django.http import HttpResponse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.views import generic
 
+from ambient_toolbox.static_role_permissions.auth_backend import StaticRoleAndGroupPermissionBackend
+from ambient_toolbox.static_role_permissions.index import reset_static_role_permission_index
 from ambient_toolbox.tests.mixins import RequestProviderMixin
 from ambient_toolbox.view_layer.mixins import DjangoPermissionRequiredMixin
 
@@ -63,6 +66,13 @@ class MetaDjangoPermissionRequiredMixinTest(RequestProviderMixin, TestCase):
 
         self.assertFalse(self.TestViewMultiplePerms().has_permissions(self.user))
 
+    def test_has_permissions_multiple_permissions_all_granted(self):
+        self.user.user_permissions.add(
+            self.permission, Permission.objects.get_by_natural_key(app_label="auth", codename="add_user", model="user")
+        )
+
+        self.assertTrue(self.TestViewMultiplePerms().has_permissions(self.user))
+
     def test_passes_login_barrier_no_login_required(self):
         view = self.TestViewSinglePerm()
         view.login_required = False
@@ -83,6 +93,72 @@ class MetaDjangoPermissionRequiredMixinTest(RequestProviderMixin, TestCase):
         self.user.is_superuser = True
         self.assertTrue(self.TestViewSinglePerm().has_permissions(self.user))
 
+    @override_settings(
+        AUTHENTICATION_BACKENDS=[
+            "ambient_toolbox.static_role_permissions.auth_backend.StaticRoleAndGroupPermissionBackend"
+        ]
+    )
+    @mock.patch(
+        "ambient_toolbox.static_role_permissions.index.load_static_role_permissions",
+        return_value={"role_1": {"auth.change_user"}},
+    )
+    def test_has_permissions_uses_batched_backend(self, _):
+        reset_static_role_permission_index()
+        self.user.role = "role_1"
+        group = Group.objects.create(name="group_1")
+        group.permissions.add(
+            Permission.objects.get_by_natural_key(app_label="auth", codename="add_user", model="user")
+        )
+        self.user.groups.add(group)
+
+        with (
+            mock.patch.object(
+                StaticRoleAndGroupPermissionBackend,
+                "has_perm",
+                side_effect=StaticRoleAndGroupPermissionBackend.has_perm,
+                autospec=True,
+            ) as mocked_has_perm,
+            self.assertNumQueries(1),
+        ):
+            self.assertTrue(self.TestViewMultiplePerms().has_permissions(self.user))
+
+        mocked_has_perm.assert_not_called()
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=[
+            "ambient_toolbox.static_role_permissions.auth_backend.StaticRoleAndGroupPermissionBackend"
+        ]
+    )
+    @mock.patch.object(StaticRoleAndGroupPermissionBackend, "has_perms", side_effect=PermissionDenied)
+    def test_has_permissions_batched_backend_permission_denied(self, _):
+        self.assertFalse(self.TestViewSinglePerm().has_permissions(self.user))
+
+    @override_settings(AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"])
+    def test_has_permissions_other_backend_with_has_perms_not_used(self):
+        self.user.user_permissions.add(self.permission)
+
+        with (
+            mock.patch("django.contrib.auth.backends.ModelBackend.has_perms", create=True) as mocked_has_perms,
+            mock.patch.object(User, "has_perms", return_value=True) as mocked_user_has_perms,
+        ):
+            self.assertTrue(self.TestViewSinglePerm().has_permissions(self.user))
+
+        mocked_has_perms.assert_not_called()
+        mocked_user_has_perms.assert_called_once_with(self.TestViewSinglePerm.permission_list)
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=[
+            "ambient_toolbox.static_role_permissions.auth_backend.StaticRoleAndGroupPermissionBackend",
+            "django.contrib.auth.backends.ModelBackend",
+        ]
+    )
+    @mock.patch.object(StaticRoleAndGroupPermissionBackend, "has_perms")
+    def test_has_permissions_multiple_backends_combined_per_permission(self, mocked_has_perms):
+        self.user.user_permissions.add(self.permission)
+
+        self.assertTrue(self.TestViewSinglePerm().has_permissions(self.user))
+        mocked_has_perms.assert_not_called()
+
     @mock.patch.object(TestViewSinglePerm, "passes_login_barrier", return_value=True)
     @mock.patch.object(TestViewSinglePerm, "has_permissions", return_value=True)
     def test_dispatch_regular(self, *args):
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from ambient_toolbox.visibility_index.managers import VisibilityIndexQuerySet
+from testapp.models import ModelWithVisibilityIndex, ModelWithVisibilityIndexEntry
+
+
+class VisibilityIndexQuerySetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my-user")
+        cls.other_user = User.objects.create(username="other-user")
+        cls.obj_1 = ModelWithVisibilityIndex.objects.create(owner=cls.user)
+        cls.obj_2 = ModelWithVisibilityIndex.objects.create(owner=cls.user)
+        cls.obj_3 = ModelWithVisibilityIndex.objects.create(owner=cls.other_user)
+
+        content_type = ContentType.objects.get_for_model(ModelWithVisibilityIndex)
+        ModelWithVisibilityIndexEntry.objects.bulk_create(
+            [
+                ModelWithVisibilityIndexEntry(
+                    user=cls.user,
+                    content_type=content_type,
+                    object_id=cls.obj_1.id,
+                    can_view=True,
+                    can_edit=True,
+                    can_delete=True,
+                ),
+                ModelWithVisibilityIndexEntry(
+                    user=cls.user, content_type=content_type, object_id=cls.obj_2.id, can_view=True
+                ),
+                ModelWithVisibilityIndexEntry(
+                    user=cls.other_user, content_type=content_type, object_id=cls.obj_3.id, can_view=True
+                ),
+            ]
+        )
+
+    def test_visible_for(self):
+        self.assertQuerySetEqual(
+            ModelWithVisibilityIndex.objects.visible_for(self.user).order_by("id"), [self.obj_1, self.obj_2]
+        )
+
+    def test_editable_for(self):
+        self.assertQuerySetEqual(ModelWithVisibilityIndex.objects.editable_for(self.user), [self.obj_1])
+
+    def test_deletable_for(self):
+        self.assertQuerySetEqual(ModelWithVisibilityIndex.objects.deletable_for(self.user), [self.obj_1])
+
+    def test_visible_for_user_id(self):
+        self.assertQuerySetEqual(ModelWithVisibilityIndex.objects.visible_for(self.other_user.id), [self.obj_3])
+
+    def test_visible_for_anonymous_user(self):
+        with self.assertNumQueries(0):
+            self.assertQuerySetEqual(ModelWithVisibilityIndex.objects.visible_for(AnonymousUser()), [])
+
+    def test_visible_for_unsaved_user(self):
+        with self.assertNumQueries(0):
+            self.assertQuerySetEqual(ModelWithVisibilityIndex.objects.editable_for(User(username="unsaved")), [])
+
+    def test_visible_for_single_query(self):
+        with self.assertNumQueries(1):
+            list(ModelWithVisibilityIndex.objects.visible_for(self.user))
+
+    def test_index_model_not_set(self):
+        with self.assertRaisesMessage(AssertionError, "Please set the attribute 'visibility_index_model'."):
+            VisibilityIndexQuerySet(model=ModelWithVisibilityIndex).visible_for(self.user)
@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from testapp.models import ModelWithVisibilityIndex, ModelWithVisibilityIndexEntry
+
+
+class AbstractVisibilityIndexTest(TestCase):
+    def test_str(self):
+        user = User.objects.create(username="my-user")
+        content_type = ContentType.objects.get_for_model(ModelWithVisibilityIndex)
+        entry = ModelWithVisibilityIndexEntry(user=user, content_type=content_type, object_id=42)
+
+        self.assertEqual(str(entry), f"{user.id} / {content_type.id} / 42")
+
+    def test_permission_flags_default_to_false(self):
+        entry = ModelWithVisibilityIndexEntry()
+
+        self.assertFalse(entry.can_view)
+        self.assertFalse(entry.can_edit)
+        self.assertFalse(entry.can_delete)
@@ -0,0 +1,262 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ambient_toolbox.visibility_index.services import VisibilityIndexDiff, VisibilityIndexService
+from testapp.managers import ModelWithVisibilityIndexRuleQuerySet
+from testapp.models import ModelWithVisibilityIndex, ModelWithVisibilityIndexEntry
+from testapp.services import ModelWithVisibilityIndexService
+
+
+class VisibilityIndexDiffTest(TestCase):
+    def test_is_consistent_empty(self):
+        self.assertTrue(VisibilityIndexDiff().is_consistent)
+
+    def test_is_consistent_with_changes(self):
+        self.assertFalse(VisibilityIndexDiff(created=[ModelWithVisibilityIndexEntry()]).is_consistent)
+        self.assertFalse(VisibilityIndexDiff(updated=[ModelWithVisibilityIndexEntry()]).is_consistent)
+        self.assertFalse(VisibilityIndexDiff(deleted=[ModelWithVisibilityIndexEntry()]).is_consistent)
+
+    def test_extend(self):
+        entry_1 = ModelWithVisibilityIndexEntry(object_id=1)
+        entry_2 = ModelWithVisibilityIndexEntry(object_id=2)
+        diff = VisibilityIndexDiff(created=[entry_1])
+
+        diff.extend(VisibilityIndexDiff(created=[entry_2], deleted=[entry_1]))
+
+        self.assertEqual(diff.created, [entry_1, entry_2])
+        self.assertEqual(diff.updated, [])
+        self.assertEqual(diff.deleted, [entry_1])
+
+
+class VisibilityIndexServiceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my-user")
+        cls.other_user = User.objects.create(username="other-user")
+        cls.private_obj = ModelWithVisibilityIndex.objects.create(owner=cls.user)
+        cls.public_obj = ModelWithVisibilityIndex.objects.create(owner=cls.user, is_public=True)
+        cls.other_obj = ModelWithVisibilityIndex.objects.create(owner=cls.other_user)
+        cls.content_type = ContentType.objects.get_for_model(ModelWithVisibilityIndex)
+
+    def _get_index(self) -> set[tuple]:
+        return set(
+            ModelWithVisibilityIndexEntry.objects.values_list(
+                "user_id", "object_id", "can_view", "can_edit", "can_delete"
+            )
+        )
+
+    def test_init_via_kwargs(self):
+        service = VisibilityIndexService(
+            model=ModelWithVisibilityIndex,
+            index_model=ModelWithVisibilityIndexEntry,
+            rule_queryset_class=ModelWithVisibilityIndexRuleQuerySet,
+        )
+
+        self.assertEqual(service.model, ModelWithVisibilityIndex)
+        self.assertEqual(service.index_model, ModelWithVisibilityIndexEntry)
+        self.assertEqual(service.rule_queryset_class, ModelWithVisibilityIndexRuleQuerySet)
+
+    def test_init_model_missing(self):
+        with self.assertRaisesMessage(AssertionError, "Please set the attribute 'model'."):
+            VisibilityIndexService(
+                index_model=ModelWithVisibilityIndexEntry, rule_queryset_class=ModelWithVisibilityIndexRuleQuerySet
+            )
+
+    def test_init_index_model_missing(self):
+        with self.assertRaisesMessage(AssertionError, "Please set the attribute 'index_model'."):
+            VisibilityIndexService(
+                model=ModelWithVisibilityIndex, rule_queryset_class=ModelWithVisibilityIndexRuleQuerySet
+            )
+
+    def test_init_rule_queryset_class_missing(self):
+        with self.assertRaisesMessage(AssertionError, "Please set the attribute 'rule_queryset_class'."):
+            VisibilityIndexService(model=ModelWithVisibilityIndex, index_model=ModelWithVisibilityIndexEntry)
+
+    def test_get_rule_queryset(self):
+        rule_queryset = ModelWithVisibilityIndexService().get_rule_queryset()
+
+        self.assertIsInstance(rule_queryset, ModelWithVisibilityIndexRuleQuerySet)
+        self.assertEqual(rule_queryset.model, ModelWithVisibilityIndex)
+
+    def test_get_content_type(self):
+        self.assertEqual(ModelWithVisibilityIndexService().get_content_type(), self.content_type)
+
+    def test_rebuild_empty_index(self):
+        diff = ModelWithVisibilityIndexService().rebuild()
+
+        self.assertEqual(len(diff.created), 4)
+        self.assertEqual(len(diff.updated), 0)
+        self.assertEqual(len(diff.deleted), 0)
+        self.assertEqual(
+            self._get_index(),
+            {
+                (self.user.id, self.private_obj.id, True, True, True),
+                (self.user.id, self.public_obj.id, True, True, False),
+                (self.other_user.id, self.public_obj.id, True, False, False),
+                (self.other_user.id, self.other_obj.id, True, True, True),
+            },
+        )
+
+    def test_rebuild_fixes_stale_entries(self):
+        service = ModelWithVisibilityIndexService()
+        service.rebuild()
+        ModelWithVisibilityIndexEntry.objects.filter(object_id=self.private_obj.id).update(can_delete=False)
+        ModelWithVisibilityIndexEntry.objects.create(
+            user=self.other_user, content_type=self.content_type, object_id=self.private_obj.id, can_view=True
+        )
+
+        diff = service.rebuild()
+
+        self.assertEqual(len(diff.created), 0)
+        self.assertEqual(len(diff.updated), 1)
+        self.assertEqual(len(diff.deleted), 1)
+        self.assertIn((self.user.id, self.private_obj.id, True, True, True), self._get_index())
+        self.assertNotIn(
+            self.other_user.id, {entry[0] for entry in self._get_index() if entry[1] == self.private_obj.id}
+        )
+
+    def test_rebuild_is_idempotent(self):
+        service = ModelWithVisibilityIndexService()
+        service.rebuild()
+
+        self.assertTrue(service.rebuild().is_consistent)
+
+    def test_refresh_user(self):
+        diff = ModelWithVisibilityIndexService().refresh_user(self.other_user)
+
+        self.assertEqual(len(diff.created), 2)
+        self.assertEqual({entry[0] for entry in self._get_index()}, {self.other_user.id})
+
+    def test_refresh_objects(self):
+        service = ModelWithVisibilityIndexService()
+        service.rebuild()
+        ModelWithVisibilityIndex.objects.filter(id=self.public_obj.id).update(is_public=False)
+
+        diff = service.refresh_objects(object_ids=[self.public_obj.id])
+
+        self.assertEqual(len(diff.updated), 1)
+        self.assertEqual(len(diff.deleted), 1)
+        self.assertIn((self.user.id, self.public_obj.id, True, True, True), self._get_index())
+        self.assertNotIn((self.other_user.id, self.public_obj.id, True, False, False), self._get_index())
+
+    def test_refresh_objects_query_count_independent_of_users(self):
+        service = ModelWithVisibilityIndexService()
+        service.rebuild()
+
+        with CaptureQueriesContext(connection) as few_users_context:
+            service.refresh_objects(object_ids=[self.public_obj.id])
+        User.objects.bulk_create([User(username=f"user-{index}") for index in range(20)])
+        with CaptureQueriesContext(connection) as many_users_context:
+            diff = service.refresh_objects(object_ids=[self.public_obj.id])
+
+        # Savepoint, three rule queries, existing entries and releasing the savepoint, plus creating the new entries
+        self.assertEqual(len(few_users_context.captured_queries), 6)
+        self.assertEqual(len(many_users_context.captured_queries), 7)
+        self.assertEqual(len(diff.created), 20)
+
+    def test_refresh_objects_many_objects(self):
+        service = ModelWithVisibilityIndexService()
+        service.object_chunk_size = 2
+        service.rebuild()
+        expected_index = self._get_index()
+        ModelWithVisibilityIndexEntry.objects.all().delete()
+
+        diff = service.refresh_objects(object_ids=[self.private_obj.id, self.public_obj.id, self.other_obj.id])
+
+        self.assertEqual(len(diff.created), 4)
+        self.assertEqual(self._get_index(), expected_index)
+
+    def test_refresh_objects_keeps_entries_of_other_users(self):
+        service = ModelWithVisibilityIndexService()
+        service.rebuild()
+        service.get_user_queryset = lambda: User.objects.filter(id=self.user.id)
+        ModelWithVisibilityIndex.objects.filter(id=self.public_obj.id).update(is_public=False)
+
+        diff = service.refresh_objects(object_ids=[self.public_obj.id])
+
+        self.assertEqual(len(diff.updated), 1)
+        self.assertEqual(len(diff.deleted), 0)
+        self.assertIn((self.other_user.id, self.public_obj.id, True, False, False), self._get_index())
+
+    def test_refresh_objects_falls_back_for_rules_using_the_user_object(self):
+        class UserAttributeRuleQuerySet(ModelWithVisibilityIndexRuleQuerySet):
+            def visible_for(self, user):
+                return self.filter(owner__username=user.username)
+
+        service = ModelWithVisibilityIndexService(rule_queryset_class=UserAttributeRuleQuerySet)
+
+        with mock.patch.object(service, "_sync", wraps=service._sync) as mocked_sync:
+            diff = service.refresh_objects(object_ids=[self.private_obj.id])
+
+        self.assertEqual(mocked_sync.call_count, 1)
+        self.assertEqual(len(diff.created), 1)
+        self.assertEqual(self._get_index(), {(self.user.id, self.private_obj.id, True, True, True)})
+
+    def test_refresh_objects_without_correlated_rules(self):
+        service = ModelWithVisibilityIndexService()
+        service.correlate_rules = False
+
+        with mock.patch.object(service, "_compute_object_diff") as mocked_compute:
+            diff = service.refresh_objects(object_ids=[self.public_obj.id])
+
+        mocked_compute.assert_not_called()
+        self.assertEqual(len(diff.created), 2)
+
+    def test_refresh_objects_rules_not_correlated_by_default(self):
+        class BranchingRuleQuerySet(ModelWithVisibilityIndexRuleQuerySet):
+            def visible_for(self, user):
+                if getattr(user, "is_superuser", False):
+                    return self.all()
+                return super().visible_for(user)
+
+        superuser = User.objects.create(username="superuser", is_superuser=True)
+        service = VisibilityIndexService(
+            model=ModelWithVisibilityIndex,
+            index_model=ModelWithVisibilityIndexEntry,
+            rule_queryset_class=BranchingRuleQuerySet,
+        )
+
+        with mock.patch.object(service, "_compute_object_diff") as mocked_compute:
+            service.refresh_objects(object_ids=[self.other_obj.id])
+
+        mocked_compute.assert_not_called()
+        self.assertEqual(
+            self._get_index(),
+            {
+                (superuser.id, self.other_obj.id, True, False, False),
+                (self.other_user.id, self.other_obj.id, True, True, True),
+            },
+        )
+
+    def test_refresh_objects_empty(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(ModelWithVisibilityIndexService().refresh_objects(object_ids=[]).is_consistent)
+
+    def test_remove_objects(self):
+        service = ModelWithVisibilityIndexService()
+        service.rebuild()
+
+        service.remove_objects(object_ids=[self.public_obj.id])
+
+        self.assertNotIn(self.public_obj.id, {entry[1] for entry in self._get_index()})
+        self.assertEqual(len(self._get_index()), 2)
+
+    def test_check_consistency_does_not_persist(self):
+        diff = ModelWithVisibilityIndexService().check_consistency()
+
+        self.assertEqual(len(diff.created), 4)
+        self.assertFalse(diff.is_consistent)
+        self.assertEqual(ModelWithVisibilityIndexEntry.objects.count(), 0)
+
+    def test_check_consistency_after_rebuild(self):
+        service = ModelWithVisibilityIndexService()
+        service.rebuild()
+
+        self.assertTrue(service.check_consistency().is_consistent)
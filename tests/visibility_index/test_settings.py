@@ -0,0 +1,24 @@
+from django.test import override_settings
+
+from ambient_toolbox.visibility_index.settings import (
+    get_visibility_index_connect_signals,
+    get_visibility_index_services,
+)
+
+
+@override_settings(VISIBILITY_INDEX_SERVICES=["my_project.services.MyService"])
+def test_get_visibility_index_services_is_set():
+    assert get_visibility_index_services() == ["my_project.services.MyService"]
+
+
+def test_get_visibility_index_services_default_used():
+    assert get_visibility_index_services() == []
+
+
+@override_settings(VISIBILITY_INDEX_CONNECT_SIGNALS=False)
+def test_get_visibility_index_connect_signals_is_set():
+    assert get_visibility_index_connect_signals() is False
+
+
+def test_get_visibility_index_connect_signals_default_used():
+    assert get_visibility_index_connect_signals() is True
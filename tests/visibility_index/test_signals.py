@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.test import TestCase, override_settings
+
+from ambient_toolbox.visibility_index.signals import connect_registered_visibility_indices, connect_visibility_index
+from testapp.models import ModelWithVisibilityIndex, ModelWithVisibilityIndexEntry
+from testapp.services import ModelWithVisibilityIndexService
+
+
+class ConnectVisibilityIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        cls.user = User.objects.create(username="my-user")
+
+    def setUp(self):
+        super().setUp()
+
+        connect_visibility_index(service=ModelWithVisibilityIndexService())
+
+    def tearDown(self):
+        dispatch_uid = "visibility_index.testapp.modelwithvisibilityindex.testapp.modelwithvisibilityindexentry"
+        post_save.disconnect(sender=ModelWithVisibilityIndex, dispatch_uid=dispatch_uid)
+        post_delete.disconnect(sender=ModelWithVisibilityIndex, dispatch_uid=dispatch_uid)
+
+        super().tearDown()
+
+    def test_save_refreshes_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            obj = ModelWithVisibilityIndex.objects.create(owner=self.user)
+
+        self.assertQuerySetEqual(ModelWithVisibilityIndex.objects.deletable_for(self.user), [obj])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.is_public = True
+            obj.save()
+
+        self.assertQuerySetEqual(ModelWithVisibilityIndex.objects.deletable_for(self.user), [])
+
+    def test_save_refreshes_index_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            ModelWithVisibilityIndex.objects.create(owner=self.user)
+
+            self.assertEqual(ModelWithVisibilityIndexEntry.objects.count(), 0)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(ModelWithVisibilityIndexEntry.objects.count(), 0)
+
+    def test_delete_removes_entries(self):
+        obj = ModelWithVisibilityIndex.objects.create(owner=self.user)
+
+        obj.delete()
+
+        self.assertEqual(ModelWithVisibilityIndexEntry.objects.count(), 0)
+
+    def test_connecting_twice_registers_once(self):
+        connect_visibility_index(service=ModelWithVisibilityIndexService())
+
+        with (
+            mock.patch.object(ModelWithVisibilityIndexService, "refresh_objects") as mocked_refresh,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            ModelWithVisibilityIndex.objects.create(owner=self.user)
+
+        self.assertEqual(mocked_refresh.call_count, 1)
+
+
+@override_settings(VISIBILITY_INDEX_SERVICES=["testapp.services.ModelWithVisibilityIndexService"])
+@mock.patch("ambient_toolbox.visibility_index.signals.connect_visibility_index")
+def test_connect_registered_visibility_indices(mocked_connect):
+    connect_registered_visibility_indices()
+
+    assert mocked_connect.call_count == 1
+    assert isinstance(mocked_connect.call_args.kwargs["service"], ModelWithVisibilityIndexService)